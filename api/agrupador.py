@@ -0,0 +1,187 @@
+"""
+Micro-lotes de predição para o ReSkill+
+Agrupa as predições de requisições concorrentes que chegam em um intervalo de
+poucos milissegundos em uma única matriz, executa o modelo uma vez e devolve
+a cada requisição as linhas do seu resultado
+"""
+
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+import numpy as np
+
+
+class _Pedido:
+    """Linhas de uma requisição aguardando a predição"""
+
+    __slots__ = ('X', 'argumentos', 'futuro', 'chegada')
+
+    def __init__(self, X, argumentos):
+        self.X = X
+        self.argumentos = argumentos
+        self.futuro = Future()
+        self.chegada = time.perf_counter()
+
+    def compativel(self, outro):
+        """Se os dois pedidos podem ir no mesmo lote (mesmos argumentos extras)"""
+        return len(self.argumentos) == len(outro.argumentos) and all(
+            a is b for a, b in zip(self.argumentos, outro.argumentos))
+
+
+class AgrupadorLotes:
+    """
+    Executa funcao (ex.: modelo.predict) em lotes formados pelas chamadas
+    concorrentes a prever(X).
+
+    Uma thread própria retira o primeiro pedido da fila e espera até
+    espera_maxima_ms, contados da chegada desse pedido, por outros pedidos,
+    até somar tamanho_maximo linhas. A espera só acontece quando o lote
+    anterior reuniu mais de um pedido: sem concorrência, cada pedido é
+    executado assim que chega, sem latência adicional. Pedidos com
+    tamanho_maximo linhas ou mais são executados diretamente, sem passar
+    pela fila.
+
+    Se o lote falhar, cada pedido é executado sozinho, para que o erro de uma
+    requisição não afete as demais.
+
+    Argumentos extras de prever(X, *argumentos) são repassados a
+    funcao(X, *argumentos), e só pedidos com os mesmos objetos como
+    argumentos formam um lote (ex.: o pacote de modelos fixado por cada
+    requisição, ver registro_modelos.py).
+    """
+
+    def __init__(self, funcao, espera_maxima_ms=2.0, tamanho_maximo=64, nome='modelo'):
+        self.funcao = funcao
+        self.espera_maxima = espera_maxima_ms / 1000
+        self.tamanho_maximo = tamanho_maximo
+        self.nome = nome
+        self._fila = queue.Queue()
+        self._pendente = None
+        self._thread = None
+        self._lock = threading.Lock()
+        self._concorrente = False
+
+        # Métricas: histograma do tamanho dos lotes em potências de 2
+        self._limites_histograma = [2 ** i for i in range((tamanho_maximo - 1).bit_length() + 1)]
+        self._histograma = [0] * len(self._limites_histograma)
+        self._lotes = 0
+        self._pedidos = 0
+        self._linhas = 0
+        self._maior_lote = 0
+        self._maior_fila = 0
+        self._espera_total = 0.0
+
+    def prever(self, X, *argumentos):
+        """Retorna funcao(X, *argumentos), calculada junto com as requisições concorrentes"""
+        X = np.asarray(X, dtype=np.float64)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        if len(X) >= self.tamanho_maximo:
+            return self.funcao(X, *argumentos)
+
+        self._iniciar()
+        pedido = _Pedido(X, argumentos)
+        self._fila.put(pedido)
+        profundidade = self.profundidade_fila()
+        with self._lock:
+            self._maior_fila = max(self._maior_fila, profundidade)
+        return pedido.futuro.result()
+
+    def profundidade_fila(self):
+        """Número de pedidos aguardando um lote"""
+        return self._fila.qsize() + (self._pendente is not None)
+
+    def _iniciar(self):
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._executar, daemon=True,
+                                                name=f'microlotes-{self.nome}')
+                self._thread.start()
+
+    def _executar(self):
+        while True:
+            pedidos = self._formar_lote()
+            inicio = time.perf_counter()
+            self._processar(pedidos)
+            self._registrar(pedidos, inicio)
+
+    def _formar_lote(self):
+        """Aguarda o primeiro pedido e reúne os que chegarem até o prazo"""
+        primeiro, self._pendente = self._pendente, None
+        if primeiro is None:
+            primeiro = self._fila.get()
+
+        pedidos = [primeiro]
+        linhas = len(primeiro.X)
+        prazo = primeiro.chegada + (self.espera_maxima if self._concorrente else 0)
+
+        while linhas < self.tamanho_maximo:
+            restante = prazo - time.perf_counter()
+            try:
+                pedido = self._fila.get(timeout=restante) if restante > 0 else self._fila.get_nowait()
+            except queue.Empty:
+                break
+            if linhas + len(pedido.X) > self.tamanho_maximo or not pedido.compativel(primeiro):
+                # Não cabe neste lote: abre o próximo
+                self._pendente = pedido
+                break
+            pedidos.append(pedido)
+            linhas += len(pedido.X)
+
+        self._concorrente = len(pedidos) > 1
+        return pedidos
+
+    def _processar(self, pedidos):
+        if len(pedidos) > 1:
+            try:
+                saida = self.funcao(np.vstack([pedido.X for pedido in pedidos]), *pedidos[0].argumentos)
+            except Exception:
+                pass
+            else:
+                inicio = 0
+                for pedido in pedidos:
+                    fim = inicio + len(pedido.X)
+                    pedido.futuro.set_result(saida[inicio:fim])
+                    inicio = fim
+                return
+
+        for pedido in pedidos:
+            try:
+                pedido.futuro.set_result(self.funcao(pedido.X, *pedido.argumentos))
+            except Exception as e:
+                pedido.futuro.set_exception(e)
+
+    def _registrar(self, pedidos, inicio):
+        linhas = sum(len(pedido.X) for pedido in pedidos)
+        balde = next(i for i, limite in enumerate(self._limites_histograma) if linhas <= limite)
+        with self._lock:
+            self._lotes += 1
+            self._pedidos += len(pedidos)
+            self._linhas += linhas
+            self._maior_lote = max(self._maior_lote, linhas)
+            self._histograma[balde] += 1
+            self._espera_total += sum(inicio - pedido.chegada for pedido in pedidos)
+
+    def metricas(self):
+        """Profundidade da fila, tamanho dos lotes e espera média dos pedidos"""
+        with self._lock:
+            return {
+                'fila': self.profundidade_fila(),
+                'maior_fila': self._maior_fila,
+                'lotes': self._lotes,
+                'pedidos': self._pedidos,
+                'linhas': self._linhas,
+                'tamanho_medio_lote': round(self._linhas / self._lotes, 2) if self._lotes else 0,
+                'maior_lote': self._maior_lote,
+                'histograma_lotes': {
+                    f'<={limite}': total
+                    for limite, total in zip(self._limites_histograma, self._histograma)
+                },
+                'espera_media_ms': round(self._espera_total / self._pedidos * 1000, 3) if self._pedidos else 0,
+                'espera_maxima_ms': self.espera_maxima * 1000,
+                'tamanho_maximo': self.tamanho_maximo,
+            }
@@ -3,16 +3,46 @@ API REST ReSkill+ - Flask
 Endpoints para modelos de IA e Chatbot
 """
 
-from flask import Flask, request, jsonify
+from flask import Flask, request, jsonify, g
 from flask_cors import CORS
+from werkzeug.datastructures import MIMEAccept
+from werkzeug.http import parse_accept_header
+import hashlib
+import hmac
+import json
 import pickle
-import pandas as pd
+import importlib
+import threading
 import numpy as np
 import os
+from collections import Counter
 from datetime import datetime
 
+from indice_cursos import IndiceCursos, ler_catalogo, ler_colunas
+from indice_vizinhos import IndiceVizinhos
+from cache_respostas import CacheRespostas
+from cache_predicoes import CachePredicoes, GradeRisco
+from metricas import (
+    RegistroMetricas, TIPO_METRICAS, iniciar_cronometro, encerrar_cronometro,
+    marcar, registrar_lote
+)
+from perfilador import Perfilador, CABECALHO_PERFILAR, CABECALHO_PERFIL
+from sessoes import SessaoInvalida, criar_sessoes, validar_id
+from chatbot import Chatbot
+from busca_cursos import BuscaCursos
+from modelos import ModeloIndisponivel, PacoteModelos
+from registro_modelos import RegistroModelos, fixar, liberar, usar_pacote
+from agrupador import AgrupadorLotes
+from codificacao import CategoriaDesconhecida, CodificadorFeatures, ValorNumericoInvalido, numero_finito
+from artefatos import carregar_artefatos
+from motor_numpy import (
+    FlorestaClassificadorNumpy, GradientBoostingRegressorNumpy, SegmentadorNumpy,
+    LINHAS_POR_BLOCO, TOLERANCIA, amostra_verificacao, diferenca_maxima
+)
+
 app = Flask(__name__)
-CORS(app)
+# Cabeçalhos de paginação das respostas NDJSON, legíveis pelo navegador
+CORS(app, expose_headers=['X-Total-Registros', 'X-Proximo-Cursor'])
 
 # ============================================
 # CARREGAMENTO DOS MODELOS
@@ -21,85 +51,1459 @@ CORS(app)
 MODELS_DIR = '../models'
 DATA_DIR = '../data'
 
-# Variáveis globais para modelos
-classificador = None
-regressor = None
-clustering = None
-encoders = None
-scaler = None
-df_cursos = None
+# Formato dos modelos: 'auto' usa o formato compacto (models/compacto) quando
+# ele existe e é válido, senão os arquivos .pickle; 'compacto' e 'pickle'
+# forçam um dos dois
+FORMATO_MODELOS = os.environ.get('RESKILL_FORMATO_MODELOS', 'auto')
+
+# Motor de inferência: 'numpy' avalia árvores e centróides só com NumPy (ver
+# motor_numpy.py), extraindo os arrays dos .pickle na carga quando o formato
+# compacto não é usado; 'sklearn' usa os modelos do scikit-learn (no modo
+# 'auto' isso faz a API carregar os .pickle)
+MOTOR_INFERENCIA = os.environ.get('RESKILL_MOTOR_INFERENCIA', 'numpy')
+
+# Com o motor 'numpy', as matrizes com mais de RESKILL_MOTOR_LIMIAR_SKLEARN
+# linhas (lotes grandes) vão ao classificador e ao regressor do scikit-learn,
+# cujo percurso compilado das árvores é mais rápido nessa escala (ver
+# benchmark_motor.py). 0 = sempre o motor NumPy
+LIMIAR_SKLEARN = int(os.environ.get('RESKILL_MOTOR_LIMIAR_SKLEARN', str(LINHAS_POR_BLOCO)))
+LOTES_SKLEARN = MOTOR_INFERENCIA == 'numpy' and LIMIAR_SKLEARN > 0
+
+# Variante do classificador de perfil servida: 'completo' (a floresta
+# treinada) ou uma das versões comprimidas geradas por
+# notebooks/compressao.py ('arvores_10', 'destilada'...), com a concordância,
+# a latência e o tamanho de cada uma em models/relatorio_compressao.json
+VARIANTE_CLASSIFICADOR = os.environ.get('RESKILL_VARIANTE_CLASSIFICADOR', 'completo')
+
+# Micro-lotes (ver agrupador.py): com RESKILL_MICROLOTES=1, as predições de
+# requisições concorrentes que chegam em até ESPERA_MS são executadas juntas,
+# em lotes de no máximo TAMANHO linhas
+MICROLOTES = os.environ.get('RESKILL_MICROLOTES', '0') == '1'
+MICROLOTES_ESPERA_MS = float(os.environ.get('RESKILL_MICROLOTES_ESPERA_MS', '2'))
+MICROLOTES_TAMANHO = int(os.environ.get('RESKILL_MICROLOTES_TAMANHO', '64'))
+
+# Categorias sem diferenciar maiúsculas, acentos e espaços nas pontas: com
+# RESKILL_NORMALIZAR_CATEGORIAS=1, 'Médio' e 'MEDIO' equivalem a 'medio'
+# (ver codificacao.py)
+NORMALIZAR_CATEGORIAS = os.environ.get('RESKILL_NORMALIZAR_CATEGORIAS', '0') == '1'
+
+# Cache das predições de entradas repetidas (ver cache_predicoes.py): até
+# RESKILL_CACHE_PREDICOES resultados por modelo (0 desativa), expirando após
+# RESKILL_CACHE_PREDICOES_TTL segundos (0 = apenas por tamanho)
+CACHE_PREDICOES_TAMANHO = int(os.environ.get('RESKILL_CACHE_PREDICOES', '10000'))
+CACHE_PREDICOES_TTL = float(os.environ.get('RESKILL_CACHE_PREDICOES_TTL', '0'))
+
+# Com RESKILL_GRADE_RISCO=1, o risco de todas as combinações de notas inteiras
+# de 0 a 10 é calculado na carga e consultado no lugar do modelo
+GRADE_RISCO = os.environ.get('RESKILL_GRADE_RISCO', '0') == '1'
+
+# Histogramas de duração por rota e por etapa, expostos em /metrics (ver
+# metricas.py). RESKILL_METRICAS=0 desliga a medição das requisições
+METRICAS = os.environ.get('RESKILL_METRICAS', '1') == '1'
+
+# Perfilador de requisições (ver perfilador.py): perfila as requisições com o
+# cabeçalho X-Perfilar: 1 (se RESKILL_PERFILADOR_CABECALHO=1) e uma fração
+# RESKILL_PERFILADOR_TAXA das demais, no modo cprofile ou amostragem, e grava
+# os perfis em RESKILL_PERFILADOR_DIR. Desligado por padrão
+PERFILADOR_TAXA = float(os.environ.get('RESKILL_PERFILADOR_TAXA', '0'))
+PERFILADOR_CABECALHO = os.environ.get('RESKILL_PERFILADOR_CABECALHO', '0') == '1'
+PERFILADOR_MODO = os.environ.get('RESKILL_PERFILADOR_MODO', 'cprofile')
+PERFILADOR_INTERVALO_MS = float(os.environ.get('RESKILL_PERFILADOR_INTERVALO_MS', '1'))
+PERFILADOR_DIR = os.environ.get('RESKILL_PERFILADOR_DIR', '../perfis')
+
+# Sessões de conversa (ver sessoes.py): as requisições com o campo "sessao"
+# guardam o perfil, o risco e o cluster previstos e os cursos sugeridos pelo
+# chatbot. RESKILL_SESSOES escolhe o backend ('memoria' ou 'sqlite', no
+# arquivo RESKILL_SESSOES_ARQUIVO, compartilhado entre os workers) ou '0'
+# para desligar; as sessões expiram após RESKILL_SESSOES_TTL segundos sem
+# uso e as menos usadas são descartadas acima de RESKILL_SESSOES_MAX sessões
+# ou RESKILL_SESSOES_MAX_MB megabytes
+SESSOES_BACKEND = os.environ.get('RESKILL_SESSOES', 'memoria')
+SESSOES_ARQUIVO = os.environ.get('RESKILL_SESSOES_ARQUIVO', '../sessoes.db')
+SESSOES_MAX = int(os.environ.get('RESKILL_SESSOES_MAX', '100000'))
+SESSOES_MAX_MB = float(os.environ.get('RESKILL_SESSOES_MAX_MB', '64'))
+SESSOES_TTL = float(os.environ.get('RESKILL_SESSOES_TTL', '1800'))
+
+# Recarga dos modelos e do catálogo sem reiniciar (ver registro_modelos.py):
+# pelo endpoint POST /admin/recarregar, que exige o cabeçalho X-Admin-Token
+# igual a RESKILL_ADMIN_TOKEN (sem ele o endpoint fica desativado), e/ou pelo
+# vigia, que confere os arquivos a cada RESKILL_RECARGA_INTERVALO segundos
+# (0 = desligado)
+ADMIN_TOKEN = os.environ.get('RESKILL_ADMIN_TOKEN', '')
+RECARGA_INTERVALO = float(os.environ.get('RESKILL_RECARGA_INTERVALO', '0'))
+
+# Busca de trabalhadores parecidos (ver indice_vizinhos.py): no modo
+# aproximado, a KD-tree pode devolver vizinhos até 1 + RESKILL_VIZINHOS_EPS
+# vezes mais distantes que os exatos
+VIZINHOS_EPS = float(os.environ.get('RESKILL_VIZINHOS_EPS', '0.5'))
+
+# Respostas JSON pré-serializadas dos endpoints estáticos (ver cache_respostas.py)
+cache_respostas = CacheRespostas()
+
+# Métricas das requisições atendidas por este processo
+registro_metricas = RegistroMetricas()
+
+perfilador = Perfilador(
+    PERFILADOR_DIR, PERFILADOR_TAXA, PERFILADOR_CABECALHO, PERFILADOR_MODO, PERFILADOR_INTERVALO_MS
+) if PERFILADOR_TAXA > 0 or PERFILADOR_CABECALHO else None
+
+sessoes = criar_sessoes(
+    SESSOES_BACKEND, SESSOES_ARQUIVO, SESSOES_MAX, int(SESSOES_MAX_MB * 1024 * 1024), SESSOES_TTL
+) if SESSOES_BACKEND != '0' else None
+
+# Módulos do scikit-learn usados pelos modelos serializados
+MODULOS_SKLEARN = ['sklearn.ensemble', 'sklearn.cluster', 'sklearn.preprocessing']
+
+def carregar_compacto(pacote):
+    """
+    Carrega os modelos do formato compacto (ver artefatos.py).
+    Retorna None quando o formato .pickle deve ser usado.
+    """
+    if FORMATO_MODELOS == 'pickle':
+        return None
+    if FORMATO_MODELOS == 'auto' and MOTOR_INFERENCIA == 'sklearn':
+        return None
+    try:
+        return carregar_artefatos(f'{MODELS_DIR}/compacto')
+    except (OSError, ValueError) as e:
+        if FORMATO_MODELOS == 'compacto':
+            raise
+        print(f"⚠️ Formato compacto indisponível, usando os arquivos .pickle: {str(e)}")
+        return None
+
+def importar_sklearn(pacote):
+    """
+    Importa os módulos do scikit-learn antes dos unpickles paralelos:
+    importar o mesmo módulo em várias threads ao mesmo tempo pode causar
+    deadlock no import. Não é necessário com o formato compacto.
+    """
+    if pacote.obter('compacto') is not None:
+        return []
+    for nome in MODULOS_SKLEARN:
+        importlib.import_module(nome)
+    return MODULOS_SKLEARN
+
+def verificar_motor(nome, original, convertido, X, metodo='predict'):
+    """
+    Compara a saída do motor NumPy com a do scikit-learn em X.
+    Retorna o modelo convertido ou, se divergir além da tolerância, o original.
+    """
+    diferenca = diferenca_maxima(getattr(original, metodo)(X), getattr(convertido, metodo)(X))
+    if diferenca > TOLERANCIA:
+        print(f"⚠️ Motor NumPy divergente para {nome} (diferença {diferenca:.3g}), usando o scikit-learn")
+        return original
+    return convertido
+
+def carregar_modelo(nome, nome_arquivo, classe_numpy=None, metodo='predict'):
+    """
+    Retorna uma função que obtém o modelo do formato compacto ou, na falta
+    dele, carrega o arquivo .pickle da pasta de modelos. Com o motor 'numpy',
+    o modelo do .pickle é convertido por classe_numpy.de_sklearn.
+    """
+    def carregar(pacote):
+        compacto = pacote.obter('compacto')
+        if compacto is not None:
+            return compacto[nome]
+        pacote.obter('sklearn')
+        with open(f'{MODELS_DIR}/{nome_arquivo}', 'rb') as f:
+            original = pickle.load(f)
+        if classe_numpy is None or MOTOR_INFERENCIA != 'numpy':
+            return original
+        convertido = classe_numpy.de_sklearn(original)
+        X = amostra_verificacao(convertido.n_features_in_, convertido.arvores)
+        return verificar_motor(nome, original, convertido, X, metodo)
+    return carregar
+
+def importar_sklearn_lotes(pacote):
+    """Módulos do scikit-learn dos modelos dos lotes grandes, importados uma vez"""
+    for nome in MODULOS_SKLEARN:
+        importlib.import_module(nome)
+    return MODULOS_SKLEARN
+
+def carregar_sklearn(nome_arquivo):
+    """
+    Retorna uma função que carrega o modelo do scikit-learn do .pickle, usado
+    nas matrizes com mais de LIMIAR_SKLEARN linhas (ver modelo_arvores).
+    Opcional: sem o .pickle (só o formato compacto), o motor NumPy continua
+    atendendo os lotes grandes
+    """
+    def carregar(pacote):
+        try:
+            pacote.obter('sklearn_lotes')
+            with open(f'{MODELS_DIR}/{nome_arquivo}', 'rb') as f:
+                return pickle.load(f)
+        except (OSError, ImportError, pickle.UnpicklingError, ModeloIndisponivel) as e:
+            print(f"⚠️ {nome_arquivo} indisponível, lotes grandes seguem no motor NumPy: {str(e)}")
+            return None
+    return carregar
+
+def arquivo_classificador():
+    """Arquivo .pickle do classificador na variante VARIANTE_CLASSIFICADOR"""
+    if VARIANTE_CLASSIFICADOR == 'completo':
+        return 'classificador_perfil.pickle'
+    return f'classificador_perfil_{VARIANTE_CLASSIFICADOR}.pickle'
+
+def carregar_classificador(pacote):
+    """
+    Classificador de perfil na variante VARIANTE_CLASSIFICADOR: do formato
+    compacto ou, na falta dele, de classificador_perfil_<variante>.pickle
+    """
+    if VARIANTE_CLASSIFICADOR != 'completo':
+        compacto = pacote.obter('compacto')
+        if compacto is not None:
+            variantes = compacto['variantes_classificador']
+            if VARIANTE_CLASSIFICADOR not in variantes:
+                raise ValueError(f'Variante do classificador inexistente: {VARIANTE_CLASSIFICADOR} '
+                                 f'(disponíveis: {", ".join(["completo", *variantes])})')
+            return variantes[VARIANTE_CLASSIFICADOR]
+    return carregar_modelo('classificador', arquivo_classificador(), FlorestaClassificadorNumpy,
+                           'predict_proba')(pacote)
+
+def carregar_segmentador(pacote):
+    """
+    Normalização + KMeans do endpoint de segmentação. Com o motor 'numpy' as
+    duas etapas viram um único produto de matrizes (SegmentadorNumpy).
+    """
+    scaler = pacote.obter('scaler')
+    clustering = pacote.obter('clustering')
+    if pacote.obter('compacto') is not None:
+        return SegmentadorNumpy(scaler, clustering)
+
+    from sklearn.pipeline import Pipeline
+    original = Pipeline([('scaler', scaler), ('clustering', clustering)])
+    if MOTOR_INFERENCIA != 'numpy':
+        return original
+
+    segmentador = SegmentadorNumpy(scaler, clustering)
+    X = amostra_verificacao(segmentador.n_features_in_, media=scaler.mean_, escala=scaler.scale_)
+    return verificar_motor('segmentador', original, segmentador, X)
+
+def carregar_classes_perfil(pacote):
+    """Nomes dos perfis na ordem das colunas de predict_proba do classificador"""
+    encoders = pacote.obter('encoders')
+    classificador = pacote.obter('classificador')
+    return [
+        str(classe)
+        for classe in encoders['le_perfil'].inverse_transform(classificador.classes_)
+    ]
+
+def carregar_codificadores(pacote):
+    """Codificadores de features de cada modelo, compilados a partir dos encoders"""
+    encoders = pacote.obter('encoders')
+    return {
+        'perfil': CodificadorFeatures(CAMPOS_PERFIL, CATEGORICAS_PERFIL, encoders,
+                                      normalizar=NORMALIZAR_CATEGORIAS),
+        'risco': CodificadorFeatures(CAMPOS_RISCO),
+        'cluster': CodificadorFeatures(CAMPOS_CLUSTER),
+        'diagnostico': CodificadorFeatures(CAMPOS_DIAGNOSTICO, CATEGORICAS_PERFIL, encoders,
+                                           normalizar=NORMALIZAR_CATEGORIAS),
+    }
+
+def carregar_grade_risco(pacote):
+    """Riscos pré-calculados de todas as combinações de notas de 0 a 10"""
+    regressor = pacote.obter('regressor')
+    return GradeRisco(regressor.predict, len(CAMPOS_RISCO))
+
+def carregar_vizinhos(pacote):
+    """
+    Índice dos trabalhadores de referência no espaço normalizado do
+    segmentador. O risco de cada um vem de risco_automacao.csv pelo id (50
+    quando não há), como no treino do KMeans
+    """
+    trabalhadores = ler_colunas(f'{DATA_DIR}/perfil_trabalhador.csv')
+    ocupacoes = ler_colunas(f'{DATA_DIR}/risco_automacao.csv')
+    riscos = dict(zip(ocupacoes['id'], ocupacoes['risco_automacao']))
+    trabalhadores['risco_automacao'] = [riscos.get(i, 50.0) for i in trabalhadores['id']]
+    scaler = pacote.obter('scaler')
+    X = np.column_stack([trabalhadores[campo] for campo in CAMPOS_CLUSTER])
+    return IndiceVizinhos(X, trabalhadores, scaler.mean_, scaler.scale_, VIZINHOS_EPS)
+
+def carregar_busca(pacote):
+    """Índice de busca textual pré-construído do chatbot (opcional)"""
+    try:
+        return BuscaCursos.carregar(f'{MODELS_DIR}/busca_cursos', pacote.obter('cursos'),
+                                    f'{DATA_DIR}/cursos_recomendacao.csv')
+    except (OSError, ValueError) as e:
+        print(f"⚠️ Índice de busca do chatbot indisponível: {str(e)}")
+        return None
+
+def criar_pacote():
+    """
+    Monta o pacote de artefatos. Cada dependência aparece antes de quem a usa,
+    e os arquivos maiores são iniciados primeiro. Os modelos do scikit-learn
+    dos lotes grandes ficam sob demanda: o import do scikit-learn custa
+    ~0,9 s, que não deve atrasar os demais artefatos. Eles são carregados
+    logo depois (ver carregar_sob_demanda) ou, se antes disso, no primeiro
+    lote grande
+    """
+    return PacoteModelos({
+        'compacto': carregar_compacto,
+        'sklearn': importar_sklearn,
+        'classificador': carregar_classificador,
+        'regressor': carregar_modelo('regressor', 'regressor_risco.pickle',
+                                     GradientBoostingRegressorNumpy),
+        'clustering': carregar_modelo('clustering', 'clustering_kmeans.pickle'),
+        'encoders': carregar_modelo('encoders', 'encoders.pickle'),
+        'codificadores': carregar_codificadores,
+        'scaler': carregar_modelo('scaler', 'scaler_cluster.pickle'),
+        'cursos': lambda pacote: ler_catalogo(f'{DATA_DIR}/cursos_recomendacao.csv'),
+        'segmentador': carregar_segmentador,
+        'classes_perfil': carregar_classes_perfil,
+        'indice_cursos': lambda pacote: IndiceCursos(pacote.obter('cursos')),
+        'vizinhos': carregar_vizinhos,
+        'busca': carregar_busca,
+        'chatbot': lambda pacote: Chatbot(pacote.obter('cursos'), pacote.obter('busca')),
+        **({'grade_risco': carregar_grade_risco} if GRADE_RISCO else {}),
+        **({'sklearn_lotes': importar_sklearn_lotes,
+            'classificador_sklearn': carregar_sklearn(arquivo_classificador()),
+            'regressor_sklearn': carregar_sklearn('regressor_risco.pickle')} if LOTES_SKLEARN else {}),
+    }, sob_demanda=('sklearn_lotes', 'classificador_sklearn', 'regressor_sklearn'))
+
+def assinatura_arquivos():
+    """
+    Identifica os arquivos de origem do pacote (tudo em models/, o catálogo
+    de cursos e os trabalhadores de referência) pelo caminho, tamanho e data
+    de modificação de cada um
+    """
+    sha = hashlib.sha256()
+    caminhos = [f'{DATA_DIR}/{nome}.csv'
+                for nome in ('cursos_recomendacao', 'perfil_trabalhador', 'risco_automacao')]
+    for raiz, _, arquivos in os.walk(MODELS_DIR):
+        caminhos.extend(os.path.join(raiz, nome) for nome in arquivos)
+    for caminho in sorted(caminhos):
+        info = os.stat(caminho)
+        sha.update(f'{caminho}\0{info.st_size}\0{info.st_mtime_ns}\n'.encode())
+    return sha.hexdigest()[:12]
+
+# Registros usados para aquecer uma nova versão antes da troca
+EXEMPLO_PERFIL = {
+    'idade': 30, 'escolaridade': 'superior', 'anos_experiencia': 5, 'area_atuacao': 'TI',
+    'habilidades_digitais': 8, 'renda_mensal': 5000, 'setor_industria': 'tecnologia'
+}
+EXEMPLO_RISCO = {
+    'repetitividade': 7, 'criatividade_requerida': 3, 'interacao_humana': 4,
+    'complexidade_tecnica': 3, 'nivel_educacao': 3
+}
+EXEMPLO_CLUSTER = {
+    'idade': 30, 'anos_experiencia': 5, 'habilidades_digitais': 8,
+    'renda_mensal': 5000, 'risco_automacao': 25.5
+}
+
+def aquecer_pacote(pacote):
+    """
+    Passa algumas requisições pelo pacote novo antes de ativá-lo, depois de
+    carregar os artefatos sob demanda. Levanta RuntimeError se alguma não
+    responder 200
+    """
+    pacote.carregar_sob_demanda()
+    with usar_pacote(pacote):
+        for processar, dados in ((processar_perfil, EXEMPLO_PERFIL),
+                                 (processar_risco, EXEMPLO_RISCO),
+                                 (processar_cluster, EXEMPLO_CLUSTER),
+                                 (processar_vizinhos, EXEMPLO_CLUSTER),
+                                 (processar_recomendacao, {'perfil': 'tech_avancado'}),
+                                 (processar_diagnostico, {**EXEMPLO_PERFIL, **EXEMPLO_RISCO}),
+                                 (processar_chatbot, {'mensagem': 'Quero aprender python'})):
+            corpo, status = processar(dados)
+            if status != 200:
+                raise RuntimeError(f'Aquecimento falhou em {processar.__name__}: {corpo}')
+
+def limpar_caches():
+    """Descarta as respostas serializadas e as predições da versão anterior"""
+    cache_respostas.limpar()
+    for cache in caches_predicoes.values():
+        cache.limpar()
+
+registro = RegistroModelos(criar_pacote, assinatura_arquivos, aquecer_pacote, limpar_caches)
+
+def modelo(nome):
+    """
+    Retorna um artefato do pacote da requisição atual (o ativo fora de uma
+    requisição), aguardando o fim da sua carga se necessário
+    """
+    return registro.atual().obter(nome)
+
+def modelo_arvores(pacote, nome, X):
+    """
+    Classificador ou regressor do pacote para X: o do scikit-learn nas
+    matrizes com mais de LIMIAR_SKLEARN linhas (com LOTES_SKLEARN), senão o
+    do motor configurado
+    """
+    if LOTES_SKLEARN and len(X) > LIMIAR_SKLEARN:
+        original = pacote.obter(f'{nome}_sklearn')
+        if original is not None:
+            return original
+    return pacote.obter(nome)
 
-def carregar_modelos():
-    """Carrega todos os modelos e dados necessários"""
-    global classificador, regressor, clustering, encoders, scaler, df_cursos
+# Predições que podem ser agrupadas em micro-lotes, sobre o pacote da requisição
+PREDICOES = {
+    'classificador': lambda X, pacote: modelo_arvores(pacote, 'classificador', X).predict_proba(X),
+    'regressor': lambda X, pacote: modelo_arvores(pacote, 'regressor', X).predict(X),
+    'segmentador': lambda X, pacote: pacote.obter('segmentador').predict(X),
+}
+
+agrupadores = {
+    nome: AgrupadorLotes(funcao, MICROLOTES_ESPERA_MS, MICROLOTES_TAMANHO, nome)
+    for nome, funcao in PREDICOES.items()
+} if MICROLOTES else {}
+
+def prever(nome, X):
+    """
+    Executa a predição nome (ver PREDICOES) sobre X. Com micro-lotes, a
+    chamada é agrupada com as de outras requisições concorrentes que usam o
+    mesmo pacote.
+    """
+    pacote = registro.atual()
+    agrupador = agrupadores.get(nome)
+    if agrupador is not None:
+        return agrupador.prever(X, pacote)
+    return PREDICOES[nome](X, pacote)
+
+caches_predicoes = {
+    nome: CachePredicoes(CACHE_PREDICOES_TAMANHO, CACHE_PREDICOES_TTL)
+    for nome in PREDICOES
+} if CACHE_PREDICOES_TAMANHO > 0 else {}
+
+def prever_registro(nome, X):
+    """
+    Predição nome de um único registro (X com uma linha), consultando antes
+    o cache de predições com a versão dos modelos e a tupla de features.
+    Retorna o resultado da linha.
+    """
+    cache = caches_predicoes.get(nome)
+    if cache is None:
+        return prever(nome, X)[0]
     
+    chave = (registro.atual().versao, *X[0].tolist())
+    resultado = cache.obter(chave)
+    if resultado is None:
+        resultado = prever(nome, X)[0]
+        cache.guardar(chave, resultado)
+    return resultado
+
+def carregar_sob_demanda(em_segundo_plano=True):
+    """
+    Carrega os artefatos sob demanda do pacote ativo (os modelos do
+    scikit-learn dos lotes grandes) depois dos demais, para que nenhuma
+    requisição pague essa carga. Em segundo plano, usa uma thread daemon e
+    retorna a thread; as recargas fazem o mesmo em aquecer_pacote
+    """
+    pacote = registro.pacote
+    
+    def carregar():
+        pacote.aguardar()
+        pacote.carregar_sob_demanda()
+    
+    if not em_segundo_plano:
+        carregar()
+        return None
+    thread = threading.Thread(target=carregar, name='carga-sob-demanda', daemon=True)
+    thread.start()
+    return thread
+
+def carregar_modelos(aguardar=True):
+    """
+    Carrega todos os modelos e dados necessários, em paralelo.
+    
+    Com aguardar=False a função retorna logo após iniciar a carga: cada
+    endpoint espera apenas pelos artefatos que usa, e o /health mostra o
+    estado de cada um. Para trocar os modelos de um processo em execução,
+    use registro.recarregar().
+    """
+    pacote = registro.carregar()
+    
+    if not aguardar:
+        return True
+    
+    if pacote.aguardar():
+        print("✅ Modelos carregados com sucesso!")
+        return True
+    print("❌ Erro ao carregar modelos")
+    return False
+
+# ============================================
+# FUNÇÕES AUXILIARES
+# ============================================
+
+CAMPOS_PERFIL = ['idade', 'escolaridade', 'anos_experiencia',
+                 'area_atuacao', 'habilidades_digitais',
+                 'renda_mensal', 'setor_industria']
+
+CAMPOS_RISCO = ['repetitividade', 'criatividade_requerida',
+                'interacao_humana', 'complexidade_tecnica',
+                'nivel_educacao']
+
+CAMPOS_CLUSTER = ['idade', 'anos_experiencia', 'habilidades_digitais',
+                  'renda_mensal', 'risco_automacao']
+
+# Número máximo de trabalhadores parecidos por busca
+MAXIMO_VIZINHOS = 100
+
+# Diagnóstico completo: os campos do perfil e da ocupação em um único vetor.
+# As features do cluster saem das colunas do perfil mais o risco previsto
+CAMPOS_DIAGNOSTICO = CAMPOS_PERFIL + CAMPOS_RISCO
+COLUNAS_PERFIL = slice(0, len(CAMPOS_PERFIL))
+COLUNAS_RISCO = slice(len(CAMPOS_PERFIL), len(CAMPOS_DIAGNOSTICO))
+COLUNAS_CLUSTER = [CAMPOS_DIAGNOSTICO.index(campo) for campo in CAMPOS_CLUSTER[:-1]]
+
+# Campos categóricos do perfil e o encoder correspondente
+CATEGORICAS_PERFIL = {
+    'escolaridade': 'le_escolaridade',
+    'area_atuacao': 'le_area',
+    'setor_industria': 'le_setor'
+}
+
+CLUSTER_DESCRICOES = {
+    0: 'Profissionais Tradicionais: Baixa qualificação digital, risco alto de automação',
+    1: 'Profissionais em Transição: Qualificação intermediária, risco moderado',
+    2: 'Profissionais Digitais: Alta qualificação, baixo risco de automação',
+    3: 'Profissionais Seniores: Alta experiência e renda, risco variável'
+}
+
+# Número máximo de registros aceitos por requisição de lote
+TAMANHO_MAXIMO_LOTE = 10000
+
+# Cursos já sugeridos guardados por sessão (os mais recentes)
+MAXIMO_CURSOS_VISTOS = 50
+
+def classificar_risco(risco):
+    """Retorna o nível de risco e a mensagem correspondente"""
+    if risco < 30:
+        return 'baixo', 'Profissão com baixo risco de automação'
+    elif risco < 70:
+        return 'médio', 'Profissão com risco moderado de automação'
+    else:
+        return 'alto', 'Profissão com alto risco de automação'
+
+def recomendacao_risco(risco):
+    """Retorna a recomendação de acordo com o risco de automação"""
+    if risco > 50:
+        return 'Busque qualificação em áreas com maior criatividade e interação humana'
+    return 'Continue desenvolvendo suas habilidades'
+
+def extrair_registros(dados):
+    """
+    Extrai a lista de registros de um corpo de requisição de lote.
+    Aceita tanto uma lista JSON quanto um objeto {"registros": [...]}.
+    Retorna None se o formato for inválido.
+    """
+    if isinstance(dados, dict):
+        dados = dados.get('registros')
+    if not isinstance(dados, list):
+        return None
+    return dados
+
+def ler_sessao(dados):
+    """
+    ID de sessão do campo 'sessao' da requisição. Retorna (sessao_id, erro);
+    sessao_id é None sem o campo ou com as sessões desligadas
+    """
+    sessao_id = dados.get('sessao')
+    if sessao_id is None or sessoes is None:
+        return None, None
     try:
-        # Carregar modelos
-        with open(f'{MODELS_DIR}/classificador_perfil.pickle', 'rb') as f:
-            classificador = pickle.load(f)
-        
-        with open(f'{MODELS_DIR}/regressor_risco.pickle', 'rb') as f:
-            regressor = pickle.load(f)
-        
-        with open(f'{MODELS_DIR}/clustering_kmeans.pickle', 'rb') as f:
-            clustering = pickle.load(f)
+        return validar_id(sessao_id), None
+    except SessaoInvalida as e:
+        return None, str(e)
+
+def prever_perfis(X):
+    """
+    Executa o classificador uma única vez sobre X.
+    O perfil previsto é o argmax de predict_proba (o mesmo critério de
+    classificador.predict), mapeado pelo array pré-computado classes_perfil.
+    Retorna (perfis, probabilidades).
+    """
+    classes_perfil = modelo('classes_perfil')
+    probas = prever('classificador', X)
+    perfis = [classes_perfil[i] for i in probas.argmax(axis=1)]
+    return perfis, probas
+
+def prever_riscos(X):
+    """
+    Riscos de automação de X. Com a grade de risco ativa, as linhas de notas
+    inteiras de 0 a 10 são consultadas na grade e só as demais vão ao modelo.
+    """
+    if not GRADE_RISCO:
+        return prever('regressor', X)
+    
+    valores, na_grade = modelo('grade_risco').consultar(X)
+    if na_grade.all():
+        return valores
+    riscos = np.empty(len(na_grade))
+    riscos[na_grade] = valores
+    riscos[~na_grade] = prever('regressor', X[~na_grade])
+    return riscos
+
+def prever_risco_registro(X):
+    """
+    Risco de um único registro: pela grade de risco (notas inteiras de 0 a
+    10), se ativa, ou pelo cache / modelo
+    """
+    risco = modelo('grade_risco').consultar_linha(X[0].tolist()) if GRADE_RISCO else None
+    if risco is None:
+        risco = prever_registro('regressor', X)
+    return risco
+
+def resultado_perfil(proba, classes_perfil):
+    """Perfil (argmax, como em prever_perfis), probabilidades e confiança"""
+    return {
+        'perfil': classes_perfil[proba.argmax()],
+        'probabilidades': {
+            classe: float(prob) for classe, prob in zip(classes_perfil, proba)
+        },
+        'confianca': float(proba.max())
+    }
+
+def resultado_risco(risco):
+    """Risco de automação com o nível, a mensagem e a recomendação"""
+    nivel, mensagem = classificar_risco(risco)
+    return {
+        'risco_automacao': float(risco),
+        'nivel': nivel,
+        'mensagem': mensagem,
+        'recomendacao': recomendacao_risco(risco)
+    }
+
+def resultado_cluster(cluster, caracteristicas):
+    """Cluster com a descrição do segmento e as features usadas"""
+    cluster = int(cluster)
+    return {
+        'cluster': cluster,
+        'descricao': CLUSTER_DESCRICOES.get(cluster, 'Cluster não identificado'),
+        'caracteristicas': caracteristicas
+    }
+
+def chave_versionada(chave):
+    """Chave do cache de respostas na versão de modelos da requisição"""
+    return (registro.atual().versao, *chave)
+
+def resposta_em_cache(chave, gerar_dados):
+    """
+    Responde com o JSON pré-serializado da chave, gerando-o apenas na
+    primeira requisição. Suporta ETag / If-None-Match (304 Not Modified).
+    """
+    corpo, etag = cache_respostas.obter(chave_versionada(chave), lambda: jsonify(gerar_dados()).get_data())
+    
+    resposta = app.response_class(corpo, mimetype='application/json')
+    resposta.set_etag(etag)
+    resposta.cache_control.no_cache = True
+    return resposta.make_conditional(request)
+
+def dados_lote(registros, resultados, erros):
+    """Monta o corpo da resposta de um lote, preservando a ordem dos registros"""
+    itens = []
+    for i in range(len(registros)):
+        if i in erros:
+            itens.append({'indice': i, 'erro': erros[i]})
+        else:
+            itens.append({'indice': i, **resultados[i]})
+
+    return {
+        'total': len(registros),
+        'sucesso': len(registros) - len(erros),
+        'falhas': len(erros),
+        'resultados': itens,
+        'timestamp': datetime.now().isoformat()
+    }
+
+def validar_lote(dados):
+    """Valida o corpo de uma requisição de lote. Retorna (registros, erro)"""
+    marcar('leitura')
+    registros = extrair_registros(dados)
+    if registros is None:
+        return None, 'Body deve ser uma lista de registros ou {"registros": [...]}'
+    if len(registros) > TAMANHO_MAXIMO_LOTE:
+        return None, f'Lote excede o limite de {TAMANHO_MAXIMO_LOTE} registros'
+    registrar_lote(len(registros))
+    marcar('validacao')
+    return registros, None
+
+# ============================================
+# PROCESSAMENTO DAS REQUISIÇÕES
+# ============================================
+# Cada função recebe os dados já lidos da requisição e retorna (corpo, status).
+# São usadas pelos endpoints Flask abaixo e pela versão assíncrona da API
+# (app_async.py); exceções viram respostas 500 em cada servidor.
+
+INFORMACOES_API = {
+    'nome': 'ReSkill+ API',
+    'versao': '1.0.0',
+    'descricao': 'API REST para modelos de IA e Chatbot do ReSkill+',
+    'endpoints': {
+        'GET /': 'Informações da API',
+        'GET /health': 'Status de saúde da API',
+        'GET /metrics': 'Métricas de desempenho (formato Prometheus)',
+        'POST /admin/recarregar': 'Recarga dos modelos e do catálogo sem reiniciar',
+        'POST /api/perfil/prever': 'Predição do perfil do trabalhador',
+        'POST /api/perfil/prever/lote': 'Predição do perfil para um lote de trabalhadores',
+        'POST /api/risco/prever': 'Predição do risco de automação',
+        'POST /api/risco/prever/lote': 'Predição do risco para um lote de ocupações',
+        'POST /api/cluster/segmentar': 'Segmentação de trabalhador',
+        'POST /api/cluster/segmentar/lote': 'Segmentação de um lote de trabalhadores',
+        'POST /api/trabalhadores/similares': 'Trabalhadores de referência mais parecidos',
+        'POST /api/cursos/recomendar': 'Recomendação de cursos',
+        'POST /api/diagnostico': 'Perfil, risco, cluster e cursos de um trabalhador em uma chamada',
+        'POST /api/diagnostico/lote': 'Diagnóstico completo de um lote de trabalhadores',
+        'POST /api/chatbot/interagir': 'Interação com chatbot',
+        'GET /api/cursos/listar': 'Listar todos os cursos',
+        'GET /api/estatisticas': 'Estatísticas dos modelos'
+    }
+}
+
+def processar_health():
+    """
+    Estado de cada modelo; status 200 só quando todos estão prontos. Os
+    artefatos sob demanda são opcionais: ainda não pedidos ou carregando,
+    não impedem o 200
+    """
+    pacote = registro.pacote
+    estados = pacote.estado() if pacote is not None else {}
+    modelos_ok = bool(estados) and all(
+        e['estado'] == 'pronto' or (nome in pacote.sob_demanda and e['estado'] != 'erro')
+        for nome, e in estados.items()
+    )
+    
+    if modelos_ok:
+        status = 'healthy'
+    elif any(e['estado'] == 'carregando' for e in estados.values()):
+        status = 'loading'
+    else:
+        status = 'unhealthy'
+    
+    resposta = {
+        'status': status,
+        'timestamp': datetime.now().isoformat(),
+        'modelos_carregados': modelos_ok,
+        'versao_modelos': registro.estado(),
+        'variante_classificador': VARIANTE_CLASSIFICADOR,
+        'modelos': estados
+    }
+    if agrupadores:
+        resposta['microlotes'] = {nome: agrupador.metricas() for nome, agrupador in agrupadores.items()}
+    if caches_predicoes:
+        resposta['cache_predicoes'] = {nome: cache.metricas() for nome, cache in caches_predicoes.items()}
+    if sessoes is not None:
+        resposta['sessoes'] = {'backend': sessoes.backend, **sessoes.metricas()}
+    
+    return resposta, 200 if modelos_ok else 503
+
+def coletar_estado():
+    """
+    Métricas de estado para o /metrics: carga de cada modelo e contadores dos
+    caches e dos micro-lotes
+    """
+    estados = registro.pacote.estado() if registro.pacote is not None else {}
+    yield ('reskill_modelos_versao', 'gauge', 'Número da versão ativa dos modelos',
+           [((), registro.versao['numero'])] if registro.versao else [])
+    yield ('reskill_recargas_total', 'counter', 'Recargas dos modelos por resultado',
+           [((('resultado', resultado),), total) for resultado, total in registro.recargas.items()])
+    yield ('reskill_modelo_pronto', 'gauge', 'Artefato carregado (1) ou não (0)',
+           [((('modelo', nome),), e['estado'] == 'pronto') for nome, e in estados.items()])
+    yield ('reskill_modelo_carga_segundos', 'gauge', 'Duração da carga de cada artefato',
+           [((('modelo', nome),), round(e['tempo_carga_ms'] / 1000, 6))
+            for nome, e in estados.items() if e.get('tempo_carga_ms') is not None])
+    
+    caches = {nome: cache.metricas() for nome, cache in caches_predicoes.items()}
+    for campo, tipo, ajuda in (('acertos', 'counter', 'Predições respondidas pelo cache'),
+                               ('falhas', 'counter', 'Predições não encontradas no cache'),
+                               ('expiradas', 'counter', 'Predições expiradas pelo TTL'),
+                               ('descartadas', 'counter', 'Predições descartadas pelo limite de tamanho'),
+                               ('entradas', 'gauge', 'Predições guardadas no cache')):
+        sufixo = '_total' if tipo == 'counter' else ''
+        yield (f'reskill_cache_predicoes_{campo}{sufixo}', tipo, ajuda,
+               [((('modelo', nome),), m[campo]) for nome, m in caches.items()])
+    
+    yield ('reskill_cache_respostas_acertos_total', 'counter', 'Respostas servidas do cache de respostas',
+           [((), cache_respostas.acertos)])
+    yield ('reskill_cache_respostas_falhas_total', 'counter', 'Respostas geradas e guardadas no cache',
+           [((), cache_respostas.falhas)])
+    
+    if sessoes is not None:
+        m = sessoes.metricas()
+        for campo, nome, tipo, ajuda in (('sessoes', 'sessoes', 'gauge', 'Sessões de conversa guardadas'),
+                                         ('bytes', 'sessoes_bytes', 'gauge', 'Bytes contabilizados das sessões'),
+                                         ('acertos', 'sessoes_acertos_total', 'counter', 'Sessões encontradas'),
+                                         ('falhas', 'sessoes_falhas_total', 'counter', 'Sessões não encontradas'),
+                                         ('expiradas', 'sessoes_expiradas_total', 'counter', 'Sessões expiradas pelo TTL'),
+                                         ('descartadas', 'sessoes_descartadas_total', 'counter',
+                                          'Sessões descartadas pelos limites de quantidade e memória')):
+            yield (f'reskill_{nome}', tipo, ajuda, [((), m[campo])])
+    
+    lotes = {nome: agrupador.metricas() for nome, agrupador in agrupadores.items()}
+    for campo, tipo, ajuda in (('lotes', 'counter', 'Lotes executados pelos micro-lotes'),
+                               ('pedidos', 'counter', 'Pedidos atendidos pelos micro-lotes'),
+                               ('linhas', 'counter', 'Linhas previstas pelos micro-lotes'),
+                               ('fila', 'gauge', 'Pedidos aguardando na fila dos micro-lotes'),
+                               ('maior_lote', 'gauge', 'Maior lote executado')):
+        sufixo = '_total' if tipo == 'counter' else ''
+        yield (f'reskill_microlotes_{campo}{sufixo}', tipo, ajuda,
+               [((('modelo', nome),), m[campo]) for nome, m in lotes.items()])
+
+registro_metricas.registrar_coletor(coletar_estado)
+
+def processar_recarga(token, aguardar=None):
+    """
+    Pede a recarga dos modelos e do catálogo (ver registro_modelos.py). Com
+    aguardar, responde só depois da troca (ou da falha)
+    """
+    if not ADMIN_TOKEN:
+        return {'erro': 'Recarga pelo endpoint desativada: defina RESKILL_ADMIN_TOKEN'}, 403
+    if not token or not hmac.compare_digest(token, ADMIN_TOKEN):
+        return {'erro': 'Token de administração inválido'}, 403
+    
+    aguardar = aguardar is not None and aguardar.lower() in ('true', '1')
+    if not registro.recarregar('endpoint', aguardar=aguardar):
+        return {'erro': 'Recarga já em andamento', **registro.estado()}, 409
+    estado = registro.estado()
+    if not aguardar:
+        return estado, 202
+    return estado, 200 if estado['ultima_recarga']['resultado'] == 'ok' else 500
+
+def processar_metricas():
+    """Corpo do /metrics (formato texto do Prometheus)"""
+    return registro_metricas.exportar()
+
+def guardar_na_sessao(sessao_id, campos, resposta):
+    """Grava os campos no estado da sessão (se houver) e a identifica na resposta"""
+    if sessao_id is not None:
+        sessoes.atualizar(sessao_id, campos)
+        resposta['sessao'] = sessao_id
+        marcar('sessao')
+    return resposta
+
+def processar_perfil(dados):
+    """Predição do perfil de um trabalhador"""
+    marcar('leitura')
+    # Validar dados obrigatórios
+    for campo in CAMPOS_PERFIL:
+        if campo not in dados:
+            return {'erro': f'Campo obrigatório ausente: {campo}'}, 400
+    sessao_id, erro = ler_sessao(dados)
+    if erro:
+        return {'erro': erro}, 400
+    marcar('validacao')
+    
+    # Codificar variáveis categóricas e montar as features (ver codificacao.py)
+    try:
+        X = modelo('codificadores')['perfil'].vetor(dados)
+    except CategoriaDesconhecida as e:
+        return {'erro': f'Valor inválido para variável categórica: {str(e)}'}, 400
+    except ValorNumericoInvalido as e:
+        return {'erro': str(e)}, 400
+    marcar('codificacao')
+    
+    # Probabilidades em uma única passada pelo modelo (ou do cache)
+    perfil_proba = prever_registro('classificador', X)
+    marcar('predicao')
+    
+    resposta = {
+        **resultado_perfil(perfil_proba, modelo('classes_perfil')),
+        'timestamp': datetime.now().isoformat()
+    }
+    return guardar_na_sessao(sessao_id, {'perfil': resposta['perfil']}, resposta), 200
+
+def calcular_lote_perfil(registros):
+    """Perfis de um lote de registros. Retorna (resultados, erros) por índice"""
+    X, indices, erros = modelo('codificadores')['perfil'].matriz(registros)
+    marcar('codificacao')
+    
+    resultados = {}
+    if indices:
+        probas = prever('classificador', X)
+        marcar('predicao')
+        classes_perfil = modelo('classes_perfil')
         
-        with open(f'{MODELS_DIR}/encoders.pickle', 'rb') as f:
-            encoders = pickle.load(f)
+        for i, proba in zip(indices, probas):
+            resultados[i] = resultado_perfil(proba, classes_perfil)
+    
+    return resultados, erros
+
+def processar_perfil_lote(dados):
+    """Predição do perfil de um lote de trabalhadores"""
+    registros, erro = validar_lote(dados)
+    if erro:
+        return {'erro': erro}, 400
+    
+    resultados, erros = calcular_lote_perfil(registros)
+    return dados_lote(registros, resultados, erros), 200
+
+def processar_risco(dados):
+    """Predição do risco de automação de uma ocupação"""
+    marcar('leitura')
+    # Validar dados obrigatórios
+    for campo in CAMPOS_RISCO:
+        if campo not in dados:
+            return {'erro': f'Campo obrigatório ausente: {campo}'}, 400
+    sessao_id, erro = ler_sessao(dados)
+    if erro:
+        return {'erro': erro}, 400
+    marcar('validacao')
+    
+    # Preparar features
+    try:
+        X = modelo('codificadores')['risco'].vetor(dados)
+    except ValorNumericoInvalido as e:
+        return {'erro': str(e)}, 400
+    marcar('codificacao')
+    
+    risco = prever_risco_registro(X)
+    marcar('predicao')
+    
+    # Classificar nível de risco
+    resposta = {
+        **resultado_risco(risco),
+        'timestamp': datetime.now().isoformat()
+    }
+    return guardar_na_sessao(sessao_id, {'risco': float(risco), 'nivel_risco': resposta['nivel']}, resposta), 200
+
+def calcular_lote_risco(registros):
+    """Riscos de um lote de registros. Retorna (resultados, erros) por índice"""
+    X, indices, erros = modelo('codificadores')['risco'].matriz(registros)
+    marcar('codificacao')
+    
+    resultados = {}
+    if indices:
+        riscos = prever_riscos(X)
+        marcar('predicao')
         
-        with open(f'{MODELS_DIR}/scaler_cluster.pickle', 'rb') as f:
-            scaler = pickle.load(f)
+        for i, risco in zip(indices, riscos):
+            resultados[i] = resultado_risco(risco)
+    
+    return resultados, erros
+
+def processar_risco_lote(dados):
+    """Predição do risco de automação de um lote de ocupações"""
+    registros, erro = validar_lote(dados)
+    if erro:
+        return {'erro': erro}, 400
+    
+    resultados, erros = calcular_lote_risco(registros)
+    return dados_lote(registros, resultados, erros), 200
+
+def processar_cluster(dados):
+    """Segmentação de um trabalhador"""
+    marcar('leitura')
+    # Validar dados obrigatórios
+    for campo in CAMPOS_CLUSTER:
+        if campo not in dados:
+            return {'erro': f'Campo obrigatório ausente: {campo}'}, 400
+    sessao_id, erro = ler_sessao(dados)
+    if erro:
+        return {'erro': erro}, 400
+    marcar('validacao')
+    
+    # Preparar features
+    try:
+        X = modelo('codificadores')['cluster'].vetor(dados)
+    except ValorNumericoInvalido as e:
+        return {'erro': str(e)}, 400
+    marcar('codificacao')
+    
+    # Normalização + predição do cluster
+    cluster = int(prever_registro('segmentador', X))
+    marcar('predicao')
+    
+    resposta = {
+        **resultado_cluster(cluster, {campo: dados[campo] for campo in CAMPOS_CLUSTER}),
+        'timestamp': datetime.now().isoformat()
+    }
+    return guardar_na_sessao(sessao_id, {'cluster': cluster}, resposta), 200
+
+def calcular_lote_cluster(registros):
+    """Clusters de um lote de registros. Retorna (resultados, erros) por índice"""
+    X, indices, erros = modelo('codificadores')['cluster'].matriz(registros)
+    marcar('codificacao')
+    
+    resultados = {}
+    if indices:
+        clusters = prever('segmentador', X)
+        marcar('predicao')
         
-        # Carregar dataset de cursos
-        df_cursos = pd.read_csv(f'{DATA_DIR}/cursos_recomendacao.csv')
+        for i, cluster in zip(indices, clusters):
+            resultados[i] = resultado_cluster(
+                cluster, {campo: registros[i][campo] for campo in CAMPOS_CLUSTER})
+    
+    return resultados, erros
+
+def processar_cluster_lote(dados):
+    """Segmentação de um lote de trabalhadores"""
+    registros, erro = validar_lote(dados)
+    if erro:
+        return {'erro': erro}, 400
+    
+    resultados, erros = calcular_lote_cluster(registros)
+    return dados_lote(registros, resultados, erros), 200
+
+def processar_vizinhos(dados):
+    """
+    Trabalhadores de referência mais parecidos com um trabalhador, com a
+    distância e o perfil de cada um
+    """
+    marcar('leitura')
+    for campo in CAMPOS_CLUSTER:
+        if campo not in dados:
+            return {'erro': f'Campo obrigatório ausente: {campo}'}, 400
+    # NaN e infinitos dariam vizinhos arbitrários e distâncias fora do JSON
+    for campo in CAMPOS_CLUSTER:
+        if numero_finito(dados[campo]) is None:
+            return {'erro': f'Valor numérico inválido para o campo: {campo}'}, 400
+    k = dados.get('k', 5)
+    if not isinstance(k, int) or isinstance(k, bool) or not 1 <= k <= MAXIMO_VIZINHOS:
+        return {'erro': f'k deve ser um inteiro de 1 a {MAXIMO_VIZINHOS}'}, 400
+    aproximado = dados.get('aproximado', False)
+    if not isinstance(aproximado, bool):
+        return {'erro': 'aproximado deve ser true ou false'}, 400
+    marcar('validacao')
+    
+    X = modelo('codificadores')['cluster'].vetor(dados)
+    marcar('codificacao')
+    
+    indice = modelo('vizinhos')
+    distancias, posicoes = indice.buscar(X, k, aproximado)
+    marcar('busca')
+    
+    vizinhos = [
+        {**indice.registro(posicao), 'distancia': round(float(distancia), 4)}
+        for distancia, posicao in zip(distancias, posicoes)
+    ]
+    return {
+        'total': len(vizinhos),
+        'modo': 'aproximado' if aproximado and not indice.forca_bruta else 'exato',
+        'perfis': dict(Counter(vizinho['perfil'] for vizinho in vizinhos).most_common()),
+        'vizinhos': vizinhos,
+        'timestamp': datetime.now().isoformat()
+    }, 200
+
+def processar_recomendacao(dados):
+    """Recomendação de cursos para um perfil"""
+    marcar('leitura')
+    perfil = dados.get('perfil', 'digital_intermediario')
+    area = dados.get('area_interesse', None)
+    nivel = dados.get('nivel_atual', None)
+    top_n = dados.get('top_n', 5)
+    
+    # Consultar o índice (já ordenado por score de relevância)
+    recomendacoes = modelo('indice_cursos').recomendar(perfil, area, nivel, top_n)
+    marcar('processamento')
+    
+    return {
+        'total_encontrados': len(recomendacoes),
+        'cursos': recomendacoes,
+        'timestamp': datetime.now().isoformat()
+    }, 200
+
+def erro_filtros_cursos(registro):
+    """
+    Valida os filtros opcionais de cursos de um registro do diagnóstico
+    (area_interesse, nivel_atual e top_n). Retorna a mensagem de erro ou None
+    """
+    for campo in ('area_interesse', 'nivel_atual'):
+        valor = registro.get(campo)
+        if valor is not None and not isinstance(valor, str):
+            return f'{campo} deve ser um texto'
+    top_n = registro.get('top_n', 5)
+    if not isinstance(top_n, int) or isinstance(top_n, bool) or top_n < 0:
+        return 'top_n deve ser um inteiro não negativo'
+    return None
+
+def resultado_diagnostico(registro, perfil, risco, cluster, indice):
+    """
+    Perfil, risco, cluster e cursos de um trabalhador (resultados de
+    resultado_perfil, resultado_risco e resultado_cluster). Os cursos são os
+    de /api/cursos/recomendar para o perfil previsto, com os filtros
+    opcionais area_interesse, nivel_atual e top_n do registro
+    """
+    cursos = indice.recomendar(perfil['perfil'], registro.get('area_interesse'),
+                               registro.get('nivel_atual'), registro.get('top_n', 5))
+    return {
+        'perfil': perfil,
+        'risco': risco,
+        'cluster': cluster,
+        'cursos': {'total_encontrados': len(cursos), 'cursos': cursos}
+    }
+
+def processar_diagnostico(dados):
+    """
+    Diagnóstico completo de um trabalhador em uma chamada: perfil, risco de
+    automação da ocupação, cluster (com o risco previsto) e cursos para o
+    perfil previsto
+    """
+    marcar('leitura')
+    for campo in CAMPOS_DIAGNOSTICO:
+        if campo not in dados:
+            return {'erro': f'Campo obrigatório ausente: {campo}'}, 400
+    erro = erro_filtros_cursos(dados)
+    if erro:
+        return {'erro': erro}, 400
+    sessao_id, erro = ler_sessao(dados)
+    if erro:
+        return {'erro': erro}, 400
+    marcar('validacao')
+    
+    # Um único vetor com os campos do perfil e da ocupação; cada modelo usa
+    # as suas colunas
+    try:
+        X = modelo('codificadores')['diagnostico'].vetor(dados)
+    except CategoriaDesconhecida as e:
+        return {'erro': f'Valor inválido para variável categórica: {str(e)}'}, 400
+    except ValorNumericoInvalido as e:
+        return {'erro': str(e)}, 400
+    marcar('codificacao')
+    
+    perfil_proba = prever_registro('classificador', X[:, COLUNAS_PERFIL])
+    risco = prever_risco_registro(X[:, COLUNAS_RISCO])
+    X_cluster = np.append(X[:, COLUNAS_CLUSTER], [[risco]], axis=1)
+    cluster = int(prever_registro('segmentador', X_cluster))
+    marcar('predicao')
+    
+    caracteristicas = {campo: dados[campo] for campo in CAMPOS_CLUSTER[:-1]}
+    caracteristicas['risco_automacao'] = float(risco)
+    resposta = {
+        **resultado_diagnostico(dados, resultado_perfil(perfil_proba, modelo('classes_perfil')),
+                                resultado_risco(risco), resultado_cluster(cluster, caracteristicas),
+                                modelo('indice_cursos')),
+        'timestamp': datetime.now().isoformat()
+    }
+    marcar('processamento')
+    
+    campos_sessao = {'perfil': resposta['perfil']['perfil'], 'risco': float(risco),
+                     'nivel_risco': resposta['risco']['nivel'], 'cluster': cluster}
+    return guardar_na_sessao(sessao_id, campos_sessao, resposta), 200
+
+def calcular_lote_diagnostico(registros):
+    """Diagnósticos de um lote de registros. Retorna (resultados, erros) por índice"""
+    X, indices, erros = modelo('codificadores')['diagnostico'].matriz(registros)
+    # Filtros de cursos inválidos viram erros do registro, fora da matriz
+    validos = []
+    for i in indices:
+        erro = erro_filtros_cursos(registros[i])
+        if erro:
+            erros[i] = erro
+        validos.append(erro is None)
+    if not all(validos):
+        X = X[validos]
+        indices = [i for i, valido in zip(indices, validos) if valido]
+    marcar('codificacao')
+    
+    resultados = {}
+    if indices:
+        probas = prever('classificador', X[:, COLUNAS_PERFIL])
+        riscos = prever_riscos(X[:, COLUNAS_RISCO])
+        clusters = prever('segmentador', np.column_stack([X[:, COLUNAS_CLUSTER], riscos]))
+        marcar('predicao')
         
-        print("✅ Modelos carregados com sucesso!")
+        classes_perfil = modelo('classes_perfil')
+        indice = modelo('indice_cursos')
+        for i, proba, risco, cluster in zip(indices, probas, riscos, clusters):
+            caracteristicas = {campo: registros[i][campo] for campo in CAMPOS_CLUSTER[:-1]}
+            caracteristicas['risco_automacao'] = float(risco)
+            resultados[i] = resultado_diagnostico(
+                registros[i], resultado_perfil(proba, classes_perfil), resultado_risco(risco),
+                resultado_cluster(cluster, caracteristicas), indice)
+        marcar('processamento')
+    
+    return resultados, erros
+
+def processar_diagnostico_lote(dados):
+    """Diagnóstico completo de um lote de trabalhadores"""
+    registros, erro = validar_lote(dados)
+    if erro:
+        return {'erro': erro}, 400
+    
+    resultados, erros = calcular_lote_diagnostico(registros)
+    return dados_lote(registros, resultados, erros), 200
+
+def dados_listagem_cursos(perfil, nivel, cursor=0, limite=None):
+    """
+    Cursos do catálogo com os filtros opcionais de perfil e nível. Com cursor
+    ou limite, retorna só a página pedida e o cursor da próxima
+    """
+    indice = modelo('indice_cursos')
+    if not cursor and limite is None:
+        cursos = indice.listar(perfil=perfil, nivel=nivel)
+        return {
+            'total': len(cursos),
+            'cursos': cursos
+        }
+    
+    total = indice.contar(perfil=perfil, nivel=nivel)
+    fim = total if limite is None else min(total, cursor + limite)
+    return {
+        'total': total,
+        'cursos': list(indice.iterar(perfil=perfil, nivel=nivel, inicio=cursor, fim=fim)),
+        'proximo_cursor': fim if fim < total else None
+    }
+
+def processar_chatbot(dados):
+    """
+    Resposta do chatbot a uma mensagem. Com uma sessão, o perfil e o risco
+    previstos antes completam o contexto (o contexto enviado tem
+    precedência) e os cursos já sugeridos não se repetem
+    """
+    marcar('leitura')
+    mensagem = dados.get('mensagem', '')
+    contexto = dados.get('contexto', {})
+    sessao_id, erro = ler_sessao(dados)
+    if erro:
+        return {'erro': erro}, 400
+    
+    vistos = []
+    if sessao_id is not None:
+        estado = sessoes.obter(sessao_id) or {}
+        vistos = estado.pop('cursos_vistos', [])
+        contexto = {**estado, **contexto}
+        marcar('sessao')
+    
+    # Classificação da intenção em uma única passada (ver chatbot.py)
+    resposta, cursos_sugeridos = modelo('chatbot').responder(mensagem, contexto, set(vistos))
+    marcar('processamento')
+    
+    corpo = {
+        'resposta': resposta,
+        'cursos_sugeridos': cursos_sugeridos,
+        'timestamp': datetime.now().isoformat()
+    }
+    if sessao_id is None:
+        return corpo, 200
+    
+    vistos += [curso['id'] for curso in cursos_sugeridos if curso['id'] not in vistos]
+    campos = {'cursos_vistos': vistos[-MAXIMO_CURSOS_VISTOS:]}
+    if 'perfil' in contexto:
+        campos['perfil'] = contexto['perfil']
+    return guardar_na_sessao(sessao_id, campos, corpo), 200
+
+def dados_estatisticas():
+    """Estatísticas do catálogo de cursos"""
+    cursos = modelo('cursos')
+    return {
+        'total_cursos': len(cursos),
+        'cursos_por_perfil': dict(Counter(c['perfil'] for c in cursos)),
+        'cursos_por_nivel': dict(Counter(c['nivel_atual'] for c in cursos)),
+        'modalidades': dict(Counter(c['modalidade'] for c in cursos)),
+        'duracao_media': float(np.mean([c['duracao_horas'] for c in cursos])),
+        'custo_medio': float(np.mean([c['custo'] for c in cursos])),
+        'timestamp': datetime.now().isoformat()
+    }
+
+# ============================================
+# RESPOSTAS EM STREAMING (NDJSON)
+# ============================================
+# Com Accept: application/x-ndjson ou ?stream=true, a listagem de cursos e os
+# endpoints de lote respondem um registro JSON por linha, gerados em blocos:
+# a resposta completa nunca é montada em memória e os primeiros bytes saem
+# assim que o primeiro bloco fica pronto
+
+TIPO_NDJSON = 'application/x-ndjson'
+
+# Registros serializados (e, nos lotes, enviados ao modelo) por bloco
+REGISTROS_POR_BLOCO_NDJSON = 512
+
+ERRO_PAGINACAO = 'Parâmetros de paginação inválidos: cursor deve ser um inteiro não negativo e limite um inteiro positivo'
+
+# Mesmas opções do jsonify (app.json), sem o custo de montar o encoder a cada
+# linha
+codificador_ndjson = json.JSONEncoder(
+    sort_keys=app.json.sort_keys, ensure_ascii=app.json.ensure_ascii,
+    separators=(',', ':'), default=app.json.default
+)
+
+def quer_stream(accept, stream):
+    """True se o cliente pediu NDJSON (cabeçalho Accept ou parâmetro stream)"""
+    if stream is not None and stream.lower() in ('true', '1'):
         return True
-    except Exception as e:
-        print(f"❌ Erro ao carregar modelos: {str(e)}")
+    if not accept:
         return False
+    return parse_accept_header(accept, MIMEAccept).best_match(['application/json', TIPO_NDJSON]) == TIPO_NDJSON
+
+def ler_paginacao(cursor, limite):
+    """
+    Converte os parâmetros cursor e limite. Levanta ValueError se inválidos;
+    limite 0 daria uma página vazia com o próprio cursor como o próximo
+    """
+    cursor = int(cursor) if cursor not in (None, '') else 0
+    limite = int(limite) if limite not in (None, '') else None
+    if cursor < 0 or (limite is not None and limite < 1):
+        raise ValueError(ERRO_PAGINACAO)
+    return cursor, limite
+
+def linhas_ndjson(registros):
+    """Serializa os registros uma linha por registro, em blocos de bytes"""
+    bloco = []
+    for registro in registros:
+        bloco.append(codificador_ndjson.encode(registro))
+        if len(bloco) == REGISTROS_POR_BLOCO_NDJSON:
+            yield ('\n'.join(bloco) + '\n').encode()
+            bloco = []
+    if bloco:
+        yield ('\n'.join(bloco) + '\n').encode()
+
+def stream_listagem_cursos(perfil, nivel, cursor=0, limite=None):
+    """
+    Cursos do filtro, um por linha. Retorna (gerador, cabeçalhos), com o
+    total e o cursor da próxima página nos cabeçalhos
+    """
+    indice = modelo('indice_cursos')
+    total = indice.contar(perfil=perfil, nivel=nivel)
+    fim = total if limite is None else min(total, cursor + limite)
+    cabecalhos = {'X-Total-Registros': str(total)}
+    if fim < total:
+        cabecalhos['X-Proximo-Cursor'] = str(fim)
+    cursos = indice.iterar(perfil=perfil, nivel=nivel, inicio=cursor, fim=fim)
+    return linhas_ndjson(cursos), cabecalhos
+
+def gerar_lote_ndjson(registros, calcular):
+    """
+    Executa calcular em blocos de registros e gera uma linha por registro,
+    no mesmo formato dos itens de 'resultados' da resposta JSON. Um erro
+    inesperado encerra o stream com uma linha {"erro": ...}
+    
+    O stream é gerado depois do fim da requisição: todos os blocos usam o
+    pacote de modelos fixado por ela.
+    """
+    pacote = registro.atual()
+    
+    def itens():
+        for inicio in range(0, len(registros), REGISTROS_POR_BLOCO_NDJSON):
+            bloco = registros[inicio:inicio + REGISTROS_POR_BLOCO_NDJSON]
+            try:
+                with usar_pacote(pacote):
+                    resultados, erros = calcular(bloco)
+            except Exception as e:
+                yield {'erro': str(e)}
+                return
+            for i in range(len(bloco)):
+                if i in erros:
+                    yield {'indice': inicio + i, 'erro': erros[i]}
+                else:
+                    yield {'indice': inicio + i, **resultados[i]}
+    
+    return linhas_ndjson(itens())
+
+def processar_lote_ndjson(dados, calcular):
+    """
+    Valida o lote e retorna (gerador, 200), ou (corpo de erro, 400) antes de
+    começar o stream
+    """
+    registros, erro = validar_lote(dados)
+    if erro:
+        return {'erro': erro}, 400
+    return gerar_lote_ndjson(registros, calcular), 200
 
 # ============================================
 # ENDPOINTS DA API
 # ============================================
 
+# Rota usada nas métricas quando a URL não corresponde a nenhum endpoint
+ROTA_DESCONHECIDA = 'desconhecida'
+
+def rota_atual():
+    return request.url_rule.rule if request.url_rule else ROTA_DESCONHECIDA
+
+# Cada requisição usa do início ao fim o pacote de modelos ativo quando
+# começou, mesmo que uma recarga ative outro no meio dela
+@app.before_request
+def fixar_pacote():
+    g.token_pacote = fixar(registro.pacote)
+
+@app.teardown_request
+def liberar_pacote(erro=None):
+    token = g.pop('token_pacote', None)
+    if token is not None:
+        liberar(token)
+
+# O perfilador é registrado antes das métricas: ele começa antes e grava o
+# perfil depois delas (after_request roda em ordem inversa), então a gravação
+# do arquivo não entra na duração medida
+@app.before_request
+def iniciar_perfil():
+    if perfilador is not None and perfilador.sortear(request.headers.get(CABECALHO_PERFILAR)):
+        g.perfil = perfilador.iniciar()
+
+@app.after_request
+def gravar_perfil(resposta):
+    perfil = g.pop('perfil', None)
+    if perfil is not None:
+        resposta.headers[CABECALHO_PERFIL] = perfilador.encerrar(perfil, rota_atual())
+    return resposta
+
+@app.before_request
+def iniciar_metricas():
+    if METRICAS:
+        iniciar_cronometro(rota_atual())
+
+@app.after_request
+def registrar_metricas(resposta):
+    """Contabiliza a requisição; o tempo desde a última etapa é a serialização"""
+    cronometro = encerrar_cronometro()
+    if cronometro is not None:
+        if cronometro.etapas:
+            cronometro.marcar('serializacao')
+        registro_metricas.registrar(cronometro, request.method, resposta.status_code)
+    return resposta
+
+def pediu_stream():
+    return quer_stream(request.headers.get('Accept'), request.args.get('stream'))
+
+def resposta_lote(dados, processar, calcular):
+    """Resposta JSON do lote ou, se pedido, o stream NDJSON dos resultados"""
+    if pediu_stream():
+        corpo, status = processar_lote_ndjson(dados, calcular)
+        if status == 200:
+            return app.response_class(corpo, mimetype=TIPO_NDJSON)
+    else:
+        corpo, status = processar(dados)
+    return jsonify(corpo), status
+
 @app.route('/')
 def home():
     """Endpoint raiz com informações da API"""
-    return jsonify({
-        'nome': 'ReSkill+ API',
-        'versao': '1.0.0',
-        'descricao': 'API REST para modelos de IA e Chatbot do ReSkill+',
-        'endpoints': {
-            'GET /': 'Informações da API',
-            'GET /health': 'Status de saúde da API',
-            'POST /api/perfil/prever': 'Predição do perfil do trabalhador',
-            'POST /api/risco/prever': 'Predição do risco de automação',
-            'POST /api/cluster/segmentar': 'Segmentação de trabalhador',
-            'POST /api/cursos/recomendar': 'Recomendação de cursos',
-            'POST /api/chatbot/interagir': 'Interação com chatbot',
-            'GET /api/cursos/listar': 'Listar todos os cursos',
-            'GET /api/estatisticas': 'Estatísticas dos modelos'
-        }
-    })
+    return jsonify(INFORMACOES_API)
 
 @app.route('/health')
 def health():
-    """Verifica o status de saúde da API"""
-    modelos_ok = all([
-        classificador is not None,
-        regressor is not None,
-        clustering is not None,
-        encoders is not None,
-        scaler is not None,
-        df_cursos is not None
-    ])
-    
-    return jsonify({
-        'status': 'healthy' if modelos_ok else 'unhealthy',
-        'timestamp': datetime.now().isoformat(),
-        'modelos_carregados': modelos_ok
-    }), 200 if modelos_ok else 503
+    """
+    Verifica o status de saúde da API
+    
+    Informa o estado de cada modelo (carregando, pronto ou erro) e o tempo
+    de carga. O status só é 'healthy' quando todos estão prontos. Com
+    micro-lotes, inclui a profundidade da fila e o tamanho dos lotes.
+    """
+    corpo, status = processar_health()
+    return jsonify(corpo), status
+
+@app.route('/metrics')
+def metrics():
+    """
+    Métricas de desempenho no formato texto do Prometheus
+    
+    Duração das requisições por rota e por etapa (leitura, validação,
+    codificação, predição, serialização), tamanho dos lotes, tempo de carga
+    dos modelos e contadores dos caches e micro-lotes deste processo.
+    """
+    try:
+        return app.response_class(processar_metricas(), content_type=TIPO_METRICAS)
+    
+    except Exception as e:
+        return jsonify({'erro': str(e)}), 500
+
+@app.route('/admin/recarregar', methods=['POST'])
+def recarregar():
+    """
+    Recarrega os modelos e o catálogo de cursos sem reiniciar o processo
+    
+    Exige o cabeçalho X-Admin-Token. A nova versão é carregada em segundo
+    plano, aquecida e então ativada; as requisições em andamento terminam
+    com a versão anterior. Responde 202 de imediato ou, com ?aguardar=true,
+    200 depois da troca (500 se a nova versão falhar e a atual for mantida).
+    Com o Gunicorn, recarrega só o worker que atender a requisição.
+    """
+    try:
+        corpo, status = processar_recarga(request.headers.get('X-Admin-Token'),
+                                          request.args.get('aguardar'))
+        return jsonify(corpo), status
+    
+    except Exception as e:
+        return jsonify({'erro': str(e)}), 500
 
 @app.route('/api/perfil/prever', methods=['POST'])
 def prever_perfil():
@@ -116,55 +1520,35 @@ def prever_perfil():
         "renda_mensal": 5000,
         "setor_industria": "tecnologia"
     }
+    
+    Com o campo opcional "sessao", o perfil previsto fica guardado na sessão
+    para o chatbot.
     """
     try:
-        dados = request.json
-        
-        # Validar dados obrigatórios
-        campos_obrigatorios = ['idade', 'escolaridade', 'anos_experiencia', 
-                               'area_atuacao', 'habilidades_digitais', 
-                               'renda_mensal', 'setor_industria']
-        
-        for campo in campos_obrigatorios:
-            if campo not in dados:
-                return jsonify({'erro': f'Campo obrigatório ausente: {campo}'}), 400
-        
-        # Codificar variáveis categóricas
-        try:
-            escolaridade_enc = encoders['le_escolaridade'].transform([dados['escolaridade']])[0]
-            area_enc = encoders['le_area'].transform([dados['area_atuacao']])[0]
-            setor_enc = encoders['le_setor'].transform([dados['setor_industria']])[0]
-        except ValueError as e:
-            return jsonify({'erro': f'Valor inválido para variável categórica: {str(e)}'}), 400
-        
-        # Preparar features
-        X = [[
-            dados['idade'],
-            escolaridade_enc,
-            dados['anos_experiencia'],
-            area_enc,
-            dados['habilidades_digitais'],
-            dados['renda_mensal'],
-            setor_enc
-        ]]
-        
-        # Predição
-        perfil_pred = classificador.predict(X)[0]
-        perfil_nome = encoders['le_perfil'].inverse_transform([perfil_pred])[0]
-        
-        # Probabilidades
-        perfil_proba = classificador.predict_proba(X)[0]
-        probabilidades = {
-            classe: float(prob) 
-            for classe, prob in zip(encoders['le_perfil'].classes_, perfil_proba)
-        }
-        
-        return jsonify({
-            'perfil': perfil_nome,
-            'probabilidades': probabilidades,
-            'confianca': float(max(perfil_proba)),
-            'timestamp': datetime.now().isoformat()
-        })
+        corpo, status = processar_perfil(request.json)
+        return jsonify(corpo), status
+    
+    except Exception as e:
+        return jsonify({'erro': str(e)}), 500
+
+@app.route('/api/perfil/prever/lote', methods=['POST'])
+def prever_perfil_lote():
+    """
+    Prediz o perfil de um lote de trabalhadores em uma única chamada ao modelo
+    
+    Body JSON esperado:
+    {
+        "registros": [
+            {"idade": 30, "escolaridade": "superior", ...},
+            {"idade": 45, "escolaridade": "medio", ...}
+        ]
+    }
+    
+    Com ?stream=true ou Accept: application/x-ndjson, responde um resultado
+    por linha (NDJSON), calculado em blocos
+    """
+    try:
+        return resposta_lote(request.json, processar_perfil_lote, calcular_lote_perfil)
     
     except Exception as e:
         return jsonify({'erro': str(e)}), 500
@@ -182,49 +1566,35 @@ def prever_risco():
         "complexidade_tecnica": 3,
         "nivel_educacao": 3
     }
+    
+    Com o campo opcional "sessao", o risco previsto fica guardado na sessão
+    para o chatbot.
     """
     try:
-        dados = request.json
-        
-        # Validar dados obrigatórios
-        campos_obrigatorios = ['repetitividade', 'criatividade_requerida', 
-                               'interacao_humana', 'complexidade_tecnica', 
-                               'nivel_educacao']
-        
-        for campo in campos_obrigatorios:
-            if campo not in dados:
-                return jsonify({'erro': f'Campo obrigatório ausente: {campo}'}), 400
-        
-        # Preparar features
-        X = [[
-            dados['repetitividade'],
-            dados['criatividade_requerida'],
-            dados['interacao_humana'],
-            dados['complexidade_tecnica'],
-            dados['nivel_educacao']
-        ]]
-        
-        # Predição
-        risco = regressor.predict(X)[0]
-        
-        # Classificar nível de risco
-        if risco < 30:
-            nivel = 'baixo'
-            mensagem = 'Profissão com baixo risco de automação'
-        elif risco < 70:
-            nivel = 'médio'
-            mensagem = 'Profissão com risco moderado de automação'
-        else:
-            nivel = 'alto'
-            mensagem = 'Profissão com alto risco de automação'
-        
-        return jsonify({
-            'risco_automacao': float(risco),
-            'nivel': nivel,
-            'mensagem': mensagem,
-            'recomendacao': 'Busque qualificação em áreas com maior criatividade e interação humana' if risco > 50 else 'Continue desenvolvendo suas habilidades',
-            'timestamp': datetime.now().isoformat()
-        })
+        corpo, status = processar_risco(request.json)
+        return jsonify(corpo), status
+    
+    except Exception as e:
+        return jsonify({'erro': str(e)}), 500
+
+@app.route('/api/risco/prever/lote', methods=['POST'])
+def prever_risco_lote():
+    """
+    Prediz o risco de automação de um lote de ocupações
+    
+    Body JSON esperado:
+    {
+        "registros": [
+            {"repetitividade": 7, "criatividade_requerida": 3, ...},
+            {"repetitividade": 2, "criatividade_requerida": 9, ...}
+        ]
+    }
+    
+    Com ?stream=true ou Accept: application/x-ndjson, responde um resultado
+    por linha (NDJSON), calculado em blocos
+    """
+    try:
+        return resposta_lote(request.json, processar_risco_lote, calcular_lote_risco)
     
     except Exception as e:
         return jsonify({'erro': str(e)}), 500
@@ -242,53 +1612,34 @@ def segmentar():
         "renda_mensal": 5000,
         "risco_automacao": 25.5
     }
+    
+    Com o campo opcional "sessao", o cluster fica guardado na sessão.
     """
     try:
-        dados = request.json
-        
-        # Validar dados obrigatórios
-        campos_obrigatorios = ['idade', 'anos_experiencia', 'habilidades_digitais', 
-                               'renda_mensal', 'risco_automacao']
-        
-        for campo in campos_obrigatorios:
-            if campo not in dados:
-                return jsonify({'erro': f'Campo obrigatório ausente: {campo}'}), 400
-        
-        # Preparar features
-        X = [[
-            dados['idade'],
-            dados['anos_experiencia'],
-            dados['habilidades_digitais'],
-            dados['renda_mensal'],
-            dados['risco_automacao']
-        ]]
-        
-        # Normalizar
-        X_scaled = scaler.transform(X)
-        
-        # Predição do cluster
-        cluster = int(clustering.predict(X_scaled)[0])
-        
-        # Descrições dos clusters
-        cluster_descricoes = {
-            0: 'Profissionais Tradicionais: Baixa qualificação digital, risco alto de automação',
-            1: 'Profissionais em Transição: Qualificação intermediária, risco moderado',
-            2: 'Profissionais Digitais: Alta qualificação, baixo risco de automação',
-            3: 'Profissionais Seniores: Alta experiência e renda, risco variável'
-        }
-        
-        return jsonify({
-            'cluster': cluster,
-            'descricao': cluster_descricoes.get(cluster, 'Cluster não identificado'),
-            'caracteristicas': {
-                'idade': dados['idade'],
-                'anos_experiencia': dados['anos_experiencia'],
-                'habilidades_digitais': dados['habilidades_digitais'],
-                'renda_mensal': dados['renda_mensal'],
-                'risco_automacao': dados['risco_automacao']
-            },
-            'timestamp': datetime.now().isoformat()
-        })
+        corpo, status = processar_cluster(request.json)
+        return jsonify(corpo), status
+    
+    except Exception as e:
+        return jsonify({'erro': str(e)}), 500
+
+@app.route('/api/cluster/segmentar/lote', methods=['POST'])
+def segmentar_lote():
+    """
+    Segmenta um lote de trabalhadores em clusters
+    
+    Body JSON esperado:
+    {
+        "registros": [
+            {"idade": 30, "anos_experiencia": 5, ...},
+            {"idade": 52, "anos_experiencia": 25, ...}
+        ]
+    }
+    
+    Com ?stream=true ou Accept: application/x-ndjson, responde um resultado
+    por linha (NDJSON), calculado em blocos
+    """
+    try:
+        return resposta_lote(request.json, processar_cluster_lote, calcular_lote_cluster)
     
     except Exception as e:
         return jsonify({'erro': str(e)}), 500
@@ -307,59 +1658,118 @@ def recomendar_cursos():
     }
     """
     try:
-        dados = request.json
-        perfil = dados.get('perfil', 'digital_intermediario')
-        area = dados.get('area_interesse', None)
-        nivel = dados.get('nivel_atual', None)
-        top_n = dados.get('top_n', 5)
-        
-        # Filtrar cursos
-        cursos_filtrados = df_cursos.copy()
-        
-        if perfil:
-            cursos_filtrados = cursos_filtrados[cursos_filtrados['perfil'] == perfil]
-        
-        if area:
-            cursos_filtrados = cursos_filtrados[cursos_filtrados['area_interesse'] == area]
-        
-        if nivel:
-            cursos_filtrados = cursos_filtrados[cursos_filtrados['nivel_atual'] == nivel]
-        
-        # Ordenar por score de relevância
-        cursos_filtrados = cursos_filtrados.sort_values('score_relevancia', ascending=False).head(top_n)
-        
-        # Converter para lista de dicionários
-        recomendacoes = cursos_filtrados.to_dict('records')
-        
-        return jsonify({
-            'total_encontrados': len(recomendacoes),
-            'cursos': recomendacoes,
-            'timestamp': datetime.now().isoformat()
-        })
+        corpo, status = processar_recomendacao(request.json)
+        return jsonify(corpo), status
+    
+    except Exception as e:
+        return jsonify({'erro': str(e)}), 500
+
+@app.route('/api/diagnostico', methods=['POST'])
+def diagnosticar():
+    """
+    Diagnóstico completo de um trabalhador: perfil, risco de automação da
+    ocupação, cluster e cursos, em uma única chamada (o mesmo que chamar
+    /api/perfil/prever, /api/risco/prever, /api/cluster/segmentar com o
+    risco previsto e /api/cursos/recomendar com o perfil previsto)
+    
+    Body JSON esperado:
+    {
+        "idade": 30,
+        "escolaridade": "superior",
+        "anos_experiencia": 5,
+        "area_atuacao": "TI",
+        "habilidades_digitais": 8,
+        "renda_mensal": 5000,
+        "setor_industria": "tecnologia",
+        "repetitividade": 7,
+        "criatividade_requerida": 3,
+        "interacao_humana": 4,
+        "complexidade_tecnica": 3,
+        "nivel_educacao": 3,
+        "area_interesse": "ia_ml",      (opcional)
+        "nivel_atual": "intermediario", (opcional)
+        "top_n": 5                      (opcional)
+    }
+    """
+    try:
+        corpo, status = processar_diagnostico(request.json)
+        return jsonify(corpo), status
+    
+    except Exception as e:
+        return jsonify({'erro': str(e)}), 500
+
+@app.route('/api/diagnostico/lote', methods=['POST'])
+def diagnosticar_lote():
+    """
+    Diagnóstico completo de um lote de trabalhadores
+    
+    Body JSON esperado:
+    {
+        "registros": [
+            {"idade": 30, "escolaridade": "superior", ..., "nivel_educacao": 3},
+            {"idade": 52, "escolaridade": "medio", ..., "nivel_educacao": 2}
+        ]
+    }
+    
+    Com ?stream=true ou Accept: application/x-ndjson, responde um resultado
+    por linha (NDJSON), calculado em blocos
+    """
+    try:
+        return resposta_lote(request.json, processar_diagnostico_lote, calcular_lote_diagnostico)
+    
+    except Exception as e:
+        return jsonify({'erro': str(e)}), 500
+
+@app.route('/api/trabalhadores/similares', methods=['POST'])
+def buscar_similares():
+    """
+    Trabalhadores de referência (data/perfil_trabalhador.csv) mais parecidos
+    com o informado, no espaço normalizado do segmentador
+    
+    Body JSON esperado:
+    {
+        "idade": 30,
+        "anos_experiencia": 5,
+        "habilidades_digitais": 8,
+        "renda_mensal": 5000,
+        "risco_automacao": 25.5,
+        "k": 5,                         (opcional, até 100)
+        "aproximado": false             (opcional)
+    }
+    """
+    try:
+        corpo, status = processar_vizinhos(request.json)
+        return jsonify(corpo), status
     
     except Exception as e:
         return jsonify({'erro': str(e)}), 500
 
 @app.route('/api/cursos/listar', methods=['GET'])
 def listar_cursos():
-    """Lista todos os cursos disponíveis"""
+    """
+    Lista todos os cursos disponíveis
+    
+    Parâmetros opcionais: perfil, nivel, cursor e limite (paginação). Com
+    ?stream=true ou Accept: application/x-ndjson, responde um curso por linha
+    (NDJSON), com o total e o próximo cursor nos cabeçalhos
+    """
     try:
-        # Parâmetros de filtro opcionais
+        # Parâmetros de filtro e de paginação opcionais
         perfil = request.args.get('perfil')
         nivel = request.args.get('nivel')
+        try:
+            cursor, limite = ler_paginacao(request.args.get('cursor'), request.args.get('limite'))
+        except ValueError:
+            return jsonify({'erro': ERRO_PAGINACAO}), 400
         
-        cursos = df_cursos.copy()
-        
-        if perfil:
-            cursos = cursos[cursos['perfil'] == perfil]
-        
-        if nivel:
-            cursos = cursos[cursos['nivel_atual'] == nivel]
-        
-        return jsonify({
-            'total': len(cursos),
-            'cursos': cursos.to_dict('records')
-        })
+        if pediu_stream():
+            corpo, cabecalhos = stream_listagem_cursos(perfil, nivel, cursor, limite)
+            resposta = app.response_class(corpo, mimetype=TIPO_NDJSON, headers=cabecalhos)
+        else:
+            resposta = resposta_em_cache(('cursos_listar', perfil, nivel, cursor, limite),
+                                         lambda: dados_listagem_cursos(perfil, nivel, cursor, limite))
+        resposta.vary.add('Accept')
+        return resposta
     
     except Exception as e:
         return jsonify({'erro': str(e)}), 500
@@ -375,90 +1785,32 @@ def chatbot_interagir():
         "contexto": {
             "perfil": "tech_avancado",
             "nivel": "intermediario"
-        }
+        },
+        "sessao": "a1b2c3"
     }
+    
+    contexto e sessao são opcionais. Com sessao, o perfil e o risco já
+    previstos nessa sessão (campo "sessao" em /api/perfil/prever e
+    /api/risco/prever) completam o contexto e os cursos já sugeridos não se
+    repetem.
     """
     try:
-        dados = request.json
-        mensagem = dados.get('mensagem', '').lower()
-        contexto = dados.get('contexto', {})
-        
-        # Lógica simples de chatbot baseada em palavras-chave
-        resposta = ""
-        cursos_sugeridos = []
-        
-        # Detecção de intenções
-        if any(palavra in mensagem for palavra in ['oi', 'olá', 'hello', 'ola']):
-            resposta = "Olá! Sou o assistente virtual do ReSkill+. Como posso ajudá-lo em sua jornada de requalificação?"
-        
-        elif any(palavra in mensagem for palavra in ['curso', 'aprender', 'estudar', 'qualificação']):
-            perfil = contexto.get('perfil', 'digital_intermediario')
-            
-            # Detectar área de interesse
-            if any(palavra in mensagem for palavra in ['ia', 'inteligência artificial', 'machine learning', 'ml']):
-                cursos = df_cursos[(df_cursos['perfil'] == perfil) & 
-                                  (df_cursos['area_interesse'].str.contains('ia|ml|dados', na=False))].head(3)
-                resposta = f"Excelente escolha! IA é uma área em crescimento. Aqui estão alguns cursos recomendados para seu perfil ({perfil}):"
-            
-            elif any(palavra in mensagem for palavra in ['python', 'programação', 'desenvolvimento']):
-                cursos = df_cursos[(df_cursos['perfil'] == perfil) & 
-                                  (df_cursos['area_interesse'].str.contains('desenvolvimento|mobile|frontend|backend', na=False))].head(3)
-                resposta = "Programação é uma habilidade essencial! Veja esses cursos:"
-            
-            elif any(palavra in mensagem for palavra in ['dados', 'data', 'analytics']):
-                cursos = df_cursos[(df_cursos['perfil'] == perfil) & 
-                                  (df_cursos['area_interesse'].str.contains('dados|analytics|bi', na=False))].head(3)
-                resposta = "Análise de dados é muito valorizada! Confira essas opções:"
-            
-            else:
-                cursos = df_cursos[df_cursos['perfil'] == perfil].head(3)
-                resposta = f"Aqui estão alguns cursos populares para seu perfil ({perfil}):"
-            
-            cursos_sugeridos = cursos.to_dict('records') if not cursos.empty else []
-        
-        elif any(palavra in mensagem for palavra in ['risco', 'automação', 'substituído', 'substituir']):
-            resposta = "A automação está transformando o mercado de trabalho. Para avaliar seu risco, posso analisar características da sua ocupação como repetitividade, criatividade e interação humana. Profissões que exigem criatividade e relacionamento interpessoal tendem a ter menor risco."
-        
-        elif any(palavra in mensagem for palavra in ['ajuda', 'help', 'como funciona']):
-            resposta = """Posso ajudá-lo com:
-            
-            • Recomendação de cursos personalizados
-            • Avaliação do risco de automação da sua profissão
-            • Orientação sobre trilhas de aprendizado
-            • Informações sobre áreas em crescimento
-            
-            O que você gostaria de saber?"""
-        
-        elif any(palavra in mensagem for palavra in ['obrigado', 'valeu', 'thanks']):
-            resposta = "Por nada! Estou aqui para ajudar em sua jornada de requalificação. Boa sorte! 🚀"
-        
-        else:
-            resposta = "Desculpe, não entendi bem. Posso ajudá-lo com recomendações de cursos, avaliação de risco de automação ou informações sobre trilhas de aprendizado. O que você precisa?"
-        
-        return jsonify({
-            'resposta': resposta,
-            'cursos_sugeridos': cursos_sugeridos,
-            'timestamp': datetime.now().isoformat()
-        })
+        corpo, status = processar_chatbot(request.json)
+        return jsonify(corpo), status
     
     except Exception as e:
         return jsonify({'erro': str(e)}), 500
 
 @app.route('/api/estatisticas', methods=['GET'])
 def estatisticas():
-    """Retorna estatísticas dos modelos e dados"""
+    """
+    Retorna estatísticas dos modelos e dados
+    
+    As estatísticas são calculadas uma única vez por carga dos dados;
+    o campo timestamp indica quando foram calculadas.
+    """
     try:
-        stats = {
-            'total_cursos': len(df_cursos),
-            'cursos_por_perfil': df_cursos['perfil'].value_counts().to_dict(),
-            'cursos_por_nivel': df_cursos['nivel_atual'].value_counts().to_dict(),
-            'modalidades': df_cursos['modalidade'].value_counts().to_dict(),
-            'duracao_media': float(df_cursos['duracao_horas'].mean()),
-            'custo_medio': float(df_cursos['custo'].mean()),
-            'timestamp': datetime.now().isoformat()
-        }
-        
-        return jsonify(stats)
+        return resposta_em_cache(('estatisticas',), dados_estatisticas)
     
     except Exception as e:
         return jsonify({'erro': str(e)}), 500
@@ -472,12 +1824,15 @@ if __name__ == '__main__':
     print("Inicializando API ReSkill+...")
     print("="*60)
     
-    # Carregar modelos
-    if carregar_modelos():
-        print("\n🚀 API pronta para uso!")
-        print("📡 Acesse: http://localhost:5000")
-        print("="*60)
-        app.run(debug=True, host='0.0.0.0', port=5000)
-    else:
-        print("\n❌ Erro ao inicializar API. Verifique os modelos.")
-        print("Execute o notebook 'modelos_ia_reskill.ipynb' para gerar os modelos.")
+    # Carregar modelos em segundo plano: cada endpoint aguarda apenas os
+    # modelos que utiliza e o progresso da carga aparece em /health
+    carregar_modelos(aguardar=False)
+    carregar_sob_demanda()
+    if RECARGA_INTERVALO > 0:
+        registro.vigiar(RECARGA_INTERVALO)
+    print("\n🚀 API pronta para uso! Modelos carregando em paralelo (veja /health)")
+    print("📡 Acesse: http://localhost:5000")
+    print("Se algum modelo falhar, execute o notebook 'modelos_ia_reskill.ipynb' para gerá-los.")
+    print("Servidor de desenvolvimento. Em produção: gunicorn -c gunicorn.conf.py wsgi:app")
+    print("="*60)
+    app.run(debug=True, host='0.0.0.0', port=5000)
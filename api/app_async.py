@@ -0,0 +1,461 @@
+"""
+API REST ReSkill+ - versão assíncrona (ASGI)
+Mesmas rotas e mesmo contrato JSON de app.py, servidos por um laço asyncio.
+
+As chamadas aos modelos (perfil, risco e segmentação) rodam em um pool de
+threads limitado, fora do laço de eventos. A leitura do corpo, a
+decodificação e a serialização do JSON e as rotas baratas (chatbot,
+recomendação, listagens em cache, /health e /metrics) ficam no laço, de modo
+que milhares de conexões abertas custam apenas corrotinas e sockets.
+
+Nas respostas NDJSON dos lotes (ver app.py), cada bloco, com a predição e a
+serialização das suas linhas, é produzido no pool; a listagem em NDJSON é
+gerada no laço.
+
+Cada requisição fixa o pacote de modelos ativo (ver registro_modelos.py) até
+o fim, inclusive nos blocos NDJSON gerados no pool: uma recarga não muda os
+modelos de uma resposta já iniciada.
+
+Com o perfilador ligado (ver perfilador.py), só a função de processamento
+das rotas POST é perfilada, na thread em que roda; a leitura e a
+serialização do JSON, feitas no laço, ficam fora do perfil.
+
+Uso:
+    cd api
+    python app_async.py
+    uvicorn app_async:aplicacao --host 0.0.0.0 --port 5000
+
+Variáveis de ambiente:
+    RESKILL_BIND           endereço e porta (padrão 0.0.0.0:5000)
+    RESKILL_ASYNC_THREADS  threads para as chamadas aos modelos (padrão: número de CPUs)
+    RESKILL_ASYNC_FILA     chamadas aos modelos em andamento ou na fila do pool
+                           (padrão 4 x threads); as demais aguardam no laço
+"""
+
+import asyncio
+import contextvars
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qsl
+
+from werkzeug.exceptions import BadRequest, MethodNotAllowed, NotFound, UnsupportedMediaType
+from werkzeug.http import parse_etags
+
+from app import (
+    app, cache_respostas, carregar_modelos, carregar_sob_demanda, INFORMACOES_API,
+    processar_health, processar_perfil, processar_perfil_lote,
+    processar_risco, processar_risco_lote, processar_cluster, processar_cluster_lote,
+    processar_diagnostico, processar_diagnostico_lote, processar_vizinhos,
+    processar_recomendacao, dados_listagem_cursos, processar_chatbot, dados_estatisticas,
+    calcular_lote_perfil, calcular_lote_risco, calcular_lote_cluster, calcular_lote_diagnostico,
+    TIPO_NDJSON, ERRO_PAGINACAO, quer_stream, ler_paginacao, stream_listagem_cursos,
+    processar_lote_ndjson, processar_metricas, registro_metricas, METRICAS, ROTA_DESCONHECIDA,
+    perfilador, SESSOES_BACKEND, registro, chave_versionada, processar_recarga
+)
+from metricas import TIPO_METRICAS, iniciar_cronometro, encerrar_cronometro
+from perfilador import CABECALHO_PERFILAR, CABECALHO_PERFIL
+from registro_modelos import fixar, liberar
+
+# ============================================
+# CONFIGURAÇÃO
+# ============================================
+
+BIND = os.environ.get('RESKILL_BIND', '0.0.0.0:5000')
+THREADS_MODELOS = int(os.environ.get('RESKILL_ASYNC_THREADS', os.cpu_count() or 1))
+FILA_MODELOS = int(os.environ.get('RESKILL_ASYNC_FILA', 4 * THREADS_MODELOS))
+
+# Pool das chamadas aos modelos e limite de chamadas submetidas a ele: acima
+# do limite, as requisições esperam no laço em vez de crescer a fila do pool
+executor = None
+vagas_modelos = None
+
+# Métodos aceitos pelo flask_cors nas respostas de preflight e cabeçalhos
+# expostos ao navegador (os mesmos de CORS(...) em app.py)
+METODOS_CORS = 'DELETE, GET, HEAD, OPTIONS, PATCH, POST, PUT'
+CABECALHOS_EXPOSTOS = 'X-Proximo-Cursor, X-Total-Registros'
+
+# ============================================
+# REQUISIÇÃO E RESPOSTA
+# ============================================
+
+class Resposta:
+    """
+    Status, cabeçalhos e corpo (bytes) de uma resposta HTTP. Em streaming,
+    blocos é um iterador de bytes; com no_pool, cada bloco é produzido no
+    pool dos modelos
+    """
+
+    __slots__ = ('status', 'cabecalhos', 'corpo', 'blocos', 'no_pool')
+
+    def __init__(self, corpo=b'', status=200, cabecalhos=None, blocos=None, no_pool=False):
+        self.status = status
+        self.cabecalhos = cabecalhos if cabecalhos is not None else []
+        self.corpo = corpo
+        self.blocos = blocos
+        self.no_pool = no_pool
+
+
+def serializar(dados):
+    """Mesmos bytes do jsonify do Flask (fora do modo debug)"""
+    return (app.json.dumps(dados, separators=(',', ':')) + '\n').encode()
+
+
+def resposta_json(dados, status=200):
+    return Resposta(serializar(dados), status, [(b'content-type', b'application/json')])
+
+
+def resposta_excecao(excecao):
+    """Página HTML de erro do werkzeug, como o Flask responde"""
+    cabecalhos = [(nome.lower().encode(), valor.encode()) for nome, valor in excecao.get_headers()]
+    return Resposta(excecao.get_body().encode(), excecao.code, cabecalhos)
+
+
+def resposta_ndjson(blocos, cabecalhos=None, no_pool=False):
+    cabecalhos = [(b'content-type', TIPO_NDJSON.encode())] + (cabecalhos or [])
+    return Resposta(status=200, cabecalhos=cabecalhos, blocos=blocos, no_pool=no_pool)
+
+
+def parametros(scope):
+    """Parâmetros da query string (o primeiro valor de cada nome, como request.args.get)"""
+    argumentos = {}
+    for nome, valor in parse_qsl(scope['query_string'].decode('latin-1'), keep_blank_values=True):
+        argumentos.setdefault(nome, valor)
+    return argumentos
+
+
+def pediu_stream(scope, argumentos):
+    return quer_stream(cabecalho(scope, b'accept'), argumentos.get('stream'))
+
+
+def cabecalho(scope, nome):
+    for chave, valor in scope['headers']:
+        if chave == nome:
+            return valor.decode('latin-1')
+    return None
+
+
+async def ler_corpo(receive):
+    partes = []
+    while True:
+        mensagem = await receive()
+        if mensagem['type'] == 'http.disconnect':
+            return None
+        partes.append(mensagem.get('body', b''))
+        if not mensagem.get('more_body', False):
+            return b''.join(partes)
+
+
+def ler_json(scope, corpo):
+    """Equivalente a request.json: exige Content-Type JSON e corpo válido"""
+    tipo = (cabecalho(scope, b'content-type') or '').split(';')[0].strip().lower()
+    if not (tipo == 'application/json' or (tipo.startswith('application/') and tipo.endswith('+json'))):
+        raise UnsupportedMediaType(
+            "Did not attempt to load JSON data because the request Content-Type was not 'application/json'."
+        )
+    try:
+        return json.loads(corpo)
+    except ValueError:
+        raise BadRequest()
+
+
+def resposta_em_cache(scope, chave, gerar_dados):
+    """Corpo pré-serializado compartilhado com app.py, com ETag / If-None-Match"""
+    corpo, etag = cache_respostas.obter(chave_versionada(chave), lambda: serializar(gerar_dados()))
+    cabecalhos = [
+        (b'content-type', b'application/json'),
+        (b'etag', f'"{etag}"'.encode()),
+        (b'cache-control', b'no-cache'),
+    ]
+
+    se_diferente = cabecalho(scope, b'if-none-match')
+    if se_diferente and parse_etags(se_diferente).contains_weak(etag):
+        return Resposta(b'', 304, cabecalhos)
+    return Resposta(corpo, 200, cabecalhos)
+
+
+async def executar_modelo(funcao, *argumentos):
+    """
+    Executa funcao(*argumentos) no pool de threads, respeitando o limite de
+    fila. A função roda no contexto da requisição, para que as etapas
+    marcadas nela entrem nas métricas
+    """
+    contexto = contextvars.copy_context()
+    async with vagas_modelos:
+        return await asyncio.get_running_loop().run_in_executor(
+            executor, contexto.run, funcao, *argumentos)
+
+def perfilada(funcao, rota, arquivos):
+    """
+    funcao com o perfilador ligado durante a chamada, na thread em que ela
+    rodar (laço ou pool). O nome do arquivo gravado é acrescentado a arquivos
+    """
+    def executar(dados):
+        perfil = perfilador.iniciar()
+        try:
+            return funcao(dados)
+        finally:
+            if perfil is not None:
+                arquivos.append(perfilador.encerrar(perfil, rota))
+    return executar
+
+# ============================================
+# ROTAS
+# ============================================
+# Rotas POST: (função, executa_no_pool). As funções de processamento são as
+# mesmas de app.py; só as que chamam os modelos saem do laço
+
+ROTAS_POST = {
+    '/api/perfil/prever': (processar_perfil, True),
+    '/api/perfil/prever/lote': (processar_perfil_lote, True),
+    '/api/risco/prever': (processar_risco, True),
+    '/api/risco/prever/lote': (processar_risco_lote, True),
+    '/api/cluster/segmentar': (processar_cluster, True),
+    '/api/cluster/segmentar/lote': (processar_cluster_lote, True),
+    '/api/trabalhadores/similares': (processar_vizinhos, True),
+    '/api/cursos/recomendar': (processar_recomendacao, False),
+    '/api/diagnostico': (processar_diagnostico, True),
+    '/api/diagnostico/lote': (processar_diagnostico_lote, True),
+    # Com sessões em SQLite, o chatbot lê e grava o arquivo: sai do laço
+    '/api/chatbot/interagir': (processar_chatbot, SESSOES_BACKEND == 'sqlite'),
+}
+
+# Cálculo por bloco das rotas de lote, usado nas respostas NDJSON
+CALCULOS_LOTE = {
+    '/api/perfil/prever/lote': calcular_lote_perfil,
+    '/api/risco/prever/lote': calcular_lote_risco,
+    '/api/cluster/segmentar/lote': calcular_lote_cluster,
+    '/api/diagnostico/lote': calcular_lote_diagnostico,
+}
+
+
+def home(scope):
+    return resposta_json(INFORMACOES_API)
+
+
+def health(scope):
+    corpo, status = processar_health()
+    return resposta_json(corpo, status)
+
+
+def listar_cursos(scope):
+    argumentos = parametros(scope)
+    perfil = argumentos.get('perfil')
+    nivel = argumentos.get('nivel')
+    try:
+        cursor, limite = ler_paginacao(argumentos.get('cursor'), argumentos.get('limite'))
+    except ValueError:
+        return resposta_json({'erro': ERRO_PAGINACAO}, 400)
+
+    if pediu_stream(scope, argumentos):
+        blocos, cabecalhos = stream_listagem_cursos(perfil, nivel, cursor, limite)
+        resposta = resposta_ndjson(blocos, [(nome.lower().encode(), valor.encode())
+                                            for nome, valor in cabecalhos.items()])
+    else:
+        resposta = resposta_em_cache(scope, ('cursos_listar', perfil, nivel, cursor, limite),
+                                     lambda: dados_listagem_cursos(perfil, nivel, cursor, limite))
+    resposta.cabecalhos.append((b'vary', b'Accept'))
+    return resposta
+
+
+def estatisticas(scope):
+    return resposta_em_cache(scope, ('estatisticas',), dados_estatisticas)
+
+
+def metrics(scope):
+    return Resposta(processar_metricas().encode(), 200, [(b'content-type', TIPO_METRICAS.encode())])
+
+
+ROTAS_GET = {
+    '/': home,
+    '/health': health,
+    '/metrics': metrics,
+    '/api/cursos/listar': listar_cursos,
+    '/api/estatisticas': estatisticas,
+}
+
+
+ROTA_RECARGA = '/admin/recarregar'
+
+
+async def recarregar(scope):
+    """Recarga dos modelos; no pool, porque ?aguardar=true bloqueia até a troca"""
+    resultado, status = await executar_modelo(processar_recarga, cabecalho(scope, b'x-admin-token'),
+                                              parametros(scope).get('aguardar'))
+    return resposta_json(resultado, status)
+
+
+def preflight(scope, permitidos):
+    """Resposta automática ao OPTIONS, com os cabeçalhos do flask_cors"""
+    cabecalhos = [(b'content-type', b'text/html; charset=utf-8'), (b'allow', permitidos.encode())]
+    origem = cabecalho(scope, b'origin')
+    metodo_pedido = cabecalho(scope, b'access-control-request-method')
+    if origem and metodo_pedido:
+        cabecalhos.append((b'access-control-allow-origin', origem.encode()))
+        pedidos = cabecalho(scope, b'access-control-request-headers')
+        if pedidos:
+            cabecalhos.append((b'access-control-allow-headers', pedidos.encode()))
+        cabecalhos.append((b'access-control-allow-methods', METODOS_CORS.encode()))
+        cabecalhos.append((b'vary', b'Origin'))
+    return Resposta(b'', 200, cabecalhos)
+
+
+async def atender(scope, receive):
+    """Encaminha a requisição para a rota e monta a resposta"""
+    caminho = scope['path']
+    metodo = scope['method']
+
+    if caminho in ROTAS_POST:
+        if metodo == 'OPTIONS':
+            return preflight(scope, 'POST, OPTIONS')
+        if metodo != 'POST':
+            return resposta_excecao(MethodNotAllowed(valid_methods=['POST', 'OPTIONS']))
+
+        corpo = await ler_corpo(receive)
+        if corpo is None:
+            return None
+        funcao, no_pool = ROTAS_POST[caminho]
+        perfis = []
+        if perfilador is not None and perfilador.sortear(cabecalho(scope, CABECALHO_PERFILAR.lower().encode())):
+            funcao = perfilada(funcao, caminho, perfis)
+        try:
+            dados = ler_json(scope, corpo)
+            if caminho in CALCULOS_LOTE and pediu_stream(scope, parametros(scope)):
+                blocos, status = processar_lote_ndjson(dados, CALCULOS_LOTE[caminho])
+                if status == 200:
+                    return resposta_ndjson(blocos, no_pool=True)
+                return resposta_json(blocos, status)
+            if no_pool:
+                resultado, status = await executar_modelo(funcao, dados)
+            else:
+                resultado, status = funcao(dados)
+            resposta = resposta_json(resultado, status)
+            if perfis:
+                resposta.cabecalhos.append((CABECALHO_PERFIL.lower().encode(), perfis[0].encode()))
+            return resposta
+        except Exception as e:
+            return resposta_json({'erro': str(e)}, 500)
+
+    if caminho == ROTA_RECARGA:
+        if metodo == 'OPTIONS':
+            return preflight(scope, 'POST, OPTIONS')
+        if metodo != 'POST':
+            return resposta_excecao(MethodNotAllowed(valid_methods=['POST', 'OPTIONS']))
+        try:
+            return await recarregar(scope)
+        except Exception as e:
+            return resposta_json({'erro': str(e)}, 500)
+
+    if caminho in ROTAS_GET:
+        if metodo == 'OPTIONS':
+            return preflight(scope, 'GET, HEAD, OPTIONS')
+        if metodo not in ('GET', 'HEAD'):
+            return resposta_excecao(MethodNotAllowed(valid_methods=['GET', 'HEAD', 'OPTIONS']))
+        try:
+            return ROTAS_GET[caminho](scope)
+        except Exception as e:
+            return resposta_json({'erro': str(e)}, 500)
+
+    return resposta_excecao(NotFound())
+
+# ============================================
+# APLICAÇÃO ASGI
+# ============================================
+
+async def ciclo_de_vida(receive, send):
+    """Carrega os modelos na inicialização e libera o pool no encerramento"""
+    global executor, vagas_modelos
+
+    while True:
+        mensagem = await receive()
+        if mensagem['type'] == 'lifespan.startup':
+            executor = ThreadPoolExecutor(max_workers=THREADS_MODELOS, thread_name_prefix='modelos')
+            vagas_modelos = asyncio.Semaphore(FILA_MODELOS)
+            carregados = await asyncio.get_running_loop().run_in_executor(executor, carregar_modelos)
+            if carregados:
+                carregar_sob_demanda()
+                print(f"🚀 API assíncrona pronta: {THREADS_MODELOS} thread(s) para os modelos, "
+                      f"até {FILA_MODELOS} chamadas no pool")
+                await send({'type': 'lifespan.startup.complete'})
+            else:
+                await send({'type': 'lifespan.startup.failed',
+                            'message': 'Erro ao carregar modelos'})
+        elif mensagem['type'] == 'lifespan.shutdown':
+            executor.shutdown(wait=True)
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+
+async def aplicacao(scope, receive, send):
+    if scope['type'] == 'lifespan':
+        await ciclo_de_vida(receive, send)
+        return
+    if scope['type'] != 'http':
+        return
+
+    # A requisição usa o pacote de modelos ativo agora até o fim do envio
+    token = fixar(registro.pacote)
+    try:
+        await responder(scope, receive, send)
+    finally:
+        liberar(token)
+
+
+async def responder(scope, receive, send):
+    if METRICAS:
+        caminho = scope['path']
+        conhecida = caminho in ROTAS_POST or caminho in ROTAS_GET or caminho == ROTA_RECARGA
+        iniciar_cronometro(caminho if conhecida else ROTA_DESCONHECIDA)
+    resposta = await atender(scope, receive)
+    cronometro = encerrar_cronometro()
+    if resposta is None:
+        # Cliente desconectou antes de enviar o corpo
+        return
+    if cronometro is not None:
+        # O tempo desde a última etapa é a serialização (resposta_json)
+        if cronometro.etapas:
+            cronometro.marcar('serializacao')
+        registro_metricas.registrar(cronometro, scope['method'], resposta.status)
+
+    cabecalhos = resposta.cabecalhos
+    if not any(nome == b'access-control-allow-origin' for nome, _ in cabecalhos):
+        cabecalhos.append((b'access-control-allow-origin', b'*'))
+    cabecalhos.append((b'access-control-expose-headers', CABECALHOS_EXPOSTOS.encode()))
+    if resposta.blocos is None and resposta.status != 304:
+        cabecalhos.append((b'content-length', str(len(resposta.corpo)).encode()))
+
+    await send({'type': 'http.response.start', 'status': resposta.status, 'headers': cabecalhos})
+    if scope['method'] == 'HEAD':
+        await send({'type': 'http.response.body', 'body': b''})
+    elif resposta.blocos is not None:
+        await enviar_blocos(send, resposta)
+    else:
+        await send({'type': 'http.response.body', 'body': resposta.corpo})
+
+
+async def enviar_blocos(send, resposta):
+    """Envia cada bloco assim que fica pronto (Transfer-Encoding: chunked)"""
+    while True:
+        if resposta.no_pool:
+            bloco = await executar_modelo(next, resposta.blocos, None)
+        else:
+            bloco = next(resposta.blocos, None)
+        if bloco is None:
+            break
+        await send({'type': 'http.response.body', 'body': bloco, 'more_body': True})
+    await send({'type': 'http.response.body', 'body': b''})
+
+# ============================================
+# INICIALIZAÇÃO
+# ============================================
+
+if __name__ == '__main__':
+    import uvicorn
+
+    host, _, porta = BIND.rpartition(':')
+    print("="*60)
+    print("Inicializando API ReSkill+ (asyncio)...")
+    print("="*60)
+    print(f"📡 Acesse: http://localhost:{porta}")
+    uvicorn.run(aplicacao, host=host or '0.0.0.0', port=int(porta),
+                lifespan='on', access_log=False, backlog=4096)
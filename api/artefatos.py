@@ -0,0 +1,213 @@
+"""
+Formato compacto e versionado dos modelos do ReSkill+
+Os modelos são gravados como arrays .npy planos (árvores, centróides, média e
+escala do scaler) mais um manifesto JSON com versão e checksums. A API abre os
+arrays com mmap: limiares e valores dos nós não são copiados na carga e vários
+processos compartilham as mesmas páginas do arquivo. O scikit-learn não é
+necessário para carregar.
+
+Para exportar os arquivos .pickle existentes para o formato compacto:
+    cd api
+    python artefatos.py
+"""
+
+import hashlib
+import json
+import os
+from datetime import datetime
+
+import numpy as np
+
+from motor_numpy import (
+    ArvoresNumpy, FlorestaClassificadorNumpy, GradientBoostingRegressorNumpy,
+    KMeansNumpy, ScalerNumpy, CodificadorNumpy, CAMPOS_ARVORES, arrays_de_arvores,
+    valor_inicial_gbm
+)
+
+FORMATO = 'reskill-modelos'
+VERSAO_FORMATO = 1
+
+
+class ArtefatoInvalido(ValueError):
+    """Manifesto ausente, versão incompatível ou checksum divergente"""
+
+
+def checksum(caminho):
+    """SHA-256 de um arquivo"""
+    sha = hashlib.sha256()
+    with open(caminho, 'rb') as f:
+        for bloco in iter(lambda: f.read(1 << 20), b''):
+            sha.update(bloco)
+    return sha.hexdigest()
+
+
+def exportar_artefatos(classificador, regressor, clustering, scaler, encoders, diretorio,
+                       variantes=None):
+    """
+    Grava os modelos treinados no formato compacto em diretorio.
+    variantes (nome -> floresta ou árvore) são versões comprimidas do
+    classificador (ver notebooks/compressao.py). Retorna o manifesto gravado.
+    """
+    import sklearn
+
+    os.makedirs(diretorio, exist_ok=True)
+    arquivos = {}
+
+    def salvar(nome, array):
+        caminho = os.path.join(diretorio, f'{nome}.npy')
+        # Grava ao lado e substitui: um processo com a versão anterior aberta
+        # por mmap continua lendo o arquivo antigo até recarregar
+        with open(caminho + '.tmp', 'wb') as f:
+            np.save(f, np.ascontiguousarray(array))
+        os.replace(caminho + '.tmp', caminho)
+        arquivos[nome] = {
+            'dtype': str(array.dtype),
+            'formato': list(array.shape),
+            'sha256': checksum(caminho),
+        }
+
+    floresta, profundidade_floresta = arrays_de_arvores(classificador.estimators_, normalizar=True)
+    for campo in CAMPOS_ARVORES:
+        salvar(f'classificador_{campo}', floresta[campo])
+
+    info_variantes = {}
+    for nome, variante in (variantes or {}).items():
+        arvores_variante, profundidade_variante = arrays_de_arvores(
+            getattr(variante, 'estimators_', [variante]), normalizar=True)
+        for campo in CAMPOS_ARVORES:
+            salvar(f'classificador_{nome}_{campo}', arvores_variante[campo])
+        info_variantes[nome] = {'profundidade': int(profundidade_variante)}
+
+    gbm, profundidade_gbm = arrays_de_arvores(regressor.estimators_[:, 0])
+    for campo in CAMPOS_ARVORES:
+        salvar(f'regressor_{campo}', gbm[campo])
+
+    salvar('clustering_centros', clustering.cluster_centers_.astype(np.float64))
+    salvar('scaler_media', scaler.mean_.astype(np.float64))
+    salvar('scaler_escala', scaler.scale_.astype(np.float64))
+
+    manifesto = {
+        'formato': FORMATO,
+        'versao': VERSAO_FORMATO,
+        'gerado_em': datetime.now().isoformat(),
+        'sklearn_versao': sklearn.__version__,
+        'modelos': {
+            'classificador': {
+                'classes': [int(c) for c in classificador.classes_],
+                'n_features': int(classificador.n_features_in_),
+                'profundidade': int(profundidade_floresta),
+                'variantes': info_variantes,
+            },
+            'regressor': {
+                'valor_inicial': valor_inicial_gbm(regressor),
+                'taxa_aprendizado': float(regressor.learning_rate),
+                'n_features': int(regressor.n_features_in_),
+                'profundidade': int(profundidade_gbm),
+            },
+            'encoders': {
+                nome: [str(c) for c in encoder.classes_]
+                for nome, encoder in encoders.items()
+            },
+        },
+        'arquivos': arquivos,
+    }
+
+    caminho = os.path.join(diretorio, 'manifesto.json')
+    with open(caminho + '.tmp', 'w', encoding='utf-8') as f:
+        json.dump(manifesto, f, ensure_ascii=False, indent=2)
+    os.replace(caminho + '.tmp', caminho)
+
+    return manifesto
+
+
+def carregar_artefatos(diretorio, verificar_checksum=True):
+    """
+    Carrega os modelos do formato compacto, com os arrays abertos por mmap.
+    Lança ArtefatoInvalido se o manifesto não for compatível ou se algum
+    arquivo não corresponder ao checksum. Retorna um dicionário com
+    classificador, variantes_classificador, regressor, clustering, scaler e
+    encoders.
+    """
+    caminho_manifesto = os.path.join(diretorio, 'manifesto.json')
+    try:
+        with open(caminho_manifesto, encoding='utf-8') as f:
+            manifesto = json.load(f)
+    except json.JSONDecodeError as e:
+        raise ArtefatoInvalido(f'Manifesto inválido: {str(e)}')
+
+    if manifesto.get('formato') != FORMATO or manifesto.get('versao') != VERSAO_FORMATO:
+        raise ArtefatoInvalido(
+            f"Formato incompatível: {manifesto.get('formato')} v{manifesto.get('versao')} "
+            f"(esperado {FORMATO} v{VERSAO_FORMATO})"
+        )
+
+    arrays = {}
+    for nome, info in manifesto['arquivos'].items():
+        caminho = os.path.join(diretorio, f'{nome}.npy')
+        if verificar_checksum and checksum(caminho) != info['sha256']:
+            raise ArtefatoInvalido(f'Checksum divergente: {nome}.npy')
+        # Vista ndarray do mapeamento: continua sem cópia, mas a indexação não
+        # passa pelo __getitem__ (em Python) da subclasse np.memmap
+        arrays[nome] = np.load(caminho, mmap_mode='r').view(np.ndarray)
+        if list(arrays[nome].shape) != info['formato'] or str(arrays[nome].dtype) != info['dtype']:
+            raise ArtefatoInvalido(f'Formato divergente: {nome}.npy')
+
+    modelos = manifesto['modelos']
+
+    def arvores(prefixo, info=None):
+        info = info or modelos[prefixo]
+        return ArvoresNumpy(
+            *(arrays[f'{prefixo}_{campo}'] for campo in CAMPOS_ARVORES),
+            profundidade=info['profundidade']
+        )
+
+    classes = np.array(modelos['classificador']['classes'])
+    n_features = modelos['classificador']['n_features']
+
+    return {
+        'classificador': FlorestaClassificadorNumpy(arvores('classificador'), classes, n_features),
+        # Manifestos anteriores à compressão não têm variantes
+        'variantes_classificador': {
+            nome: FlorestaClassificadorNumpy(arvores(f'classificador_{nome}', info), classes, n_features)
+            for nome, info in modelos['classificador'].get('variantes', {}).items()
+        },
+        'regressor': GradientBoostingRegressorNumpy(
+            arvores('regressor'),
+            modelos['regressor']['valor_inicial'],
+            modelos['regressor']['taxa_aprendizado'],
+            modelos['regressor']['n_features']
+        ),
+        'clustering': KMeansNumpy(arrays['clustering_centros']),
+        'scaler': ScalerNumpy(arrays['scaler_media'], arrays['scaler_escala']),
+        'encoders': {
+            nome: CodificadorNumpy(classes)
+            for nome, classes in modelos['encoders'].items()
+        },
+    }
+
+
+if __name__ == '__main__':
+    import glob
+    import pickle
+
+    origem = '../models'
+    destino = '../models/compacto'
+
+    modelos = {}
+    for nome, arquivo in [('classificador', 'classificador_perfil.pickle'),
+                          ('regressor', 'regressor_risco.pickle'),
+                          ('clustering', 'clustering_kmeans.pickle'),
+                          ('scaler', 'scaler_cluster.pickle'),
+                          ('encoders', 'encoders.pickle')]:
+        with open(f'{origem}/{arquivo}', 'rb') as f:
+            modelos[nome] = pickle.load(f)
+
+    # Variantes comprimidas do classificador, se já geradas (ver notebooks/compressao.py)
+    variantes = {}
+    for caminho in sorted(glob.glob(f'{origem}/classificador_perfil_*.pickle')):
+        with open(caminho, 'rb') as f:
+            variantes[os.path.basename(caminho)[len('classificador_perfil_'):-len('.pickle')]] = pickle.load(f)
+
+    manifesto = exportar_artefatos(diretorio=destino, variantes=variantes, **modelos)
+    tamanho = sum(os.path.getsize(os.path.join(destino, f'{nome}.npy')) for nome in manifesto['arquivos'])
+    print(f"✓ Modelos exportados para {destino} ({len(manifesto['arquivos'])} arrays, {tamanho / 1024:.1f} KB)")
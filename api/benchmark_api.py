@@ -0,0 +1,407 @@
+"""
+Benchmark de carga de todos os endpoints da API ReSkill+
+Gera cargas sintéticas a partir dos CSVs de data/ e as envia a cada rota de
+duas formas: pelo test client do Flask (no mesmo processo) e por um servidor
+WSGI local de verdade (Werkzeug com threads, via HTTP). Com --url, mede um
+servidor já em execução (ex.: Gunicorn, ver gunicorn.conf.py). Para cada rota mede
+req/s, latências p50/p95/p99 e a memória alocada por requisição (pico do
+tracemalloc), e grava o resultado em JSON para comparar entre commits.
+
+Uso:
+    cd api
+    python benchmark_api.py [--modo test_client|wsgi|ambos] [--requisicoes 300]
+                            [--clientes 1] [--url http://127.0.0.1:5000]
+                            [--saida arquivo.json] [--comparar resultado_anterior.json]
+"""
+
+import argparse
+import json
+import logging
+import os
+import platform
+import random
+import subprocess
+import sys
+import threading
+import time
+import tracemalloc
+import warnings
+from datetime import datetime
+
+import requests
+from werkzeug.serving import make_server
+
+import app
+from indice_cursos import ler_catalogo
+
+warnings.filterwarnings('ignore')
+
+DATA_DIR = '../data'
+RESULTADOS_DIR = '../benchmarks'
+
+# Registros por requisição nos endpoints de lote
+TAMANHO_LOTE = 50
+
+# Requisições medidas com tracemalloc (a medição deixa tudo mais lento)
+REQUISICOES_MEMORIA = 30
+
+MENSAGENS_CHATBOT = [
+    'Oi, tudo bem?',
+    'Quero fazer cursos de {area}',
+    'Quais cursos de {area} vocês recomendam?',
+    'Qual o risco de automação da profissão de {ocupacao}?',
+    'Tem algum curso sobre {curso}?',
+    'Preciso me qualificar, trabalho como {ocupacao}',
+    'Obrigado pela ajuda!',
+]
+
+# ============================================
+# CARGAS SINTÉTICAS
+# ============================================
+
+class GeradorCargas:
+    """Cargas realistas sorteadas (com pequenas variações) a partir dos CSVs de data/"""
+
+    def __init__(self, semente=42):
+        self.aleatorio = random.Random(semente)
+        self.perfis = ler_catalogo(f'{DATA_DIR}/perfil_trabalhador.csv')
+        self.riscos = ler_catalogo(f'{DATA_DIR}/risco_automacao.csv')
+        self.cursos = ler_catalogo(f'{DATA_DIR}/cursos_recomendacao.csv')
+
+    def _variar(self, valor, amplitude, minimo=0):
+        return max(minimo, valor + self.aleatorio.randint(-amplitude, amplitude))
+
+    def perfil(self):
+        base = self.aleatorio.choice(self.perfis)
+        return {
+            'idade': self._variar(base['idade'], 3, 18),
+            'escolaridade': base['escolaridade'],
+            'anos_experiencia': self._variar(base['anos_experiencia'], 2),
+            'area_atuacao': base['area_atuacao'],
+            'habilidades_digitais': min(10, self._variar(base['habilidades_digitais'], 1)),
+            'renda_mensal': self._variar(base['renda_mensal'], 500, 1000),
+            'setor_industria': base['setor_industria'],
+        }
+
+    def risco(self):
+        base = self.aleatorio.choice(self.riscos)
+        return {campo: base[campo] for campo in app.CAMPOS_RISCO}
+
+    def cluster(self):
+        perfil = self.aleatorio.choice(self.perfis)
+        risco = self.aleatorio.choice(self.riscos)
+        return {
+            'idade': perfil['idade'],
+            'anos_experiencia': perfil['anos_experiencia'],
+            'habilidades_digitais': perfil['habilidades_digitais'],
+            'renda_mensal': perfil['renda_mensal'],
+            'risco_automacao': risco['risco_automacao'],
+        }
+
+    def similares(self):
+        return {**self.cluster(), 'k': self.aleatorio.choice([3, 5, 10])}
+
+    def diagnostico(self):
+        return {**self.perfil(), **self.risco()}
+
+    def lote(self, gerar):
+        return lambda: {'registros': [gerar() for _ in range(TAMANHO_LOTE)]}
+
+    def recomendacao(self):
+        curso = self.aleatorio.choice(self.cursos)
+        dados = {'perfil': curso['perfil'], 'top_n': self.aleatorio.choice([3, 5, 10])}
+        if self.aleatorio.random() < 0.5:
+            dados['area_interesse'] = curso['area_interesse']
+        if self.aleatorio.random() < 0.5:
+            dados['nivel_atual'] = curso['nivel_atual']
+        return dados
+
+    def listagem(self):
+        curso = self.aleatorio.choice(self.cursos)
+        filtros = {}
+        if self.aleatorio.random() < 0.7:
+            filtros['perfil'] = curso['perfil']
+        if self.aleatorio.random() < 0.5:
+            filtros['nivel'] = curso['nivel_atual']
+        return filtros
+
+    def mensagem(self):
+        curso = self.aleatorio.choice(self.cursos)
+        texto = self.aleatorio.choice(MENSAGENS_CHATBOT).format(
+            area=curso['area_interesse'].replace('_', ' '),
+            curso=curso['curso_recomendado'],
+            ocupacao=self.aleatorio.choice(self.riscos)['ocupacao'].replace('_', ' '),
+        )
+        return {'mensagem': texto, 'contexto': {'perfil': curso['perfil']}}
+
+
+def rotas(gerador):
+    """(nome, método, url, gerador da carga ou None). GET usa a carga como query string"""
+    return [
+        ('GET /', 'GET', '/', None),
+        ('GET /health', 'GET', '/health', None),
+        ('POST /api/perfil/prever', 'POST', '/api/perfil/prever', gerador.perfil),
+        ('POST /api/perfil/prever/lote', 'POST', '/api/perfil/prever/lote', gerador.lote(gerador.perfil)),
+        ('POST /api/risco/prever', 'POST', '/api/risco/prever', gerador.risco),
+        ('POST /api/risco/prever/lote', 'POST', '/api/risco/prever/lote', gerador.lote(gerador.risco)),
+        ('POST /api/cluster/segmentar', 'POST', '/api/cluster/segmentar', gerador.cluster),
+        ('POST /api/cluster/segmentar/lote', 'POST', '/api/cluster/segmentar/lote', gerador.lote(gerador.cluster)),
+        ('POST /api/trabalhadores/similares', 'POST', '/api/trabalhadores/similares', gerador.similares),
+        ('POST /api/cursos/recomendar', 'POST', '/api/cursos/recomendar', gerador.recomendacao),
+        ('POST /api/diagnostico', 'POST', '/api/diagnostico', gerador.diagnostico),
+        ('POST /api/diagnostico/lote', 'POST', '/api/diagnostico/lote', gerador.lote(gerador.diagnostico)),
+        ('GET /api/cursos/listar', 'GET', '/api/cursos/listar', gerador.listagem),
+        ('POST /api/chatbot/interagir', 'POST', '/api/chatbot/interagir', gerador.mensagem),
+        ('GET /api/estatisticas', 'GET', '/api/estatisticas', None),
+        # Por último: a exportação é medida com os histogramas de todas as
+        # rotas anteriores já preenchidos
+        ('GET /metrics', 'GET', '/metrics', None),
+    ]
+
+# ============================================
+# CLIENTES
+# ============================================
+
+class ClienteTeste:
+    """Requisições pelo test client do Flask, sem rede"""
+
+    def __init__(self):
+        self.cliente = app.app.test_client()
+
+    def enviar(self, metodo, url, carga):
+        if metodo == 'GET':
+            return self.cliente.get(url, query_string=carga).status_code
+        return self.cliente.post(url, json=carga).status_code
+
+    def fechar(self):
+        pass
+
+
+class ServidorWSGI:
+    """Servidor Werkzeug com threads em uma porta livre, em segundo plano"""
+
+    def __init__(self):
+        logging.getLogger('werkzeug').setLevel(logging.ERROR)
+        self.servidor = make_server('127.0.0.1', 0, app.app, threaded=True)
+        self.url = f'http://127.0.0.1:{self.servidor.server_port}'
+        self.thread = threading.Thread(target=self.servidor.serve_forever, daemon=True)
+        self.thread.start()
+
+    def parar(self):
+        self.servidor.shutdown()
+
+
+class ClienteHTTP:
+    """Requisições HTTP com conexão persistente (uma sessão por cliente)"""
+
+    def __init__(self, url_base):
+        self.url_base = url_base
+        self.sessao = requests.Session()
+
+    def enviar(self, metodo, url, carga):
+        if metodo == 'GET':
+            return self.sessao.get(self.url_base + url, params=carga).status_code
+        return self.sessao.post(self.url_base + url, json=carga).status_code
+
+    def fechar(self):
+        self.sessao.close()
+
+# ============================================
+# MEDIÇÃO
+# ============================================
+
+def percentil(tempos, p):
+    return tempos[min(len(tempos) - 1, int(len(tempos) * p))]
+
+def medir_rota(criar_cliente, metodo, url, cargas, clientes):
+    """Envia as cargas com clientes threads concorrentes e retorna as métricas da rota"""
+    tempos = []
+    falhas = []
+    lock = threading.Lock()
+    partes = [cargas[i::clientes] for i in range(clientes)]
+    barreira = threading.Barrier(clientes + 1)
+
+    def executar(parte):
+        cliente = criar_cliente()
+        locais, erros = [], 0
+        barreira.wait()
+        for carga in parte:
+            inicio = time.perf_counter()
+            status = cliente.enviar(metodo, url, carga)
+            locais.append((time.perf_counter() - inicio) * 1000)
+            erros += status >= 400
+        cliente.fechar()
+        with lock:
+            tempos.extend(locais)
+            falhas.append(erros)
+
+    threads = [threading.Thread(target=executar, args=(parte,)) for parte in partes]
+    for thread in threads:
+        thread.start()
+    barreira.wait()
+    inicio = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    duracao = time.perf_counter() - inicio
+
+    tempos.sort()
+    return {
+        'requisicoes': len(tempos),
+        'falhas': sum(falhas),
+        'req_s': round(len(tempos) / duracao, 1),
+        'p50_ms': round(percentil(tempos, 0.50), 3),
+        'p95_ms': round(percentil(tempos, 0.95), 3),
+        'p99_ms': round(percentil(tempos, 0.99), 3),
+    }
+
+def medir_memoria(cliente, metodo, url, cargas):
+    """Mediana do pico de memória alocada (KB) por requisição, com tracemalloc"""
+    picos = []
+    tracemalloc.start()
+    try:
+        for carga in cargas[:REQUISICOES_MEMORIA]:
+            tracemalloc.reset_peak()
+            antes = tracemalloc.get_traced_memory()[0]
+            cliente.enviar(metodo, url, carga)
+            picos.append(tracemalloc.get_traced_memory()[1] - antes)
+    finally:
+        tracemalloc.stop()
+    picos.sort()
+    return round(picos[len(picos) // 2] / 1024, 1)
+
+def executar_modo(modo, lista_rotas, requisicoes, clientes, url=None):
+    """Mede todas as rotas em um modo (test_client, wsgi ou externo, em url)"""
+    servidor = None
+    if modo == 'wsgi':
+        servidor = ServidorWSGI()
+        url = servidor.url
+    if url:
+        criar_cliente = lambda: ClienteHTTP(url)
+    else:
+        criar_cliente = ClienteTeste
+
+    resultados = {}
+    try:
+        for nome, metodo, rota, gerar in lista_rotas:
+            cargas = [gerar() if gerar else None for _ in range(requisicoes)]
+
+            # Aquecimento (inclui a primeira serialização das respostas em cache)
+            aquecimento = criar_cliente()
+            for carga in cargas[:10]:
+                aquecimento.enviar(metodo, rota, carga)
+
+            resultado = medir_rota(criar_cliente, metodo, rota, cargas, clientes)
+            # A memória de um servidor externo não é visível daqui
+            if modo != 'externo':
+                resultado['memoria_kb'] = medir_memoria(aquecimento, metodo, rota, cargas)
+            aquecimento.fechar()
+
+            resultados[nome] = resultado
+            memoria = resultado.get('memoria_kb')
+            print(f"{modo:<12}{nome:<34}{resultado['req_s']:>9.0f}{resultado['p50_ms']:>9.2f}"
+                  f"{resultado['p95_ms']:>9.2f}{resultado['p99_ms']:>9.2f}"
+                  f"{'-' if memoria is None else f'{memoria:.1f}':>10}{resultado['falhas']:>7}")
+    finally:
+        if servidor is not None:
+            servidor.parar()
+    return resultados
+
+# ============================================
+# RESULTADOS
+# ============================================
+
+def commit_atual():
+    """Hash curto do commit (com -dirty se houver alterações), ou None fora do git"""
+    try:
+        return subprocess.run(
+            ['git', 'describe', '--always', '--dirty'],
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def comparar(atual, anterior):
+    """Mostra a variação de req/s e p99 em relação a um resultado anterior"""
+    print("\n" + "="*78)
+    print(f"Comparação com {anterior.get('commit')} ({anterior.get('gerado_em')})")
+    print("="*78)
+    if anterior.get('parametros') != atual['parametros'] or anterior.get('configuracao') != atual['configuracao']:
+        print("⚠️ Parâmetros ou configuração diferentes: os números não são diretamente comparáveis")
+    print(f"{'Modo':<12}{'Rota':<34}{'req/s':>14}{'p99':>14}")
+    for modo, rotas_modo in atual['resultados'].items():
+        for nome, resultado in rotas_modo.items():
+            antes = anterior.get('resultados', {}).get(modo, {}).get(nome)
+            if not antes:
+                continue
+            vazao = (resultado['req_s'] / antes['req_s'] - 1) * 100
+            p99 = (resultado['p99_ms'] / antes['p99_ms'] - 1) * 100
+            print(f"{modo:<12}{nome:<34}{vazao:>+13.1f}%{p99:>+13.1f}%")
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark de carga da API ReSkill+')
+    parser.add_argument('--modo', choices=['test_client', 'wsgi', 'ambos'], default='ambos')
+    parser.add_argument('--requisicoes', type=int, default=300, help='requisições por rota')
+    parser.add_argument('--clientes', type=int, default=1, help='clientes concorrentes')
+    parser.add_argument('--semente', type=int, default=42)
+    parser.add_argument('--url', help='mede um servidor já em execução (ignora --modo)')
+    parser.add_argument('--saida', help=f'arquivo JSON (padrão: {RESULTADOS_DIR}/api-<commit>.json)')
+    parser.add_argument('--comparar', help='resultado JSON anterior para comparação')
+    args = parser.parse_args()
+
+    if args.url:
+        modos = ['externo']
+    elif not app.carregar_modelos():
+        sys.exit(1)
+    else:
+        modos = ['test_client', 'wsgi'] if args.modo == 'ambos' else [args.modo]
+
+    lista_rotas = rotas(GeradorCargas(args.semente))
+
+    print("\n" + "="*90)
+    print(f"Benchmark da API ({args.requisicoes} requisições por rota, {args.clientes} cliente(s))")
+    print("="*90)
+    print(f"{'Modo':<12}{'Rota':<34}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}"
+          f"{'mem. KB':>10}{'falhas':>7}")
+
+    commit = commit_atual()
+    resultado = {
+        'gerado_em': datetime.now().isoformat(),
+        'commit': commit,
+        'python': platform.python_version(),
+        'plataforma': platform.platform(),
+        'cpus': os.cpu_count(),
+        # A configuração de um servidor externo não é conhecida daqui
+        'configuracao': None if args.url else {
+            'formato_modelos': app.FORMATO_MODELOS,
+            'motor_inferencia': app.MOTOR_INFERENCIA,
+            'limiar_sklearn': app.LIMIAR_SKLEARN,
+            'microlotes': app.MICROLOTES,
+            'cache_predicoes': app.CACHE_PREDICOES_TAMANHO,
+            'grade_risco': app.GRADE_RISCO,
+            'metricas': app.METRICAS,
+        },
+        'parametros': {
+            'requisicoes': args.requisicoes,
+            'clientes': args.clientes,
+            'semente': args.semente,
+            'url': args.url,
+            'tamanho_lote': TAMANHO_LOTE,
+        },
+        'resultados': {
+            modo: executar_modo(modo, lista_rotas, args.requisicoes, args.clientes, args.url)
+            for modo in modos
+        },
+    }
+
+    saida = args.saida or f'{RESULTADOS_DIR}/api-{commit or "local"}.json'
+    os.makedirs(os.path.dirname(os.path.abspath(saida)), exist_ok=True)
+    with open(saida, 'w', encoding='utf-8') as f:
+        json.dump(resultado, f, ensure_ascii=False, indent=2)
+    print(f"\n✓ Resultados salvos em {saida}")
+
+    if args.comparar:
+        with open(args.comparar, encoding='utf-8') as f:
+            comparar(resultado, json.load(f))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,180 @@
+"""
+Benchmark de conexões simultâneas da API ReSkill+
+Abre centenas ou milhares de conexões keep-alive ao mesmo tempo contra um
+servidor já em execução (app_async.py, Gunicorn ou o servidor de
+desenvolvimento) e envia, em cada uma, requisições em sequência à rota
+escolhida. Mostra a vazão, as latências p50/p95/p99, o tempo para abrir as
+conexões e as falhas. O cliente é um laço asyncio com HTTP/1.1 mínimo, para
+que o próprio cliente não limite a concorrência.
+
+Uso:
+    cd api
+    python app_async.py &
+    python benchmark_async.py [--url http://127.0.0.1:5000] [--rota chatbot]
+                              [--conexoes 100,1000] [--requisicoes 5]
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from urllib.parse import urlsplit
+
+from benchmark_api import GeradorCargas, percentil
+
+ROTAS = {
+    'chatbot': ('/api/chatbot/interagir', GeradorCargas.mensagem),
+    'risco': ('/api/risco/prever', GeradorCargas.risco),
+    'perfil': ('/api/perfil/prever', GeradorCargas.perfil),
+}
+
+# Limite para cada requisição (inclui a espera na fila do servidor)
+TIMEOUT = 60
+
+# ============================================
+# CLIENTE
+# ============================================
+
+def montar_requisicao(host, caminho, carga):
+    corpo = json.dumps(carga).encode()
+    cabecalhos = (f'POST {caminho} HTTP/1.1\r\nHost: {host}\r\n'
+                  f'Content-Type: application/json\r\nContent-Length: {len(corpo)}\r\n\r\n')
+    return cabecalhos.encode() + corpo
+
+
+async def ler_resposta(leitor):
+    """
+    Lê uma resposta HTTP com Content-Length. Retorna o status e se o servidor
+    vai fechar a conexão (sem keep-alive)
+    """
+    linha_status = await leitor.readline()
+    if not linha_status:
+        raise ConnectionError('conexão fechada pelo servidor')
+    versao, status = linha_status.split()[:2]
+    fechar = versao == b'HTTP/1.0'
+    tamanho = 0
+    while True:
+        linha = await leitor.readline()
+        if linha in (b'\r\n', b''):
+            break
+        nome, _, valor = linha.partition(b':')
+        nome = nome.strip().lower()
+        if nome == b'content-length':
+            tamanho = int(valor)
+        elif nome == b'connection':
+            fechar = valor.strip().lower() != b'keep-alive'
+    await leitor.readexactly(tamanho)
+    return int(status), fechar
+
+
+async def abrir(host, porta, resultado):
+    t0 = time.perf_counter()
+    conexao = await asyncio.wait_for(asyncio.open_connection(host, porta), TIMEOUT)
+    resultado['abertura'].append(time.perf_counter() - t0)
+    return conexao
+
+
+async def conexao(host, porta, requisicoes, inicio, tempos, resultado):
+    """
+    Uma conexão keep-alive enviando as requisições em sequência. Se o
+    servidor fechar a conexão, abre outra; se ela cair, as requisições
+    restantes contam como falhas
+    """
+    try:
+        leitor, escritor = await abrir(host, porta, resultado)
+    except (OSError, asyncio.TimeoutError):
+        resultado['falhas_conexao'] += 1
+        resultado['falhas'] += len(requisicoes)
+        resultado['prontas'] += 1
+        return
+    resultado['prontas'] += 1
+
+    # Todas as conexões começam a enviar juntas
+    await inicio.wait()
+    enviadas = 0
+    try:
+        for requisicao in requisicoes:
+            t0 = time.perf_counter()
+            escritor.write(requisicao)
+            status, fechar = await asyncio.wait_for(ler_resposta(leitor), TIMEOUT)
+            enviadas += 1
+            if status == 200:
+                tempos.append(time.perf_counter() - t0)
+            else:
+                resultado['falhas'] += 1
+            if fechar and enviadas < len(requisicoes):
+                escritor.close()
+                leitor, escritor = await abrir(host, porta, resultado)
+    except (OSError, ValueError, IndexError, asyncio.IncompleteReadError, asyncio.TimeoutError):
+        resultado['falhas'] += len(requisicoes) - enviadas
+    finally:
+        escritor.close()
+
+
+async def medir(url, rota, conexoes, requisicoes, semente):
+    partes = urlsplit(url)
+    host, porta = partes.hostname, partes.port or 80
+    caminho, gerar = ROTAS[rota]
+    gerador = GeradorCargas(semente)
+    cargas = [
+        [montar_requisicao(partes.netloc, caminho, gerar(gerador)) for _ in range(requisicoes)]
+        for _ in range(conexoes)
+    ]
+
+    tempos = []
+    resultado = {'abertura': [], 'prontas': 0, 'falhas_conexao': 0, 'falhas': 0}
+    inicio = asyncio.Event()
+    tarefas = [
+        asyncio.create_task(conexao(host, porta, cargas[i], inicio, tempos, resultado))
+        for i in range(conexoes)
+    ]
+
+    # Aguarda as conexões serem abertas (ou falharem) antes de liberar o envio
+    while resultado['prontas'] < conexoes:
+        await asyncio.sleep(0.01)
+    t0 = time.perf_counter()
+    inicio.set()
+    await asyncio.gather(*tarefas)
+    duracao = time.perf_counter() - t0
+
+    tempos.sort()
+    abertura = sorted(resultado['abertura'])
+    return {
+        'conexoes': conexoes,
+        'req_s': round(len(tempos) / duracao, 1) if duracao else 0,
+        'p50_ms': round(percentil(tempos, 0.50) * 1000, 2) if tempos else None,
+        'p95_ms': round(percentil(tempos, 0.95) * 1000, 2) if tempos else None,
+        'p99_ms': round(percentil(tempos, 0.99) * 1000, 2) if tempos else None,
+        'abertura_p99_ms': round(percentil(abertura, 0.99) * 1000, 2) if abertura else None,
+        'falhas_conexao': resultado['falhas_conexao'],
+        'falhas': resultado['falhas'],
+    }
+
+# ============================================
+# EXECUÇÃO
+# ============================================
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark de conexões simultâneas da API ReSkill+')
+    parser.add_argument('--url', default='http://127.0.0.1:5000')
+    parser.add_argument('--rota', choices=sorted(ROTAS), default='chatbot')
+    parser.add_argument('--conexoes', default='100,1000',
+                        help='conexões simultâneas, separadas por vírgula')
+    parser.add_argument('--requisicoes', type=int, default=5, help='requisições por conexão')
+    parser.add_argument('--semente', type=int, default=42)
+    args = parser.parse_args()
+
+    print("\n" + "="*90)
+    print(f"Conexões simultâneas em {args.url} ({ROTAS[args.rota][0]}, "
+          f"{args.requisicoes} requisições por conexão)")
+    print("="*90)
+    print(f"{'Conexões':>9}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}"
+          f"{'abertura p99 ms':>17}{'falhas conexão':>16}{'falhas':>8}")
+
+    for conexoes in [int(n) for n in args.conexoes.split(',')]:
+        r = asyncio.run(medir(args.url, args.rota, conexoes, args.requisicoes, args.semente))
+        print(f"{r['conexoes']:>9}{r['req_s']:>9}{r['p50_ms']!s:>9}{r['p95_ms']!s:>9}{r['p99_ms']!s:>9}"
+              f"{r['abertura_p99_ms']!s:>17}{r['falhas_conexao']:>16}{r['falhas']:>8}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+"""
+Benchmark do cache de predições (ver cache_predicoes.py)
+Envia às funções de /api/perfil/prever, /api/risco/prever e
+/api/cluster/segmentar uma sequência de requisições sorteadas de um conjunto
+de entradas distintas (tráfego com repetições), sem cache, com cache e, para
+o risco, com a grade pré-calculada, e mostra as latências e a taxa de acerto.
+
+A grade de risco só entra na comparação com RESKILL_GRADE_RISCO=1.
+
+Uso:
+    cd api
+    [RESKILL_GRADE_RISCO=1] python benchmark_cache.py [requisicoes] [entradas_distintas]
+"""
+
+import random
+import sys
+import time
+import warnings
+
+import app
+from benchmark_api import GeradorCargas, percentil
+from cache_predicoes import CachePredicoes
+
+warnings.filterwarnings('ignore')
+
+ROTAS = [
+    ('/api/perfil/prever', app.processar_perfil, GeradorCargas.perfil, 'classificador'),
+    ('/api/risco/prever', app.processar_risco, GeradorCargas.risco, 'regressor'),
+    ('/api/cluster/segmentar', app.processar_cluster, GeradorCargas.cluster, 'segmentador'),
+]
+
+
+def novos_caches():
+    return {nome: CachePredicoes(app.CACHE_PREDICOES_TAMANHO or 10000, app.CACHE_PREDICOES_TTL)
+            for nome in app.PREDICOES}
+
+
+def medir(processar, cargas):
+    """(média, p50, p99) em ms de processar sobre cada carga, em sequência"""
+    tempos = []
+    for carga in cargas:
+        inicio = time.perf_counter()
+        corpo, status = processar(carga)
+        tempos.append((time.perf_counter() - inicio) * 1000)
+        assert status == 200, corpo
+    media = sum(tempos) / len(tempos)
+    tempos.sort()
+    return media, percentil(tempos, 0.50), percentil(tempos, 0.99)
+
+
+def main():
+    requisicoes = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    distintas = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+
+    if not app.carregar_modelos():
+        sys.exit(1)
+    grade = app.GRADE_RISCO
+
+    print("\n" + "="*76)
+    print(f"Cache de predições: motor {app.MOTOR_INFERENCIA}, {requisicoes} requisições "
+          f"sobre {distintas} entradas distintas")
+    print("="*76)
+    print(f"{'Rota':<26}{'Modo':<8}{'média ms':>10}{'p50 ms':>10}{'p99 ms':>10}{'acertos':>10}")
+
+    gerador = GeradorCargas()
+    aleatorio = random.Random(7)
+    for url, processar, gerar, nome in ROTAS:
+        entradas = [gerar(gerador) for _ in range(distintas)]
+        cargas = [aleatorio.choice(entradas) for _ in range(requisicoes)]
+
+        modos = [('sem', {}, False), ('cache', novos_caches(), False)]
+        if grade and nome == 'regressor':
+            modos.append(('grade', {}, True))
+
+        for modo, caches, com_grade in modos:
+            app.caches_predicoes = caches
+            app.GRADE_RISCO = com_grade
+            media, p50, p99 = medir(processar, cargas)
+            acertos = f"{caches[nome].metricas()['taxa_acerto']:.1%}" if caches else '-'
+            print(f"{url:<26}{modo:<8}{media:>10.3f}{p50:>10.3f}{p99:>10.3f}{acertos:>10}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,158 @@
+"""
+Benchmark do chatbot (endpoint /api/chatbot/interagir)
+Compara a detecção de intenções antiga (substrings + filtros no DataFrame a
+cada mensagem) com o motor de intenções compilado de chatbot.py, sobre um
+corpus de mensagens sintéticas em português
+
+Uso:
+    cd api
+    python benchmark_chatbot.py [quantidade_mensagens]
+"""
+
+import random
+import sys
+import time
+
+import pandas as pd
+
+import app
+from chatbot import Chatbot
+
+INICIOS = ['', 'Oi, ', 'Olá! ', 'Bom dia, ', 'Então, ', 'Por favor, ', 'Hello, ']
+
+PEDIDOS = [
+    'quero aprender sobre {tema}',
+    'tem algum curso de {tema}?',
+    'gostaria de estudar {tema} no meu tempo livre',
+    'qual qualificação em {tema} vocês recomendam?',
+    'quais cursos de {tema} combinam comigo',
+    'meu trabalho corre risco de automação?',
+    'tenho medo de ser substituído por robôs',
+    'a IA vai substituir minha profissão?',
+    'preciso de ajuda',
+    'como funciona a plataforma?',
+    'obrigado pela força',
+    'valeu, ajudou muito',
+    'trabalho numa escola e faço um diário de classe',
+    'sou professora da escola estadual',
+    'meu diário de bordo está cheio',
+    'qual o horário de atendimento?',
+    'moro em Fortaleza e trabalho com vendas',
+]
+
+TEMAS = [
+    'inteligência artificial', 'machine learning', 'IA', 'ML', 'Python',
+    'programação', 'desenvolvimento web', 'dados', 'data science',
+    'analytics', 'marketing digital', 'logística', 'finanças', 'gestão',
+]
+
+PERFIS = ['tech_avancado', 'digital_intermediario', 'tradicional']
+
+def gerar_corpus(quantidade, semente=42):
+    """Gera mensagens sintéticas combinando saudações, pedidos e temas"""
+    aleatorio = random.Random(semente)
+    corpus = []
+    for _ in range(quantidade):
+        mensagem = aleatorio.choice(INICIOS) + aleatorio.choice(PEDIDOS).format(
+            tema=aleatorio.choice(TEMAS)
+        )
+        corpus.append((mensagem, {'perfil': aleatorio.choice(PERFIS)}))
+    return corpus
+
+def responder_antigo(mensagem, contexto):
+    """Lógica anterior do endpoint: substrings e filtros no DataFrame por mensagem"""
+    df_cursos = df_legado
+    mensagem = mensagem.lower()
+    cursos_sugeridos = []
+
+    if any(palavra in mensagem for palavra in ['oi', 'olá', 'hello', 'ola']):
+        return 'saudacao', []
+
+    elif any(palavra in mensagem for palavra in ['curso', 'aprender', 'estudar', 'qualificação']):
+        perfil = contexto.get('perfil', 'digital_intermediario')
+
+        if any(palavra in mensagem for palavra in ['ia', 'inteligência artificial', 'machine learning', 'ml']):
+            cursos = df_cursos[(df_cursos['perfil'] == perfil) &
+                              (df_cursos['area_interesse'].str.contains('ia|ml|dados', na=False))].head(3)
+        elif any(palavra in mensagem for palavra in ['python', 'programação', 'desenvolvimento']):
+            cursos = df_cursos[(df_cursos['perfil'] == perfil) &
+                              (df_cursos['area_interesse'].str.contains('desenvolvimento|mobile|frontend|backend', na=False))].head(3)
+        elif any(palavra in mensagem for palavra in ['dados', 'data', 'analytics']):
+            cursos = df_cursos[(df_cursos['perfil'] == perfil) &
+                              (df_cursos['area_interesse'].str.contains('dados|analytics|bi', na=False))].head(3)
+        else:
+            cursos = df_cursos[df_cursos['perfil'] == perfil].head(3)
+
+        cursos_sugeridos = cursos.to_dict('records') if not cursos.empty else []
+        return 'cursos', cursos_sugeridos
+
+    elif any(palavra in mensagem for palavra in ['risco', 'automação', 'substituído', 'substituir']):
+        return 'risco', []
+    elif any(palavra in mensagem for palavra in ['ajuda', 'help', 'como funciona']):
+        return 'ajuda', []
+    elif any(palavra in mensagem for palavra in ['obrigado', 'valeu', 'thanks']):
+        return 'agradecimento', []
+    return 'desconhecida', []
+
+# Motor de intenções sem o índice de busca textual, para comparar apenas
+# a detecção por palavras-chave
+motor = None
+
+# Catálogo como DataFrame, usado pela implementação antiga
+df_legado = None
+
+def responder_novo(mensagem, contexto):
+    """Motor atual: classificação em uma passada + cursos pré-computados"""
+    intencao, _ = motor.classificar(mensagem)
+    _, cursos = motor.responder(mensagem, contexto)
+    return intencao, cursos
+
+def medir(funcao, corpus):
+    """Retorna (mensagens por segundo, resultados)"""
+    inicio = time.perf_counter()
+    resultados = [funcao(mensagem, contexto) for mensagem, contexto in corpus]
+    return len(corpus) / (time.perf_counter() - inicio), resultados
+
+def main():
+    quantidade = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+
+    global motor, df_legado
+
+    if not app.carregar_modelos():
+        sys.exit(1)
+    motor = Chatbot(app.modelo('cursos'))
+    df_legado = pd.DataFrame(app.modelo('cursos'))
+
+    corpus = gerar_corpus(quantidade)
+    taxa_antiga, antigos = medir(responder_antigo, corpus)
+    taxa_nova, novos = medir(responder_novo, corpus)
+
+    divergencias = [
+        (mensagem, antigo[0], novo[0])
+        for (mensagem, _), antigo, novo in zip(corpus, antigos, novos)
+        if antigo[0] != novo[0]
+    ]
+
+    print("\n" + "="*60)
+    print(f"Benchmark do chatbot ({quantidade} mensagens sintéticas)")
+    print("="*60)
+    print(f"Antes (substrings + pandas):   {taxa_antiga:12,.0f} msg/s")
+    print(f"Depois (regex compilada):      {taxa_nova:12,.0f} msg/s")
+    print(f"Ganho: {taxa_nova / taxa_antiga:.1f}x")
+
+    cursos_diferentes = sum(
+        1 for antigo, novo in zip(antigos, novos)
+        if antigo[0] == novo[0] and antigo[1] != novo[1]
+    )
+
+    print(f"\nIntenções diferentes: {len(divergencias)} de {quantidade}")
+    print(f"Mesma intenção, cursos diferentes: {cursos_diferentes} "
+          "(ex.: 'ia' dentro de 'gostaria' ou 'dia' ativava a área de IA)")
+    exemplos = {}
+    for mensagem, antiga, nova in divergencias:
+        exemplos.setdefault((antiga, nova), mensagem)
+    for (antiga, nova), mensagem in sorted(exemplos.items()):
+        print(f"  {antiga:>13} -> {nova:<13} ex.: {mensagem!r}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,125 @@
+"""
+Micro-benchmark da codificação de features (ver codificacao.py)
+Compara o caminho antigo (LabelEncoder.transform a cada requisição e, no
+lote, lista de linhas convertida em matriz) com o codificador compilado
+(tabelas dict e array pré-alocado), para um perfil e para um lote de perfis.
+
+Uso:
+    cd api
+    python benchmark_codificacao.py [repeticoes] [registros_no_lote]
+"""
+
+import sys
+import warnings
+
+import numpy as np
+
+import app
+from benchmark_api import GeradorCargas
+from benchmark_perfil import PERFIL, medir
+
+warnings.filterwarnings('ignore')
+
+
+def vetor_antigo(dados):
+    """Features de um perfil como eram montadas: um transform por categoria"""
+    encoders = app.modelo('encoders')
+    return [[
+        dados['idade'],
+        encoders['le_escolaridade'].transform([dados['escolaridade']])[0],
+        dados['anos_experiencia'],
+        encoders['le_area'].transform([dados['area_atuacao']])[0],
+        dados['habilidades_digitais'],
+        dados['renda_mensal'],
+        encoders['le_setor'].transform([dados['setor_industria']])[0]
+    ]]
+
+
+def matriz_antiga(registros):
+    """Lote de perfis como era montado: linhas validadas + um transform por coluna"""
+    campos, categoricas = app.CAMPOS_PERFIL, app.CATEGORICAS_PERFIL
+    encoders = app.modelo('encoders')
+    classes = {campo: set(encoders[nome].classes_) for campo, nome in categoricas.items()}
+    linhas, indices_validos, erros = [], [], {}
+
+    for i, registro in enumerate(registros):
+        ausente = next((campo for campo in campos if campo not in registro), None)
+        if ausente:
+            erros[i] = f'Campo obrigatório ausente: {ausente}'
+            continue
+        linha = []
+        erro = None
+        for campo in campos:
+            valor = registro[campo]
+            if campo in categoricas:
+                if not isinstance(valor, str) or valor not in classes[campo]:
+                    erro = f'Valor inválido para variável categórica: {campo}={valor!r}'
+                    break
+                linha.append(valor)
+            else:
+                try:
+                    linha.append(float(valor))
+                except (TypeError, ValueError):
+                    erro = f'Valor numérico inválido para o campo: {campo}'
+                    break
+        if erro:
+            erros[i] = erro
+            continue
+        linhas.append(linha)
+        indices_validos.append(i)
+
+    X = np.empty((len(linhas), len(campos)), dtype=float)
+    if linhas:
+        colunas = list(zip(*linhas))
+        for j, campo in enumerate(campos):
+            if campo in categoricas:
+                X[:, j] = encoders[categoricas[campo]].transform(list(colunas[j]))
+            else:
+                X[:, j] = colunas[j]
+    return X, indices_validos, erros
+
+
+def main():
+    repeticoes = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    n_registros = int(sys.argv[2]) if len(sys.argv) > 2 else 10000
+
+    if not app.carregar_modelos():
+        sys.exit(1)
+
+    codificador = app.modelo('codificadores')['perfil']
+    gerador = GeradorCargas()
+    registros = [gerador.perfil() for _ in range(n_registros)]
+
+    assert np.array_equal(vetor_antigo(PERFIL), codificador.vetor(PERFIL)), \
+        'Os dois caminhos devem produzir as mesmas features'
+    antigo, novo = matriz_antiga(registros), codificador.matriz(registros)
+    assert np.array_equal(antigo[0], novo[0]) and antigo[1:] == novo[1:], \
+        'Os dois caminhos devem produzir o mesmo lote'
+
+    # Aquecimento
+    for _ in range(50):
+        vetor_antigo(PERFIL)
+        codificador.vetor(PERFIL)
+
+    repeticoes_lote = max(repeticoes // 200, 5)
+    resultados = {
+        'Perfil - antes (transform)': medir(lambda: vetor_antigo(PERFIL), repeticoes),
+        'Perfil - depois (codificador)': medir(lambda: codificador.vetor(PERFIL), repeticoes),
+        f'Lote de {n_registros} - antes (transform)': medir(
+            lambda: matriz_antiga(registros), repeticoes_lote),
+        f'Lote de {n_registros} - depois (codificador)': medir(
+            lambda: codificador.matriz(registros), repeticoes_lote),
+    }
+
+    print("\n" + "="*70)
+    print(f"Codificação de features ({repeticoes} repetições, lote com {repeticoes_lote})")
+    print("="*70)
+    for nome, (p50, p95) in resultados.items():
+        print(f"{nome:<40} p50={p50:9.3f} ms  p95={p95:9.3f} ms")
+
+    valores = list(resultados.values())
+    print(f"\nGanho por perfil: {valores[0][0] / valores[1][0]:.1f}x")
+    print(f"Ganho no lote:    {valores[2][0] / valores[3][0]:.1f}x")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,117 @@
+"""
+Benchmark dos micro-lotes de predição (ver agrupador.py)
+Dispara requisições concorrentes a /api/perfil/prever e /api/risco/prever
+(test client, uma thread por cliente) com e sem micro-lotes e mostra a
+vazão, as latências p50/p99 e o tamanho médio dos lotes formados.
+
+O motor de inferência segue RESKILL_MOTOR_INFERENCIA (ver app.py).
+
+Uso:
+    cd api
+    python benchmark_microlotes.py [requisicoes_por_cliente]
+"""
+
+import sys
+import threading
+import time
+import warnings
+
+import app
+from agrupador import AgrupadorLotes
+
+warnings.filterwarnings('ignore')
+
+CONCORRENCIAS = [1, 8, 32]
+
+PERFIL = {
+    "idade": 28,
+    "escolaridade": "superior",
+    "anos_experiencia": 4,
+    "area_atuacao": "TI",
+    "habilidades_digitais": 9,
+    "renda_mensal": 5500,
+    "setor_industria": "tecnologia"
+}
+
+RISCO = {
+    "repetitividade": 8,
+    "criatividade_requerida": 3,
+    "interacao_humana": 4,
+    "complexidade_tecnica": 5,
+    "nivel_educacao": 2
+}
+
+ENDPOINTS = [('/api/perfil/prever', PERFIL), ('/api/risco/prever', RISCO)]
+
+def percentil(tempos, p):
+    return tempos[min(len(tempos) - 1, int(len(tempos) * p))]
+
+def rodar(url, corpo, clientes, requisicoes):
+    """Retorna (req/s, p50, p99) de clientes threads enviando requisicoes cada"""
+    tempos = []
+    lock = threading.Lock()
+    barreira = threading.Barrier(clientes + 1)
+
+    def cliente():
+        teste = app.app.test_client()
+        locais = []
+        barreira.wait()
+        for _ in range(requisicoes):
+            inicio = time.perf_counter()
+            resposta = teste.post(url, json=corpo)
+            locais.append((time.perf_counter() - inicio) * 1000)
+            assert resposta.status_code == 200, resposta.get_json()
+        with lock:
+            tempos.extend(locais)
+
+    threads = [threading.Thread(target=cliente) for _ in range(clientes)]
+    for thread in threads:
+        thread.start()
+    barreira.wait()
+    inicio = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    duracao = time.perf_counter() - inicio
+
+    tempos.sort()
+    return len(tempos) / duracao, percentil(tempos, 0.5), percentil(tempos, 0.99)
+
+def main():
+    requisicoes = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+
+    if not app.carregar_modelos():
+        sys.exit(1)
+
+    # Todas as requisições repetem a mesma entrada: sem o cache de predições,
+    # cada uma chega ao modelo
+    app.caches_predicoes = {}
+
+    com_microlotes = {
+        nome: AgrupadorLotes(funcao, app.MICROLOTES_ESPERA_MS, app.MICROLOTES_TAMANHO, nome)
+        for nome, funcao in app.PREDICOES.items()
+    }
+
+    print("\n" + "="*78)
+    print(f"Micro-lotes: motor {app.MOTOR_INFERENCIA}, espera máxima "
+          f"{app.MICROLOTES_ESPERA_MS} ms, lote máximo {app.MICROLOTES_TAMANHO}")
+    print("="*78)
+    print(f"{'Endpoint':<22}{'Clientes':>9}{'Modo':>8}{'req/s':>9}{'p50 ms':>9}{'p99 ms':>9}{'Lote médio':>12}")
+
+    for url, corpo in ENDPOINTS:
+        for clientes in CONCORRENCIAS:
+            for modo, agrupadores in (('direto', {}), ('lotes', com_microlotes)):
+                app.agrupadores = agrupadores
+                rodar(url, corpo, clientes, 10)
+                antes = {nome: a.metricas() for nome, a in agrupadores.items()}
+                vazao, p50, p99 = rodar(url, corpo, clientes, requisicoes)
+
+                lote = ''
+                if agrupadores:
+                    depois = {nome: a.metricas() for nome, a in agrupadores.items()}
+                    lotes = sum(depois[n]['lotes'] - antes[n]['lotes'] for n in depois)
+                    linhas = sum(depois[n]['linhas'] - antes[n]['linhas'] for n in depois)
+                    lote = f'{linhas / lotes:.1f}' if lotes else '-'
+                print(f"{url:<22}{clientes:>9}{modo:>8}{vazao:>9.0f}{p50:>9.2f}{p99:>9.2f}{lote:>12}")
+
+if __name__ == '__main__':
+    main()
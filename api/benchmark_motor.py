@@ -0,0 +1,96 @@
+"""
+Micro-benchmark do motor de inferência NumPy (ver motor_numpy.py)
+Compara o scikit-learn com o motor NumPy no regressor de risco (GBM), na
+segmentação (StandardScaler + KMeans contra SegmentadorNumpy) e no
+classificador de perfil, com lotes de 1, 100 e 10.000 registros.
+Os modelos NumPy são extraídos dos arquivos .pickle, como faz a API.
+
+Uso:
+    cd api
+    python benchmark_motor.py [repeticoes]
+"""
+
+import pickle
+import sys
+import time
+import warnings
+
+import numpy as np
+
+from motor_numpy import (
+    FlorestaClassificadorNumpy, GradientBoostingRegressorNumpy, SegmentadorNumpy,
+    amostra_verificacao, diferenca_maxima
+)
+
+warnings.filterwarnings('ignore')
+
+MODELS_DIR = '../models'
+TAMANHOS_LOTE = [1, 100, 10000]
+
+def carregar(nome_arquivo):
+    with open(f'{MODELS_DIR}/{nome_arquivo}', 'rb') as f:
+        return pickle.load(f)
+
+def medir(funcao, repeticoes):
+    """Retorna a latência mediana (em ms) de uma função"""
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        tempos.append((time.perf_counter() - inicio) * 1000)
+    tempos.sort()
+    return tempos[len(tempos) // 2]
+
+def main():
+    repeticoes = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+
+    classificador = carregar('classificador_perfil.pickle')
+    regressor = carregar('regressor_risco.pickle')
+    clustering = carregar('clustering_kmeans.pickle')
+    scaler = carregar('scaler_cluster.pickle')
+
+    classificador_np = FlorestaClassificadorNumpy.de_sklearn(classificador)
+    regressor_np = GradientBoostingRegressorNumpy.de_sklearn(regressor)
+    segmentador_np = SegmentadorNumpy(scaler, clustering)
+
+    # (nome, função scikit-learn, função NumPy, gerador de amostras)
+    casos = [
+        ('Risco (GBM)',
+         regressor.predict, regressor_np.predict,
+         lambda n: amostra_verificacao(regressor_np.n_features_in_, regressor_np.arvores, n=n)),
+        ('Segmentação (scaler + KMeans)',
+         lambda X: clustering.predict(scaler.transform(X)), segmentador_np.predict,
+         lambda n: amostra_verificacao(segmentador_np.n_features_in_, media=scaler.mean_,
+                                       escala=scaler.scale_, n=n)),
+        ('Perfil (RandomForest)',
+         classificador.predict_proba, classificador_np.predict_proba,
+         lambda n: amostra_verificacao(classificador_np.n_features_in_, classificador_np.arvores, n=n)),
+    ]
+
+    print("\n" + "="*78)
+    print(f"Benchmark do motor de inferência ({repeticoes} repetições, p50)")
+    print("="*78)
+    print(f"{'Modelo':<32}{'Lote':>7}{'sklearn':>12}{'NumPy':>12}{'Ganho':>8}{'Dif. máx.':>12}")
+
+    for nome, sklearn_fn, numpy_fn, amostra in casos:
+        for tamanho in TAMANHOS_LOTE:
+            X = amostra(tamanho)
+            diferenca = diferenca_maxima(sklearn_fn(X), numpy_fn(X))
+
+            # Lotes grandes: menos repetições para manter o tempo total razoável
+            n = repeticoes if tamanho < 10000 else max(5, repeticoes // 10)
+            for funcao in (sklearn_fn, numpy_fn):
+                funcao(X)
+            antes = medir(lambda: sklearn_fn(X), n)
+            depois = medir(lambda: numpy_fn(X), n)
+
+            print(f"{nome:<32}{tamanho:>7}{antes:>10.3f}ms{depois:>10.3f}ms"
+                  f"{antes / depois:>7.1f}x{diferenca:>12.2e}")
+
+    X = amostra_verificacao(segmentador_np.n_features_in_, media=scaler.mean_,
+                            escala=scaler.scale_, n=100000)
+    divergentes = int(np.sum(clustering.predict(scaler.transform(X)) != segmentador_np.predict(X)))
+    print(f"\nSegmentação: {divergentes} clusters divergentes em {len(X)} amostras")
+
+if __name__ == '__main__':
+    main()
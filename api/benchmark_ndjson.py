@@ -0,0 +1,86 @@
+"""
+Benchmark das respostas em streaming (NDJSON)
+Compara a resposta JSON completa com o stream NDJSON na listagem de cursos
+(catálogo de data/ replicado até o tamanho pedido) e no lote de perfis:
+pico de memória alocada (tracemalloc), tempo até o primeiro bloco e tempo
+total.
+
+Uso:
+    cd api
+    python benchmark_ndjson.py [cursos_no_catalogo] [registros_no_lote]
+"""
+
+import sys
+import time
+import tracemalloc
+import warnings
+
+import app
+from benchmark_api import GeradorCargas
+from indice_cursos import IndiceCursos, ler_catalogo
+
+warnings.filterwarnings('ignore')
+
+
+def medir(gerar_blocos):
+    """
+    (pico de memória em MB, ms até o primeiro bloco, ms total, bytes). Os
+    tempos são medidos em uma passada sem o tracemalloc, que os distorce
+    """
+    inicio = time.perf_counter()
+    primeiro = None
+    total = 0
+    for bloco in gerar_blocos():
+        if primeiro is None:
+            primeiro = time.perf_counter() - inicio
+        total += len(bloco)
+    duracao = time.perf_counter() - inicio
+
+    tracemalloc.start()
+    for _ in gerar_blocos():
+        pass
+    pico = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return pico / 1e6, primeiro * 1000, duracao * 1000, total
+
+
+def imprimir(nome, resultado):
+    pico, primeiro, duracao, total = resultado
+    print(f"{nome:<34}{pico:>10.1f}{primeiro:>14.1f}{duracao:>12.1f}{total / 1e6:>10.1f}")
+
+
+def main():
+    n_cursos = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    n_registros = int(sys.argv[2]) if len(sys.argv) > 2 else 10000
+
+    if not app.carregar_modelos():
+        sys.exit(1)
+
+    catalogo = ler_catalogo(f'{app.DATA_DIR}/cursos_recomendacao.csv')
+    cursos = [dict(curso, id=i) for i in range(n_cursos) for curso in [catalogo[i % len(catalogo)]]]
+    indice = IndiceCursos(cursos)
+    gerador = GeradorCargas()
+    registros = [gerador.perfil() for _ in range(n_registros)]
+
+    print("\n" + "="*80)
+    print(f"Streaming NDJSON ({n_cursos} cursos, lote de {n_registros} perfis)")
+    print("="*80)
+    print(f"{'Resposta':<34}{'pico MB':>10}{'1º bloco ms':>14}{'total ms':>12}{'MB':>10}")
+
+    imprimir('listagem JSON', medir(
+        lambda: [app.app.json.dumps({'total': len(indice), 'cursos': indice.listar()},
+                                    separators=(',', ':')).encode()]
+    ))
+    imprimir('listagem NDJSON', medir(lambda: app.linhas_ndjson(indice.iterar())))
+
+    imprimir('lote de perfis JSON', medir(
+        lambda: [app.app.json.dumps(app.processar_perfil_lote(registros)[0],
+                                    separators=(',', ':')).encode()]
+    ))
+    imprimir('lote de perfis NDJSON', medir(
+        lambda: app.gerar_lote_ndjson(registros, app.calcular_lote_perfil)
+    ))
+
+
+if __name__ == '__main__':
+    main()
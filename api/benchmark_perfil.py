@@ -0,0 +1,101 @@
+"""
+Micro-benchmark da predição de perfil (endpoint /api/perfil/prever)
+Compara o caminho antigo (predict + inverse_transform + predict_proba)
+com o caminho atual (uma única chamada a predict_proba + argmax)
+
+Uso:
+    cd api
+    python benchmark_perfil.py [repeticoes]
+"""
+
+import sys
+import time
+import warnings
+
+import app
+
+warnings.filterwarnings('ignore')
+
+PERFIL = {
+    "idade": 28,
+    "escolaridade": "superior",
+    "anos_experiencia": 4,
+    "area_atuacao": "TI",
+    "habilidades_digitais": 9,
+    "renda_mensal": 5500,
+    "setor_industria": "tecnologia"
+}
+
+def montar_X():
+    """Monta a matriz de 1 linha exatamente como o endpoint"""
+    return app.modelo('codificadores')['perfil'].vetor(PERFIL)
+
+def caminho_antigo(X):
+    """Predição como era feita antes: o modelo é executado duas vezes"""
+    le_perfil = app.modelo('encoders')['le_perfil']
+    classificador = app.modelo('classificador')
+    perfil_pred = classificador.predict(X)[0]
+    perfil_nome = le_perfil.inverse_transform([perfil_pred])[0]
+    perfil_proba = classificador.predict_proba(X)[0]
+    probabilidades = {
+        classe: float(prob)
+        for classe, prob in zip(le_perfil.classes_, perfil_proba)
+    }
+    return perfil_nome, probabilidades
+
+def caminho_novo(X):
+    """Predição atual: uma única passada por predict_proba"""
+    perfis, probas = app.prever_perfis(X)
+    probabilidades = {
+        classe: float(prob)
+        for classe, prob in zip(app.modelo('classes_perfil'), probas[0])
+    }
+    return perfis[0], probabilidades
+
+def medir(funcao, repeticoes):
+    """Retorna a latência mediana e p95 (em ms) de uma função"""
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        tempos.append((time.perf_counter() - inicio) * 1000)
+    tempos.sort()
+    return tempos[len(tempos) // 2], tempos[int(len(tempos) * 0.95)]
+
+def main():
+    repeticoes = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+
+    if not app.carregar_modelos():
+        sys.exit(1)
+
+    X = montar_X()
+    assert caminho_antigo(X) == caminho_novo(X), 'Os dois caminhos devem produzir o mesmo resultado'
+
+    cliente = app.app.test_client()
+
+    # Aquecimento
+    for _ in range(10):
+        caminho_antigo(X)
+        caminho_novo(X)
+        cliente.post('/api/perfil/prever', json=PERFIL)
+
+    resultados = {
+        'Modelo - antes (predict + predict_proba)': medir(lambda: caminho_antigo(X), repeticoes),
+        'Modelo - depois (predict_proba + argmax)': medir(lambda: caminho_novo(X), repeticoes),
+        'Endpoint completo (test client)': medir(
+            lambda: cliente.post('/api/perfil/prever', json=PERFIL), repeticoes
+        )
+    }
+
+    print("\n" + "="*60)
+    print(f"Benchmark de /api/perfil/prever ({repeticoes} repetições)")
+    print("="*60)
+    for nome, (p50, p95) in resultados.items():
+        print(f"{nome:<45} p50={p50:7.3f} ms  p95={p95:7.3f} ms")
+
+    antes = resultados['Modelo - antes (predict + predict_proba)'][0]
+    depois = resultados['Modelo - depois (predict_proba + argmax)'][0]
+    print(f"\nGanho na predição: {antes / depois:.2f}x")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,84 @@
+"""
+Micro-benchmark da busca de trabalhadores parecidos (ver indice_vizinhos.py)
+Mede a construção do índice e a latência de uma busca exata e aproximada
+com os trabalhadores de referência e com bases sintéticas maiores (cada
+registro é um trabalhador real sorteado com ruído), além do recall do modo
+aproximado: a fração dos k vizinhos exatos que ele devolve. Com mais de
+LIMIAR_FORCA_BRUTA registros, compara também a força bruta com a KD-tree.
+
+Uso:
+    cd api
+    python benchmark_vizinhos.py [repeticoes] [k]
+"""
+
+import sys
+import time
+import warnings
+
+import numpy as np
+
+import app
+from benchmark_perfil import medir
+from indice_vizinhos import IndiceVizinhos, LIMIAR_FORCA_BRUTA
+
+warnings.filterwarnings('ignore')
+
+TAMANHOS = [10000, 100000, 1000000]
+
+
+def base_sintetica(indice, n, rng):
+    """n registros sorteados do índice, com ruído de 0,3 desvio-padrão"""
+    pontos = indice.pontos[rng.integers(len(indice), size=n)] + rng.normal(scale=0.3, size=(n, indice.pontos.shape[1]))
+    return pontos * indice.escala + indice.media
+
+
+def recall(aproximado, exato, consultas, k):
+    """Fração média dos k vizinhos exatos devolvidos pelo índice aproximado"""
+    acertos = 0
+    for x in consultas:
+        acertos += len(np.intersect1d(aproximado.buscar(x, k, True)[1], exato.buscar(x, k)[1]))
+    return acertos / (len(consultas) * k)
+
+
+def main():
+    repeticoes = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    k = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+
+    if not app.carregar_modelos():
+        sys.exit(1)
+
+    referencia = app.modelo('vizinhos')
+    rng = np.random.default_rng(42)
+    consultas = base_sintetica(referencia, repeticoes, rng)
+
+    def latencias(indice, aproximado=False):
+        posicao = iter(range(10 ** 9))
+        return medir(lambda: indice.buscar(consultas[next(posicao) % len(consultas)], k, aproximado),
+                     repeticoes)
+
+    linhas = [('Referência', len(referencia), 'força bruta', 0.0, latencias(referencia), None, None)]
+    for n in TAMANHOS:
+        X = base_sintetica(referencia, n, rng)
+        inicio = time.perf_counter()
+        indice = IndiceVizinhos(X, {}, referencia.media, referencia.escala, app.VIZINHOS_EPS)
+        construcao = (time.perf_counter() - inicio) * 1000
+        forca_bruta = IndiceVizinhos(X, {}, referencia.media, referencia.escala, limiar=n)
+        linhas.append(('Sintética', n, 'força bruta', 0.0,
+                       medir(lambda: forca_bruta.buscar(consultas[0], k), max(repeticoes // 100, 5)),
+                       None, None))
+        linhas.append(('Sintética', n, 'KD-tree', construcao, latencias(indice),
+                       latencias(indice, True), recall(indice, forca_bruta, consultas[:200], k)))
+
+    print("\n" + "="*100)
+    print(f"Busca dos {k} vizinhos mais próximos ({repeticoes} buscas, eps={app.VIZINHOS_EPS}, "
+          f"força bruta até {LIMIAR_FORCA_BRUTA} registros)")
+    print("="*100)
+    for base, n, metodo, construcao, exato, aproximado, acerto in linhas:
+        texto = f"{base:<11}{n:>9} {metodo:<12} construção={construcao:8.1f} ms  exata p50={exato[0]:7.3f} ms"
+        if aproximado is not None:
+            texto += f"  aproximada p50={aproximado[0]:7.3f} ms  recall={acerto:.3f}"
+        print(texto)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,206 @@
+"""
+Busca textual de cursos (TF-IDF) para o chatbot ReSkill+
+O índice é construído offline a partir do catálogo e salvo em models/busca_cursos/;
+a API apenas o carrega (com mmap) e responde perguntas livres por similaridade do cosseno
+
+Para (re)construir o índice:
+    cd api
+    python busca_cursos.py
+"""
+
+import hashlib
+import json
+import os
+import re
+
+import numpy as np
+from scipy.sparse import csr_matrix
+
+from chatbot import normalizar
+
+VERSAO_INDICE = 1
+
+# Campos do catálogo usados como texto de cada curso
+CAMPOS_TEXTO = ['curso_recomendado', 'area_interesse', 'modalidade']
+
+# Palavras muito comuns nas perguntas que não ajudam a encontrar cursos
+STOPWORDS = {
+    'a', 'ao', 'aos', 'as', 'com', 'como', 'da', 'das', 'de', 'do', 'dos',
+    'e', 'em', 'eu', 'gostaria', 'me', 'meu', 'minha', 'na', 'nas', 'no',
+    'nos', 'o', 'os', 'ou', 'para', 'por', 'pra', 'preciso', 'quais', 'qual',
+    'quero', 'sobre', 'tem', 'um', 'uma', 'voce', 'voces',
+}
+
+ARQUIVOS_MATRIZ = ['dados', 'indices', 'indptr']
+
+
+def analisar(texto):
+    """
+    Transforma o texto em termos para o TF-IDF: palavras sem acentos e
+    n-gramas de 3 a 5 caracteres de cada palavra, o que aproxima variações
+    como 'logística' / 'logistico' ou 'automação' / 'automacao_industrial'
+    """
+    palavras = re.findall(r'[a-z0-9]+', normalizar(texto).replace('_', ' '))
+    termos = []
+    for palavra in palavras:
+        if palavra in STOPWORDS or len(palavra) < 2:
+            continue
+        termos.append(palavra)
+        marcada = f' {palavra} '
+        for n in range(3, 6):
+            termos.extend(marcada[i:i + n] for i in range(len(marcada) - n + 1))
+    return termos
+
+
+def texto_curso(curso):
+    """Texto indexado de um curso"""
+    return ' '.join(str(curso[campo]) for campo in CAMPOS_TEXTO)
+
+
+def checksum_arquivo(caminho):
+    """SHA-256 do arquivo, usado para detectar índice desatualizado"""
+    with open(caminho, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def construir_indice(cursos, diretorio, caminho_catalogo=None):
+    """
+    Ajusta o TF-IDF sobre o catálogo e salva o índice em diretorio:
+    a matriz esparsa (CSR) e o vetor idf como arquivos .npy, mais o
+    vocabulário e um manifesto JSON
+    """
+    from sklearn.feature_extraction.text import TfidfVectorizer
+
+    vetorizador = TfidfVectorizer(analyzer=analisar, sublinear_tf=True, dtype=np.float32)
+    matriz = vetorizador.fit_transform([texto_curso(curso) for curso in cursos]).tocsr()
+    matriz.sort_indices()
+
+    os.makedirs(diretorio, exist_ok=True)
+    np.save(os.path.join(diretorio, 'dados.npy'), matriz.data.astype(np.float32))
+    np.save(os.path.join(diretorio, 'indices.npy'), matriz.indices.astype(np.int32))
+    np.save(os.path.join(diretorio, 'indptr.npy'), matriz.indptr.astype(np.int32))
+    np.save(os.path.join(diretorio, 'idf.npy'), vetorizador.idf_.astype(np.float32))
+
+    vocabulario = {termo: int(coluna) for termo, coluna in vetorizador.vocabulary_.items()}
+    with open(os.path.join(diretorio, 'vocabulario.json'), 'w', encoding='utf-8') as f:
+        json.dump(vocabulario, f, ensure_ascii=False)
+
+    manifesto = {
+        'versao': VERSAO_INDICE,
+        'campos': CAMPOS_TEXTO,
+        'formato': list(matriz.shape),
+        'ids': [int(curso['id']) for curso in cursos],
+        'checksum_catalogo': checksum_arquivo(caminho_catalogo) if caminho_catalogo else None,
+    }
+    with open(os.path.join(diretorio, 'manifesto.json'), 'w', encoding='utf-8') as f:
+        json.dump(manifesto, f, ensure_ascii=False, indent=2)
+
+    return matriz.shape
+
+
+class BuscaCursos:
+    """
+    Índice TF-IDF pré-construído do catálogo de cursos.
+
+    Os arrays da matriz são abertos com mmap (np.load(mmap_mode='r')), então
+    a inicialização não reajusta o modelo e vários processos compartilham as
+    mesmas páginas do arquivo. Cada consulta monta o vetor TF-IDF da pergunta
+    e calcula a similaridade do cosseno com todos os cursos de uma só vez.
+    """
+
+    def __init__(self, matriz, idf, vocabulario, cursos):
+        self.matriz = matriz
+        self.idf = idf
+        self.vocabulario = vocabulario
+        self.cursos = cursos
+        self.perfis = np.array([curso['perfil'] for curso in cursos], dtype=object)
+
+    @classmethod
+    def carregar(cls, diretorio, cursos, caminho_catalogo=None):
+        """
+        Carrega o índice salvo por construir_indice. cursos é o catálogo
+        atual (lista de dicionários); as linhas do índice são associadas aos
+        cursos pelo id.
+        """
+        with open(os.path.join(diretorio, 'manifesto.json'), encoding='utf-8') as f:
+            manifesto = json.load(f)
+
+        if manifesto['versao'] != VERSAO_INDICE:
+            raise ValueError(
+                f"Versão do índice de busca incompatível: {manifesto['versao']} "
+                f"(esperada {VERSAO_INDICE})"
+            )
+
+        if caminho_catalogo and manifesto.get('checksum_catalogo') not in (None, checksum_arquivo(caminho_catalogo)):
+            print("⚠️ Índice de busca desatualizado em relação ao catálogo. "
+                  "Execute 'python busca_cursos.py' para reconstruí-lo.")
+
+        dados, indices, indptr = (
+            np.load(os.path.join(diretorio, f'{nome}.npy'), mmap_mode='r')
+            for nome in ARQUIVOS_MATRIZ
+        )
+        idf = np.load(os.path.join(diretorio, 'idf.npy'), mmap_mode='r')
+        with open(os.path.join(diretorio, 'vocabulario.json'), encoding='utf-8') as f:
+            vocabulario = json.load(f)
+
+        matriz = csr_matrix((dados, indices, indptr), shape=tuple(manifesto['formato']), copy=False)
+
+        # Cursos removidos do catálogo depois da construção do índice ficam de fora
+        por_id = {curso['id']: curso for curso in cursos}
+        linhas = [i for i, id_curso in enumerate(manifesto['ids']) if id_curso in por_id]
+        if len(linhas) < len(manifesto['ids']):
+            matriz = matriz[linhas]
+        return cls(matriz, idf, vocabulario, [por_id[manifesto['ids'][i]] for i in linhas])
+
+    def vetorizar(self, texto):
+        """Vetor TF-IDF (denso, normalizado) do texto; None se nenhum termo for conhecido"""
+        contagens = {}
+        for termo in analisar(texto):
+            coluna = self.vocabulario.get(termo)
+            if coluna is not None:
+                contagens[coluna] = contagens.get(coluna, 0) + 1
+        if not contagens:
+            return None
+
+        colunas = np.fromiter(contagens.keys(), dtype=np.int64, count=len(contagens))
+        tf = np.fromiter(contagens.values(), dtype=np.float32, count=len(contagens))
+
+        vetor = np.zeros(self.matriz.shape[1], dtype=np.float32)
+        vetor[colunas] = (1 + np.log(tf)) * self.idf[colunas]
+        return vetor / np.linalg.norm(vetor)
+
+    def buscar(self, texto, k=3, perfil=None, minimo=0.0):
+        """
+        Retorna até k cursos mais similares ao texto, do mais para o menos
+        similar, como cópias dos dicionários com o campo 'similaridade'.
+        perfil restringe a busca aos cursos daquele perfil.
+        """
+        vetor = self.vetorizar(texto)
+        if vetor is None:
+            return []
+
+        scores = self.matriz @ vetor
+        if perfil is not None:
+            scores = np.where(self.perfis == perfil, scores, -1.0)
+
+        k = min(k, len(scores))
+        if k <= 0:
+            return []
+        candidatos = np.argpartition(-scores, k - 1)[:k]
+        candidatos = candidatos[np.argsort(-scores[candidatos], kind='stable')]
+
+        return [
+            {**self.cursos[i], 'similaridade': round(float(scores[i]), 4)}
+            for i in candidatos
+            if scores[i] > minimo
+        ]
+
+
+if __name__ == '__main__':
+    from indice_cursos import ler_catalogo
+
+    caminho = '../data/cursos_recomendacao.csv'
+    destino = '../models/busca_cursos'
+    cursos = ler_catalogo(caminho)
+    formato = construir_indice(cursos, destino, caminho)
+    print(f"✓ Índice de busca salvo em {destino} ({formato[0]} cursos, {formato[1]} termos)")
@@ -0,0 +1,120 @@
+"""
+Cache de predições do ReSkill+
+Memoriza o resultado dos modelos para entradas repetidas (a tupla de
+features já codificada) e, para o modelo de risco, pode pré-calcular a grade
+completa de entradas inteiras para que a consulta substitua a predição
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+
+class CachePredicoes:
+    """
+    Cache LRU com expiração opcional, seguro entre threads.
+
+    Guarda até max_entradas resultados; quando cheio, descarta o usado há
+    mais tempo. Com ttl > 0, uma entrada expira ttl segundos depois de ser
+    guardada. Deve ser limpo sempre que os modelos forem recarregados.
+    """
+
+    def __init__(self, max_entradas=10000, ttl=0):
+        self.max_entradas = max_entradas
+        self.ttl = ttl
+        self._entradas = OrderedDict()
+        self._lock = threading.Lock()
+        self.acertos = 0
+        self.falhas = 0
+        self.expiradas = 0
+        self.descartadas = 0
+
+    def obter(self, chave):
+        """Resultado guardado para a chave, ou None"""
+        with self._lock:
+            entrada = self._entradas.get(chave)
+            if entrada is None:
+                self.falhas += 1
+                return None
+            valor, validade = entrada
+            if validade is not None and time.monotonic() >= validade:
+                del self._entradas[chave]
+                self.expiradas += 1
+                self.falhas += 1
+                return None
+            self._entradas.move_to_end(chave)
+            self.acertos += 1
+            return valor
+
+    def guardar(self, chave, valor):
+        validade = time.monotonic() + self.ttl if self.ttl > 0 else None
+        with self._lock:
+            self._entradas[chave] = (valor, validade)
+            self._entradas.move_to_end(chave)
+            while len(self._entradas) > self.max_entradas:
+                self._entradas.popitem(last=False)
+                self.descartadas += 1
+
+    def limpar(self):
+        """Descarta todos os resultados (os contadores são mantidos)"""
+        with self._lock:
+            self._entradas.clear()
+
+    def metricas(self):
+        with self._lock:
+            consultas = self.acertos + self.falhas
+            return {
+                'entradas': len(self._entradas),
+                'max_entradas': self.max_entradas,
+                'ttl_s': self.ttl,
+                'acertos': self.acertos,
+                'falhas': self.falhas,
+                'taxa_acerto': round(self.acertos / consultas, 4) if consultas else None,
+                'expiradas': self.expiradas,
+                'descartadas': self.descartadas,
+            }
+
+    def __len__(self):
+        return len(self._entradas)
+
+
+class GradeRisco:
+    """
+    Predições pré-calculadas para todas as combinações de valores inteiros
+    entre minimo e maximo das n_campos features (11^5 = 161.051 pontos para
+    as notas de 0 a 10 do modelo de risco).
+
+    consultar(X) devolve os valores das linhas que caem na grade e a máscara
+    dessas linhas; as demais continuam indo ao modelo. consultar_linha faz o
+    mesmo para um único registro, sem o custo das operações do NumPy.
+    """
+
+    def __init__(self, prever, n_campos, minimo=0, maximo=10):
+        self.minimo = minimo
+        self.maximo = maximo
+        self.n_valores = maximo - minimo + 1
+        eixos = np.arange(minimo, maximo + 1, dtype=float)
+        pontos = np.stack(np.meshgrid(*[eixos] * n_campos, indexing='ij'), axis=-1)
+        self.valores = np.asarray(prever(pontos.reshape(-1, n_campos)))
+        # Posição de cada ponto: os valores da linha como dígitos na base n_valores
+        self._pesos = self.n_valores ** np.arange(n_campos - 1, -1, -1)
+
+    def consultar(self, X):
+        X = np.asarray(X, dtype=float)
+        na_grade = ((X == np.round(X)) & (X >= self.minimo) & (X <= self.maximo)).all(axis=1)
+        indices = (X[na_grade] - self.minimo).astype(np.int64) @ self._pesos
+        return self.valores[indices], na_grade
+
+    def consultar_linha(self, linha):
+        """Valor de uma única linha (sequência de floats), ou None fora da grade"""
+        indice = 0
+        for valor in linha:
+            if not self.minimo <= valor <= self.maximo or valor != int(valor):
+                return None
+            indice = indice * self.n_valores + int(valor) - self.minimo
+        return self.valores[indice]
+
+    def __len__(self):
+        return len(self.valores)
@@ -0,0 +1,54 @@
+"""
+Cache de respostas JSON pré-serializadas para o ReSkill+
+Usado pelos endpoints cujo conteúdo só muda quando os dados são recarregados
+"""
+
+import hashlib
+import threading
+
+
+class CacheRespostas:
+    """
+    Guarda o corpo JSON já serializado e o ETag de cada resposta.
+
+    A chave é escolhida pelo endpoint (rota + parâmetros relevantes).
+    O cache é limitado a max_entradas: quando cheio, a entrada mais antiga
+    é descartada. Deve ser limpo sempre que os dados forem recarregados.
+    """
+
+    def __init__(self, max_entradas=1024):
+        self.max_entradas = max_entradas
+        self._entradas = {}
+        self._lock = threading.Lock()
+        self.acertos = 0
+        self.falhas = 0
+
+    def obter(self, chave, gerar):
+        """
+        Retorna (corpo, etag) da chave, chamando gerar() para produzir o
+        corpo em bytes apenas na primeira vez
+        """
+        with self._lock:
+            entrada = self._entradas.get(chave)
+            if entrada is not None:
+                self.acertos += 1
+                return entrada
+
+        corpo = gerar()
+        entrada = (corpo, hashlib.sha1(corpo).hexdigest())
+
+        with self._lock:
+            self.falhas += 1
+            if chave not in self._entradas and len(self._entradas) >= self.max_entradas:
+                self._entradas.pop(next(iter(self._entradas)))
+            self._entradas[chave] = entrada
+
+        return entrada
+
+    def limpar(self):
+        """Descarta todas as respostas armazenadas"""
+        with self._lock:
+            self._entradas.clear()
+
+    def __len__(self):
+        return len(self._entradas)
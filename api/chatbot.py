@@ -0,0 +1,191 @@
+"""
+Motor de intenções do chatbot ReSkill+
+Classifica a mensagem em uma única passada de uma expressão regular compilada
+na inicialização e responde com listas de cursos pré-computadas
+"""
+
+import re
+import unicodedata
+
+
+# Intenções em ordem de prioridade: a primeira encontrada na mensagem vence
+INTENCOES = [
+    ('saudacao', ['oi', 'olá', 'hello', 'ola']),
+    ('cursos', ['curso', 'aprender', 'estudar', 'qualificação']),
+    ('risco', ['risco', 'automação', 'substituído', 'substituir']),
+    ('ajuda', ['ajuda', 'help', 'como funciona']),
+    ('agradecimento', ['obrigado', 'valeu', 'thanks']),
+]
+
+# Áreas de interesse (intenção "cursos"), também em ordem de prioridade.
+# O filtro compara palavras inteiras da coluna area_interesse do catálogo
+# (separadas por '_'): 'ciencia_dados' pertence a 'dados', mas 'engenharia'
+# e 'consultoria' não pertencem a 'ia'.
+AREAS = [
+    ('ia', ['ia', 'inteligência artificial', 'machine learning', 'ml'], {'ia', 'ml', 'dados'}),
+    ('programacao', ['python', 'programação', 'desenvolvimento'], {'desenvolvimento', 'mobile', 'frontend', 'backend'}),
+    ('dados', ['dados', 'data', 'analytics'], {'dados', 'analytics', 'bi'}),
+]
+
+# Quantidade de cursos sugeridos por resposta
+CURSOS_POR_RESPOSTA = 3
+
+PERFIL_PADRAO = 'digital_intermediario'
+
+# Similaridade mínima para que um curso da busca textual seja sugerido
+SIMILARIDADE_MINIMA = 0.25
+
+RESPOSTAS = {
+    'saudacao': "Olá! Sou o assistente virtual do ReSkill+. Como posso ajudá-lo em sua jornada de requalificação?",
+    'ia': "Excelente escolha! IA é uma área em crescimento. Aqui estão alguns cursos recomendados para seu perfil ({perfil}):",
+    'programacao': "Programação é uma habilidade essencial! Veja esses cursos:",
+    'dados': "Análise de dados é muito valorizada! Confira essas opções:",
+    'geral': "Aqui estão alguns cursos populares para seu perfil ({perfil}):",
+    'risco_sessao': "Pela sua última avaliação, o risco de automação da sua ocupação é de {risco:.1f}% (nível {nivel}). Profissões que exigem criatividade e relacionamento interpessoal tendem a ter menor risco.",
+    'risco': "A automação está transformando o mercado de trabalho. Para avaliar seu risco, posso analisar características da sua ocupação como repetitividade, criatividade e interação humana. Profissões que exigem criatividade e relacionamento interpessoal tendem a ter menor risco.",
+    'ajuda': """Posso ajudá-lo com:
+            
+            • Recomendação de cursos personalizados
+            • Avaliação do risco de automação da sua profissão
+            • Orientação sobre trilhas de aprendizado
+            • Informações sobre áreas em crescimento
+            
+            O que você gostaria de saber?""",
+    'busca': "Encontrei alguns cursos relacionados à sua pergunta:",
+    'busca_perfil': "Encontrei estes cursos relacionados ao que você procura para seu perfil ({perfil}):",
+    'agradecimento': "Por nada! Estou aqui para ajudar em sua jornada de requalificação. Boa sorte! 🚀",
+    'desconhecida': "Desculpe, não entendi bem. Posso ajudá-lo com recomendações de cursos, avaliação de risco de automação ou informações sobre trilhas de aprendizado. O que você precisa?",
+}
+
+
+def normalizar(texto):
+    """Converte para minúsculas e remove acentos ('Automação' -> 'automacao')"""
+    decomposto = unicodedata.normalize('NFKD', texto.lower())
+    return ''.join(c for c in decomposto if not unicodedata.combining(c))
+
+
+class Chatbot:
+    """
+    Chatbot baseado em palavras-chave.
+
+    Todas as palavras-chave de intenções e áreas são compiladas em uma única
+    regex com limites de palavra (aceitando plural em 's'), aplicada sobre a
+    mensagem normalizada. Assim 'ia' não casa dentro de 'diario' nem 'ola'
+    dentro de 'escola'. Os cursos sugeridos para cada (área, perfil) são
+    calculados uma única vez a partir do catálogo.
+
+    Quando há um índice de busca textual (busca_cursos.BuscaCursos), as
+    mensagens sem intenção reconhecida e os pedidos de curso sem área
+    conhecida são respondidos com os cursos mais similares ao texto.
+
+    Com os IDs dos cursos já sugeridos na conversa (vistos), as respostas
+    trazem os próximos cursos da lista; se todos já foram sugeridos, os
+    primeiros voltam a ser sugeridos.
+    """
+
+    def __init__(self, cursos, busca=None):
+        """
+        cursos: lista de dicionários, um por curso, na ordem do catálogo
+        busca: índice BuscaCursos opcional para perguntas livres
+        """
+        self.busca = busca
+
+        self._rotulos = {}
+        for nome, palavras in INTENCOES:
+            for palavra in palavras:
+                self._rotulos.setdefault(normalizar(palavra), set()).add(nome)
+        for nome, palavras, _ in AREAS:
+            for palavra in palavras:
+                self._rotulos.setdefault(normalizar(palavra), set()).add(nome)
+
+        # Palavras mais longas primeiro para que frases tenham precedência
+        alternativas = sorted(self._rotulos, key=len, reverse=True)
+        self._padrao = re.compile(
+            r'\b(' + '|'.join(re.escape(p) for p in alternativas) + r')s?\b'
+        )
+
+        # Cursos de cada (área, perfil), na ordem do catálogo
+        self._cursos = {}
+        perfis = {curso['perfil'] for curso in cursos}
+        filtros = [(nome, termos) for nome, _, termos in AREAS]
+        filtros.append(('geral', None))
+        for perfil in perfis:
+            do_perfil = [curso for curso in cursos if curso['perfil'] == perfil]
+            for nome, termos in filtros:
+                selecionados = [
+                    curso for curso in do_perfil
+                    if termos is None or not termos.isdisjoint(str(curso['area_interesse']).split('_'))
+                ]
+                self._cursos[(nome, perfil)] = selecionados
+
+    def classificar(self, mensagem):
+        """
+        Retorna (intencao, area) da mensagem. A intenção é 'desconhecida'
+        quando nenhuma palavra-chave é encontrada; a área só é definida para
+        a intenção 'cursos' ('geral' se nenhuma área for citada).
+        """
+        encontrados = set()
+        for ocorrencia in self._padrao.finditer(normalizar(mensagem)):
+            encontrados |= self._rotulos[ocorrencia.group(1)]
+
+        intencao = next(
+            (nome for nome, _ in INTENCOES if nome in encontrados), 'desconhecida'
+        )
+        area = None
+        if intencao == 'cursos':
+            area = next(
+                (nome for nome, _, _ in AREAS if nome in encontrados), 'geral'
+            )
+        return intencao, area
+
+    def cursos(self, area, perfil, vistos=()):
+        """Cursos para a área e o perfil, sem os já vistos (lista vazia se não houver)"""
+        return nao_vistos(self._cursos.get((area, perfil), []), vistos)
+
+    def buscar(self, mensagem, perfil=None, vistos=()):
+        """Cursos mais similares à mensagem, sem os já vistos"""
+        cursos = self.busca.buscar(
+            mensagem, CURSOS_POR_RESPOSTA + len(vistos), perfil=perfil, minimo=SIMILARIDADE_MINIMA
+        )
+        return nao_vistos(cursos, vistos)
+
+    def responder(self, mensagem, contexto, vistos=()):
+        """
+        Retorna (resposta, cursos_sugeridos) para a mensagem do usuário.
+        contexto pode trazer perfil e, de uma sessão, risco e nivel_risco
+        """
+        intencao, area = self.classificar(mensagem)
+
+        if intencao == 'desconhecida' and self.busca is not None:
+            cursos = self.buscar(mensagem, vistos=vistos)
+            if cursos:
+                return RESPOSTAS['busca'], cursos
+
+        if intencao == 'risco' and 'risco' in contexto:
+            return RESPOSTAS['risco_sessao'].format(
+                risco=contexto['risco'], nivel=contexto.get('nivel_risco', '-')), []
+
+        if intencao != 'cursos':
+            return RESPOSTAS[intencao], []
+
+        perfil = contexto.get('perfil', PERFIL_PADRAO)
+
+        if area == 'geral' and self.busca is not None:
+            cursos = self.buscar(mensagem, perfil, vistos)
+            if cursos:
+                return RESPOSTAS['busca_perfil'].format(perfil=perfil), cursos
+
+        resposta = RESPOSTAS[area].format(perfil=perfil)
+        return resposta, self.cursos(area, perfil, vistos)
+
+
+def nao_vistos(cursos, vistos):
+    """
+    Os primeiros CURSOS_POR_RESPOSTA cursos cujo id não está em vistos, ou os
+    primeiros da lista se todos já foram vistos
+    """
+    if vistos:
+        novos = [curso for curso in cursos if curso['id'] not in vistos]
+        if novos:
+            cursos = novos
+    return cursos[:CURSOS_POR_RESPOSTA]
@@ -0,0 +1,192 @@
+"""
+Codificação de features do ReSkill+
+Compila, uma única vez a partir dos encoders, tabelas categoria -> código e
+monta o vetor de features de uma requisição (ou a matriz de um lote)
+diretamente em um array float pré-alocado, sem chamar LabelEncoder.transform
+a cada requisição
+"""
+
+import math
+
+import numpy as np
+
+from chatbot import normalizar as remover_acentos
+
+
+class CategoriaDesconhecida(ValueError):
+    """Categoria fora das classes do encoder (mesma mensagem do LabelEncoder)"""
+
+
+class ValorNumericoInvalido(ValueError):
+    """Campo numérico que não é um número finito (mesma mensagem do lote)"""
+
+
+def numero_finito(valor):
+    """
+    valor como float, ou None se não for um número finito: textos não
+    numéricos, None, booleanos, NaN e infinitos ('nan', 'inf' e os literais
+    NaN/Infinity do JSON)
+    """
+    if isinstance(valor, bool):
+        return None
+    try:
+        numero = float(valor)
+    except (TypeError, ValueError, OverflowError):
+        return None
+    return numero if math.isfinite(numero) else None
+
+
+def normalizar_categoria(valor):
+    """'  Médio ' -> 'medio': minúsculas, sem acentos e sem espaços nas pontas"""
+    return remover_acentos(valor).strip()
+
+
+class CodificadorFeatures:
+    """
+    Monta as features na ordem de campos, codificando os campos de
+    categoricas (campo -> nome do encoder) com o código do LabelEncoder (a
+    posição da classe em classes_).
+
+    Com normalizar=True, categorias são comparadas sem diferenciar
+    maiúsculas, acentos e espaços nas pontas ('Médio' encontra 'medio').
+    """
+
+    def __init__(self, campos, categoricas=None, encoders=None, normalizar=False):
+        categoricas = categoricas or {}
+        self.campos = list(campos)
+        self.normalizar = normalizar
+
+        # Uma tabela por posição: dict categoria -> código, ou None (numérico)
+        self._tabelas = [
+            self._compilar(campo, encoders[categoricas[campo]].classes_) if campo in categoricas else None
+            for campo in self.campos
+        ]
+        self._categoricos = [(j, campo, tabela) for j, (campo, tabela)
+                             in enumerate(zip(self.campos, self._tabelas)) if tabela is not None]
+        self._numericos = [(j, campo) for j, (campo, tabela)
+                           in enumerate(zip(self.campos, self._tabelas)) if tabela is None]
+
+    def _compilar(self, campo, classes):
+        tabela = {}
+        for codigo, classe in enumerate(classes):
+            chave = self.chave(str(classe))
+            if chave in tabela:
+                raise ValueError(f'Categorias ambíguas após normalização em {campo}: {classe!r}')
+            tabela[chave] = float(codigo)
+        return tabela
+
+    def chave(self, valor):
+        """Chave de busca de uma categoria (normalizada, se configurado)"""
+        return normalizar_categoria(valor) if self.normalizar else valor
+
+    def tabela(self, campo):
+        """Tabela categoria -> código de um campo categórico"""
+        return self._tabelas[self.campos.index(campo)]
+
+    def _codigo(self, tabela, valor):
+        try:
+            return tabela[self.chave(valor) if isinstance(valor, str) else valor]
+        except (KeyError, TypeError):
+            # Mesma mensagem do LabelEncoder.transform
+            raise CategoriaDesconhecida(f'y contains previously unseen labels: {valor!r}')
+
+    def vetor(self, dados):
+        """
+        Matriz (1, n) com as features de um registro com todos os campos
+        presentes. As categorias são codificadas primeiro, na ordem dos
+        campos; uma categoria desconhecida levanta CategoriaDesconhecida e um
+        valor que não é um número finito levanta ValorNumericoInvalido
+        """
+        X = np.empty((1, len(self.campos)))
+        linha = X[0]
+        for j, campo, tabela in self._categoricos:
+            linha[j] = self._codigo(tabela, dados[campo])
+        for j, campo in self._numericos:
+            numero = numero_finito(dados[campo])
+            if numero is None:
+                raise ValorNumericoInvalido(f'Valor numérico inválido para o campo: {campo}')
+            linha[j] = numero
+        return X
+
+    def _numeros(self, coluna):
+        """
+        Coluna numérica como array e as posições que não são números finitos.
+        Colunas só de int e float são convertidas de uma vez pelo NumPy
+        """
+        if set(map(type, coluna)) <= {int, float}:
+            try:
+                valores = np.array(coluna, dtype=np.float64)
+            except OverflowError:
+                pass
+            else:
+                return valores, np.flatnonzero(~np.isfinite(valores)).tolist()
+        numeros = [numero_finito(valor) for valor in coluna]
+        if None not in numeros:
+            return numeros, []
+        falhas = [p for p, numero in enumerate(numeros) if numero is None]
+        return [np.nan if numero is None else numero for numero in numeros], falhas
+
+    def _codigos(self, tabela, coluna):
+        """Códigos de uma coluna categórica e as posições de categorias inválidas"""
+        if set(map(type, coluna)) <= {str}:
+            codigos = list(map(tabela.get, map(self.chave, coluna) if self.normalizar else coluna))
+        else:
+            codigos = [tabela.get(self.chave(valor)) if isinstance(valor, str) else None
+                       for valor in coluna]
+        if None not in codigos:
+            return codigos, []
+        falhas = [p for p, codigo in enumerate(codigos) if codigo is None]
+        return [np.nan if codigo is None else codigo for codigo in codigos], falhas
+
+    def matriz(self, registros):
+        """
+        Valida os registros de um lote e monta a matriz de features.
+
+        Cada registro é validado individualmente: registros com campos
+        ausentes, valores não numéricos (ou NaN, infinitos e booleanos) ou
+        categorias desconhecidas recebem uma mensagem de erro (a do primeiro
+        campo inválido) e ficam fora da matriz, sem interromper o restante
+        do lote. A matriz é preenchida coluna a coluna, com uma conversão
+        por coluna em vez de uma por valor.
+
+        Retorna (X, indices_validos, erros), onde X tem uma linha por
+        registro válido e erros mapeia índice -> mensagem.
+        """
+        campos = self.campos
+        erros = {}
+        # Índices dos registros com todos os campos
+        completos = []
+
+        for i, registro in enumerate(registros):
+            if not isinstance(registro, dict):
+                erros[i] = 'Registro deve ser um objeto JSON'
+                continue
+            ausente = next((campo for campo in campos if campo not in registro), None)
+            if ausente:
+                erros[i] = f'Campo obrigatório ausente: {ausente}'
+                continue
+            completos.append(i)
+
+        X = np.empty((len(completos), len(campos)))
+        # Posição em completos -> mensagem do primeiro campo inválido
+        invalidos = {}
+        for j, (campo, tabela) in enumerate(zip(campos, self._tabelas)):
+            coluna = [registros[i][campo] for i in completos]
+            if tabela is None:
+                X[:, j], falhas = self._numeros(coluna)
+                for p in falhas:
+                    invalidos.setdefault(p, f'Valor numérico inválido para o campo: {campo}')
+            else:
+                X[:, j], falhas = self._codigos(tabela, coluna)
+                for p in falhas:
+                    invalidos.setdefault(
+                        p, f'Valor inválido para variável categórica: {campo}={coluna[p]!r}')
+
+        if invalidos:
+            for p, erro in invalidos.items():
+                erros[completos[p]] = erro
+            erros = dict(sorted(erros.items()))
+            validos = [p for p in range(len(completos)) if p not in invalidos]
+            X = X[validos]
+            completos = [completos[p] for p in validos]
+        return X, completos, erros
@@ -0,0 +1,67 @@
+"""
+Configuração do Gunicorn para a API ReSkill+ em produção
+
+Uso:
+    cd api
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+Variáveis de ambiente:
+    RESKILL_BIND      endereço e porta (padrão 0.0.0.0:5000)
+    RESKILL_WORKERS   processos (padrão: número de CPUs)
+    RESKILL_THREADS   threads por processo (padrão 4)
+    RESKILL_TIMEOUT   segundos até um worker travado ser reiniciado (padrão 30)
+    RESKILL_MAX_REQUESTS
+                      reinicia cada worker após N requisições (padrão 0, desligado)
+
+Recarga sem derrubar conexões:
+    kill -HUP <pid do mestre>    reinicia os workers aos poucos (mesmos modelos)
+    kill -USR2 <pid do mestre>   inicia um novo mestre, que recarrega código e
+                                 modelos; depois, kill -TERM no mestre antigo
+    RESKILL_RECARGA_INTERVALO    cada worker recarrega só os modelos quando os
+                                 arquivos mudam (ver registro_modelos.py)
+"""
+
+import os
+
+import trabalhador_gunicorn
+
+# Uma thread de BLAS por processo: os workers já ocupam as CPUs
+os.environ.setdefault('OMP_NUM_THREADS', '1')
+os.environ.setdefault('OPENBLAS_NUM_THREADS', '1')
+
+bind = os.environ.get('RESKILL_BIND', '0.0.0.0:5000')
+workers = int(os.environ.get('RESKILL_WORKERS', os.cpu_count() or 1))
+threads = int(os.environ.get('RESKILL_THREADS', '4'))
+# gthread com encerramento gracioso nas versões testadas do Gunicorn, gthread
+# padrão nas demais (ver trabalhador_gunicorn.py)
+worker_class = trabalhador_gunicorn.classe_do_worker()
+
+# Carrega a aplicação (e os modelos, ver wsgi.py) no mestre antes do fork
+preload_app = True
+
+timeout = int(os.environ.get('RESKILL_TIMEOUT', '30'))
+graceful_timeout = 30
+keepalive = 5
+
+max_requests = int(os.environ.get('RESKILL_MAX_REQUESTS', '0'))
+max_requests_jitter = max_requests // 10
+
+accesslog = None
+errorlog = '-'
+loglevel = 'info'
+
+
+def when_ready(server):
+    server.log.info(f'API ReSkill+ pronta: {workers} worker(s) x {threads} thread(s) em {bind}')
+    if worker_class == 'gthread':
+        server.log.warning('Worker gthread padrão: versão do Gunicorn não testada com '
+                           'trabalhador_gunicorn.ThreadWorkerGracioso')
+
+
+def post_fork(server, worker):
+    server.log.info(f'Worker iniciado (pid {worker.pid})')
+    # Cada worker confere os arquivos dos modelos (ver RESKILL_RECARGA_INTERVALO)
+    # e recarrega sozinho: a thread do vigia não sobrevive ao fork
+    import app
+    if app.RECARGA_INTERVALO > 0:
+        app.registro.vigiar(app.RECARGA_INTERVALO)
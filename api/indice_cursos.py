@@ -0,0 +1,113 @@
+"""
+Índice de cursos em memória para o ReSkill+
+Pré-computa as consultas por perfil, área de interesse e nível para que
+as recomendações não precisem filtrar e ordenar o DataFrame a cada requisição
+"""
+
+import csv
+from itertools import islice, product
+
+
+def _converter_coluna(valores):
+    """Converte os valores de uma coluna para int ou float quando todos permitem"""
+    for tipo in (int, float):
+        try:
+            return [tipo(valor) for valor in valores]
+        except ValueError:
+            continue
+    return valores
+
+
+def ler_colunas(caminho):
+    """
+    Lê um CSV como um dicionário coluna -> lista de valores, convertendo as
+    colunas numéricas
+    """
+    with open(caminho, newline='', encoding='utf-8') as f:
+        leitor = csv.reader(f)
+        cabecalho = next(leitor, None)
+        if cabecalho is None:
+            return {}
+        # Linhas em branco são ignoradas, como no csv.DictReader
+        valores = list(zip(*(linha for linha in leitor if linha))) or [()] * len(cabecalho)
+    return {
+        campo: _converter_coluna(list(coluna))
+        for campo, coluna in zip(cabecalho, valores)
+    }
+
+
+def ler_catalogo(caminho):
+    """
+    Lê o CSV de cursos como uma lista de dicionários, convertendo as colunas
+    numéricas (mesmo resultado de pd.read_csv(...).to_dict('records'), sem
+    precisar importar o pandas)
+    """
+    colunas = ler_colunas(caminho)
+    total = len(next(iter(colunas.values()), []))
+    return [
+        {campo: colunas[campo][i] for campo in colunas}
+        for i in range(total)
+    ]
+
+
+class IndiceCursos:
+    """
+    Índice dos cursos construído uma única vez no carregamento da API.
+
+    As chaves são tuplas (perfil, area_interesse, nivel_atual), em que None
+    funciona como curinga. Cada chave guarda duas listas de cursos:
+    uma ordenada por score_relevancia (decrescente) para as recomendações
+    e outra na ordem original do catálogo para a listagem.
+
+    As listas retornadas compartilham os dicionários dos cursos e não devem
+    ser modificadas.
+    """
+
+    CAMPOS = ('perfil', 'area_interesse', 'nivel_atual')
+
+    def __init__(self, cursos):
+        """
+        cursos: lista de dicionários, um por curso (ex.: df.to_dict('records'))
+        """
+        self.cursos = list(cursos)
+        self._por_ordem = {}
+        self._por_relevancia = {}
+
+        for curso in self.cursos:
+            valores = [curso[campo] for campo in self.CAMPOS]
+            # Cada curso entra nas 8 combinações de valor exato / curinga
+            for chave in product(*[(valor, None) for valor in valores]):
+                self._por_ordem.setdefault(chave, []).append(curso)
+
+        for chave, lista in self._por_ordem.items():
+            self._por_relevancia[chave] = sorted(
+                lista, key=lambda curso: curso['score_relevancia'], reverse=True
+            )
+
+    @staticmethod
+    def _chave(perfil, area, nivel):
+        """Valores vazios (None, '') são tratados como curinga"""
+        return (perfil or None, area or None, nivel or None)
+
+    def recomendar(self, perfil=None, area=None, nivel=None, top_n=5):
+        """Retorna os top_n cursos mais relevantes para o filtro informado"""
+        cursos = self._por_relevancia.get(self._chave(perfil, area, nivel), [])
+        return cursos[:top_n]
+
+    def listar(self, perfil=None, area=None, nivel=None):
+        """Retorna os cursos do filtro informado na ordem do catálogo"""
+        return list(self._por_ordem.get(self._chave(perfil, area, nivel), []))
+
+    def contar(self, perfil=None, area=None, nivel=None):
+        """Número de cursos do filtro informado"""
+        return len(self._por_ordem.get(self._chave(perfil, area, nivel), []))
+
+    def iterar(self, perfil=None, area=None, nivel=None, inicio=0, fim=None):
+        """
+        Percorre os cursos do filtro informado na ordem do catálogo, de inicio
+        até fim (exclusive), sem copiar a lista
+        """
+        return islice(self._por_ordem.get(self._chave(perfil, area, nivel), []), inicio, fim)
+
+    def __len__(self):
+        return len(self.cursos)
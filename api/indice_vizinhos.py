@@ -0,0 +1,76 @@
+"""
+Índice de vizinhos mais próximos do ReSkill+
+Encontra os trabalhadores de referência mais parecidos com um trabalhador no
+espaço normalizado do segmentador (scaler_cluster): idade, experiência,
+habilidades digitais, renda e risco de automação, cada um medido em
+desvios-padrão, com distância euclidiana.
+
+Com até LIMIAR_FORCA_BRUTA registros, a busca calcula de uma vez, com NumPy,
+a distância para todos eles. Acima disso, usa uma KD-tree
+(scipy.spatial.cKDTree, instalada com o scikit-learn) construída na carga,
+cuja consulta cresce com log N. No modo aproximado, a árvore pode devolver
+vizinhos até (1 + eps) vezes mais distantes que os exatos, em troca de
+visitar menos nós; na força bruta a busca é sempre exata.
+"""
+
+import numpy as np
+
+# Até este número de registros, a força bruta é tão rápida quanto a KD-tree
+# (cerca de 25 µs) e dispensa importar o scipy
+LIMIAR_FORCA_BRUTA = 512
+
+
+class IndiceVizinhos:
+    """
+    Índice construído uma única vez no carregamento da API.
+
+    X: matriz (n, d) com as features originais de cada registro;
+    colunas: dicionário campo -> lista de valores, na ordem das linhas de X,
+    com os dados devolvidos para cada vizinho; media e escala: parâmetros da
+    normalização (mean_ e scale_ do StandardScaler).
+    """
+
+    def __init__(self, X, colunas, media, escala, eps=0.5, limiar=LIMIAR_FORCA_BRUTA):
+        self.media = np.asarray(media, dtype=np.float64)
+        self.escala = np.asarray(escala, dtype=np.float64)
+        self.pontos = (np.asarray(X, dtype=np.float64) - self.media) / self.escala
+        self.colunas = colunas
+        self.eps = eps
+        self.arvore = None
+        if len(self.pontos) > limiar:
+            from scipy.spatial import cKDTree
+            self.arvore = cKDTree(self.pontos)
+
+    @property
+    def forca_bruta(self):
+        return self.arvore is None
+
+    def buscar(self, x, k, aproximado=False):
+        """
+        Os k registros mais próximos de x (features originais, sem
+        normalizar). Retorna (distancias, posicoes) em ordem crescente de
+        distância; empates ficam na ordem das linhas. Levanta ValueError se x
+        tiver NaN ou infinitos
+        """
+        ponto = (np.asarray(x, dtype=np.float64).ravel() - self.media) / self.escala
+        if not np.isfinite(ponto).all():
+            raise ValueError('Consulta com valores NaN ou infinitos')
+        k = min(k, len(self.pontos))
+        if k == 0:
+            return np.empty(0), np.empty(0, dtype=np.intp)
+
+        if self.arvore is not None:
+            distancias, posicoes = self.arvore.query(ponto, k, eps=self.eps if aproximado else 0)
+            return np.atleast_1d(distancias), np.atleast_1d(posicoes)
+
+        quadrados = ((self.pontos - ponto) ** 2).sum(axis=1)
+        posicoes = np.argpartition(quadrados, k - 1)[:k] if k < len(quadrados) else np.arange(k)
+        posicoes = posicoes[np.lexsort((posicoes, quadrados[posicoes]))]
+        return np.sqrt(quadrados[posicoes]), posicoes
+
+    def registro(self, posicao):
+        """Dados do registro da linha posicao"""
+        return {campo: valores[posicao] for campo, valores in self.colunas.items()}
+
+    def __len__(self):
+        return len(self.pontos)
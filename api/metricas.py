@@ -0,0 +1,199 @@
+"""
+Métricas de desempenho do ReSkill+
+Histogramas da duração de cada rota e de cada etapa do processamento
+(leitura, validação, codificação, predição, serialização), tamanho dos lotes
+e exportação no formato texto do Prometheus (GET /metrics).
+
+Cada requisição tem um Cronometro, guardado em uma ContextVar: marcar(etapa)
+atribui à etapa o tempo decorrido desde a marca anterior, então o custo por
+marca é uma leitura do relógio. As funções de processamento de app.py chamam
+marcar() sem saber qual servidor (Flask ou ASGI) as executa.
+"""
+
+import bisect
+import contextvars
+import threading
+import time
+
+# Limites (segundos) dos histogramas de duração
+LIMITES_DURACAO = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01,
+                   0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Limites (registros) do histograma de tamanho dos lotes
+LIMITES_LOTE = (1, 10, 50, 100, 500, 1000, 5000, 10000)
+
+# Tipo do corpo de /metrics (formato texto do Prometheus)
+TIPO_METRICAS = 'text/plain; version=0.0.4; charset=utf-8'
+
+_cronometro = contextvars.ContextVar('cronometro', default=None)
+
+
+class Cronometro:
+    """Tempo total e por etapa de uma requisição"""
+
+    __slots__ = ('rota', 'inicio', 'marca', 'etapas', 'registros')
+
+    def __init__(self, rota):
+        self.rota = rota
+        self.inicio = self.marca = time.perf_counter()
+        self.etapas = {}
+        self.registros = None
+
+    def marcar(self, etapa):
+        agora = time.perf_counter()
+        self.etapas[etapa] = self.etapas.get(etapa, 0.0) + agora - self.marca
+        self.marca = agora
+
+
+def iniciar_cronometro(rota):
+    """Inicia o cronômetro da requisição atual"""
+    cronometro = Cronometro(rota)
+    _cronometro.set(cronometro)
+    return cronometro
+
+
+def marcar(etapa):
+    """Fecha a etapa da requisição atual (sem efeito fora de uma requisição)"""
+    cronometro = _cronometro.get()
+    if cronometro is not None:
+        cronometro.marcar(etapa)
+
+
+def registrar_lote(registros):
+    """Número de registros do lote da requisição atual"""
+    cronometro = _cronometro.get()
+    if cronometro is not None:
+        cronometro.registros = registros
+
+
+def encerrar_cronometro():
+    """Retira e retorna o cronômetro da requisição atual"""
+    cronometro = _cronometro.get()
+    _cronometro.set(None)
+    return cronometro
+
+
+class Histograma:
+    """Contagens por faixa (não acumuladas), soma e total das observações"""
+
+    __slots__ = ('limites', 'contagens', 'soma', 'total')
+
+    def __init__(self, limites):
+        self.limites = limites
+        self.contagens = [0] * (len(limites) + 1)
+        self.soma = 0.0
+        self.total = 0
+
+    def observar(self, valor):
+        self.contagens[bisect.bisect_left(self.limites, valor)] += 1
+        self.soma += valor
+        self.total += 1
+
+
+def formatar_rotulos(rotulos):
+    """(('rota', '/'), ('le', '0.1')) -> {rota="/",le="0.1"}"""
+    if not rotulos:
+        return ''
+    return '{' + ','.join(f'{nome}="{escapar(valor)}"' for nome, valor in rotulos) + '}'
+
+
+def escapar(valor):
+    return str(valor).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+class RegistroMetricas:
+    """
+    Métricas das requisições atendidas pelo processo:
+
+    - reskill_requisicoes_total{rota, metodo, status}
+    - reskill_requisicao_duracao_segundos{rota, metodo} (histograma)
+    - reskill_etapa_duracao_segundos{rota, etapa} (histograma)
+    - reskill_lote_registros{rota} (histograma)
+
+    Métricas de estado (carga dos modelos, caches, micro-lotes) vêm dos
+    coletores: funções chamadas a cada exportação que devolvem famílias
+    (nome, tipo, ajuda, [(rotulos, valor), ...]).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._requisicoes = {}
+        self._duracoes = {}
+        self._etapas = {}
+        self._lotes = {}
+        self._coletores = []
+
+    def registrar_coletor(self, coletor):
+        self._coletores.append(coletor)
+
+    def registrar(self, cronometro, metodo, status):
+        """Contabiliza uma requisição encerrada"""
+        duracao = time.perf_counter() - cronometro.inicio
+        rota = cronometro.rota
+        with self._lock:
+            chave = (rota, metodo, status)
+            self._requisicoes[chave] = self._requisicoes.get(chave, 0) + 1
+            self._histograma(self._duracoes, (rota, metodo), LIMITES_DURACAO).observar(duracao)
+            for etapa, segundos in cronometro.etapas.items():
+                self._histograma(self._etapas, (rota, etapa), LIMITES_DURACAO).observar(segundos)
+            if cronometro.registros is not None:
+                self._histograma(self._lotes, rota, LIMITES_LOTE).observar(cronometro.registros)
+
+    @staticmethod
+    def _histograma(histogramas, chave, limites):
+        histograma = histogramas.get(chave)
+        if histograma is None:
+            histograma = histogramas[chave] = Histograma(limites)
+        return histograma
+
+    def exportar(self):
+        """Todas as métricas no formato texto do Prometheus"""
+        linhas = []
+        with self._lock:
+            familia(linhas, 'reskill_requisicoes_total', 'counter',
+                    'Requisições atendidas por rota, método e status',
+                    [((('rota', r), ('metodo', m), ('status', s)), total)
+                     for (r, m, s), total in sorted(self._requisicoes.items())])
+            histogramas(linhas, 'reskill_requisicao_duracao_segundos',
+                        'Duração das requisições (até a resposta ficar pronta para envio)',
+                        [((('rota', r), ('metodo', m)), h) for (r, m), h in sorted(self._duracoes.items())])
+            histogramas(linhas, 'reskill_etapa_duracao_segundos',
+                        'Duração de cada etapa do processamento das requisições',
+                        [((('rota', r), ('etapa', e)), h) for (r, e), h in sorted(self._etapas.items())])
+            histogramas(linhas, 'reskill_lote_registros',
+                        'Registros por requisição de lote',
+                        [((('rota', r),), h) for r, h in sorted(self._lotes.items())])
+
+        for coletor in self._coletores:
+            for nome, tipo, ajuda, amostras in coletor():
+                if amostras:
+                    familia(linhas, nome, tipo, ajuda, amostras)
+        return '\n'.join(linhas) + '\n'
+
+
+def familia(linhas, nome, tipo, ajuda, amostras):
+    linhas.append(f'# HELP {nome} {ajuda}')
+    linhas.append(f'# TYPE {nome} {tipo}')
+    for rotulos, valor in amostras:
+        linhas.append(f'{nome}{formatar_rotulos(rotulos)} {formatar_valor(valor)}')
+
+
+def histogramas(linhas, nome, ajuda, series):
+    linhas.append(f'# HELP {nome} {ajuda}')
+    linhas.append(f'# TYPE {nome} histogram')
+    for rotulos, histograma in series:
+        acumulado = 0
+        for limite, contagem in zip(histograma.limites, histograma.contagens):
+            acumulado += contagem
+            linhas.append(f'{nome}_bucket{formatar_rotulos(rotulos + (("le", formatar_valor(limite)),))} {acumulado}')
+        linhas.append(f'{nome}_bucket{formatar_rotulos(rotulos + (("le", "+Inf"),))} {histograma.total}')
+        linhas.append(f'{nome}_sum{formatar_rotulos(rotulos)} {formatar_valor(histograma.soma)}')
+        linhas.append(f'{nome}_count{formatar_rotulos(rotulos)} {histograma.total}')
+
+
+def formatar_valor(valor):
+    if isinstance(valor, bool):
+        return '1' if valor else '0'
+    if isinstance(valor, int):
+        return str(valor)
+    return repr(float(valor))
@@ -0,0 +1,145 @@
+"""
+Carregamento paralelo e sob demanda dos modelos do ReSkill+
+Cada artefato é carregado em uma thread própria e pode ser usado assim que
+estiver pronto, sem esperar pelos demais. Artefatos raramente usados podem
+ficar para o primeiro pedido
+"""
+
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as TempoEsgotado
+
+
+class ModeloIndisponivel(Exception):
+    """Erro ao obter um artefato cuja carga falhou"""
+
+
+class PacoteModelos:
+    """
+    Conjunto de artefatos (modelos, encoders, catálogo...) carregados em paralelo.
+
+    carregadores é um dicionário ordenado nome -> função que recebe o próprio
+    pacote e devolve o artefato. Um carregador pode depender de outro artefato
+    chamando pacote.obter(nome); nesse caso a dependência deve aparecer antes
+    no dicionário, o que garante que ela já foi iniciada (a fila do pool é FIFO).
+
+    obter(nome) bloqueia apenas até aquele artefato ficar pronto, então um
+    endpoint que usa só o regressor pode responder antes do classificador.
+
+    Os artefatos de sob_demanda não são carregados por iniciar(): o primeiro
+    obter() ou carregar_sob_demanda() os carrega na própria thread, e as
+    chamadas concorrentes aguardam essa carga. Até lá, aguardar() não espera
+    por eles.
+    """
+
+    def __init__(self, carregadores, max_threads=None, sob_demanda=()):
+        self.carregadores = dict(carregadores)
+        self.sob_demanda = set(sob_demanda)
+        self.max_threads = max_threads or min(len(self.carregadores), (os.cpu_count() or 1) + 4)
+        self._futuros = {nome: Future() for nome in self.carregadores}
+        self._tempos = {}
+        self._iniciados = set()
+        self._lock = threading.Lock()
+        # Número da versão, atribuído pelo registro ao ativar o pacote
+        self.versao = None
+
+    def iniciar(self):
+        """Dispara a carga de todos os artefatos em um pool de threads"""
+        executor = ThreadPoolExecutor(max_workers=self.max_threads,
+                                      thread_name_prefix='carga-modelos')
+        for nome in self.carregadores:
+            if nome not in self.sob_demanda:
+                executor.submit(self._carregar, nome)
+        # As threads terminam sozinhas quando a fila esvazia
+        executor.shutdown(wait=False)
+        return self
+
+    def _carregar(self, nome):
+        futuro = self._futuros[nome]
+        inicio = time.perf_counter()
+        try:
+            artefato = self.carregadores[nome](self)
+        except Exception as e:
+            with self._lock:
+                self._tempos[nome] = time.perf_counter() - inicio
+            futuro.set_exception(e)
+            print(f"❌ Erro ao carregar {nome}: {str(e)}")
+        else:
+            with self._lock:
+                self._tempos[nome] = time.perf_counter() - inicio
+            futuro.set_result(artefato)
+
+    def obter(self, nome, timeout=None):
+        """Retorna o artefato, aguardando o fim da sua carga se necessário"""
+        futuro = self._futuros[nome]
+        if nome in self.sob_demanda and not futuro.done():
+            self._carregar_uma_vez(nome)
+        try:
+            return futuro.result(timeout=timeout)
+        except TempoEsgotado:
+            raise
+        except Exception as e:
+            raise ModeloIndisponivel(f'Modelo {nome} indisponível: {str(e)}') from e
+
+    def _carregar_uma_vez(self, nome):
+        with self._lock:
+            primeiro = nome not in self._iniciados
+            self._iniciados.add(nome)
+        if primeiro:
+            self._carregar(nome)
+
+    def carregar_sob_demanda(self):
+        """
+        Carrega na thread atual, na ordem dos carregadores, os artefatos de
+        sob_demanda que ainda não foram pedidos
+        """
+        for nome in self.carregadores:
+            if nome in self.sob_demanda:
+                self._carregar_uma_vez(nome)
+
+    def pronto(self, nome):
+        """Indica se o artefato terminou de carregar com sucesso"""
+        futuro = self._futuros[nome]
+        return futuro.done() and futuro.exception() is None
+
+    def aguardar(self, timeout=None):
+        """Aguarda a carga de todos os artefatos. Retorna True se todos carregaram"""
+        prazo = None if timeout is None else time.monotonic() + timeout
+        futuros = {nome: futuro for nome, futuro in self._futuros.items() if self._iniciado(nome)}
+        for futuro in futuros.values():
+            restante = None if prazo is None else max(0, prazo - time.monotonic())
+            try:
+                futuro.exception(timeout=restante)
+            except TempoEsgotado:
+                return False
+        return all(self.pronto(nome) for nome in futuros)
+
+    def _iniciado(self, nome):
+        with self._lock:
+            return nome not in self.sob_demanda or nome in self._iniciados
+
+    def estado(self):
+        """
+        Estado de cada artefato: carregando, pronto ou erro, com o tempo de
+        carga, ou sob demanda (ainda não pedido)
+        """
+        estados = {}
+        for nome, futuro in self._futuros.items():
+            if not self._iniciado(nome):
+                estados[nome] = {'estado': 'sob demanda'}
+                continue
+            if not futuro.done():
+                estados[nome] = {'estado': 'carregando'}
+                continue
+
+            with self._lock:
+                tempo = self._tempos.get(nome)
+            estados[nome] = {
+                'estado': 'pronto' if futuro.exception() is None else 'erro',
+                'tempo_carga_ms': round(tempo * 1000, 2) if tempo is not None else None
+            }
+            if futuro.exception() is not None:
+                estados[nome]['erro'] = str(futuro.exception())
+        return estados
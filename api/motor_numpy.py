@@ -0,0 +1,301 @@
+"""
+Modelos do ReSkill+ avaliados apenas com NumPy
+Implementam a mesma interface usada pela API (predict, predict_proba,
+transform...) sobre arrays planos, que podem vir de arquivos abertos com mmap
+ou ser extraídos dos modelos do scikit-learn no carregamento (de_sklearn)
+"""
+
+import numpy as np
+
+# Valor usado pelo scikit-learn em children_left/children_right nas folhas
+FOLHA = -1
+
+# Arrays que descrevem um conjunto de árvores (ver ArvoresNumpy)
+CAMPOS_ARVORES = ['feature', 'limiar', 'esquerda', 'direita', 'valor', 'raizes']
+
+# Amostras avaliadas por vez na descida das árvores
+LINHAS_POR_BLOCO = 512
+
+# Diferença máxima aceita entre o motor NumPy e o scikit-learn
+TOLERANCIA = 1e-9
+
+
+def validar_X(X, n_features):
+    """Converte X para uma matriz float64 2D e valida o número de colunas"""
+    X = np.asarray(X, dtype=np.float64)
+    if X.ndim != 2:
+        X = X.reshape(1, -1) if X.ndim == 1 else X
+    if X.shape[1] != n_features:
+        raise ValueError(
+            f'X has {X.shape[1]} features, but the model is expecting {n_features} features as input.'
+        )
+    if not np.isfinite(X).all():
+        raise ValueError('Input X contains NaN or infinity.')
+    return X
+
+
+def arrays_de_arvores(arvores, normalizar=False):
+    """
+    Extrai os arrays de uma lista de árvores do scikit-learn (tree_) e os
+    concatena, ajustando os índices dos filhos para a posição global.
+    normalizar=True divide o valor de cada nó pela soma (probabilidades).
+    """
+    feature, limiar, esquerda, direita, valor, raizes = [], [], [], [], [], []
+    inicio = 0
+    profundidade = 0
+
+    for arvore in arvores:
+        t = arvore.tree_
+        filhos_esquerda = t.children_left.astype(np.int64)
+        filhos_direita = t.children_right.astype(np.int64)
+        folha = filhos_esquerda == -1
+
+        raizes.append(inicio)
+        feature.append(t.feature.astype(np.int32))
+        limiar.append(t.threshold.astype(np.float64))
+        esquerda.append(np.where(folha, -1, filhos_esquerda + inicio))
+        direita.append(np.where(folha, -1, filhos_direita + inicio))
+
+        v = t.value[:, 0, :].astype(np.float64)
+        if normalizar:
+            soma = v.sum(axis=1, keepdims=True)
+            soma[soma == 0] = 1.0
+            v = v / soma
+        valor.append(v if v.shape[1] > 1 else v[:, 0])
+
+        inicio += t.node_count
+        profundidade = max(profundidade, t.max_depth)
+
+    arrays = {
+        'feature': np.concatenate(feature),
+        'limiar': np.concatenate(limiar),
+        'esquerda': np.concatenate(esquerda).astype(np.int32),
+        'direita': np.concatenate(direita).astype(np.int32),
+        'valor': np.concatenate(valor),
+        'raizes': np.array(raizes, dtype=np.int32),
+    }
+    return arrays, profundidade
+
+
+def valor_inicial_gbm(regressor):
+    """Predição inicial (init_) de um GradientBoostingRegressor"""
+    if regressor.init_ == 'zero':
+        return 0.0
+    return float(np.ravel(regressor.init_.constant_)[0])
+
+
+class ArvoresNumpy:
+    """
+    Conjunto de árvores de decisão em arrays planos.
+
+    Os nós de todas as árvores ficam concatenados; esquerda/direita apontam
+    para índices globais (ou FOLHA) e raizes guarda o primeiro nó de cada
+    árvore. valor tem uma linha por nó.
+    """
+
+    def __init__(self, feature, limiar, esquerda, direita, valor, raizes, profundidade):
+        self.feature = feature
+        self.limiar = limiar
+        self.esquerda = esquerda
+        self.direita = direita
+        self.valor = valor
+        self.raizes = raizes
+        self.profundidade = int(profundidade)
+
+        # Tabelas de descida: nas folhas os dois filhos apontam para o próprio
+        # nó, então todas as amostras podem descer o mesmo número de níveis
+        # sem testar se já chegaram a uma folha
+        folha = esquerda == FOLHA
+        nos = np.arange(len(esquerda), dtype=np.int32)
+        self._feature = np.where(folha, 0, feature).astype(np.intp)
+        self._filhos = np.stack([np.where(folha, nos, esquerda),
+                                 np.where(folha, nos, direita)], axis=1).ravel().astype(np.intp)
+
+    @classmethod
+    def de_sklearn(cls, arvores, normalizar=False):
+        """Extrai as árvores (DecisionTree*) de um ensemble do scikit-learn"""
+        arrays, profundidade = arrays_de_arvores(arvores, normalizar)
+        return cls(*(arrays[campo] for campo in CAMPOS_ARVORES), profundidade=profundidade)
+
+    def folhas(self, X):
+        """
+        Retorna a matriz (n_amostras, n_arvores) com a folha de cada amostra
+        em cada árvore. Todas as amostras e árvores descem juntas, um nível
+        por iteração, em blocos de LINHAS_POR_BLOCO amostras para que os
+        arrays intermediários caibam no cache.
+        """
+        # O scikit-learn compara os valores convertidos para float32
+        X = X.astype(np.float32).astype(np.float64)
+        resultado = np.empty((X.shape[0], len(self.raizes)), dtype=np.intp)
+        for inicio in range(0, X.shape[0], LINHAS_POR_BLOCO):
+            bloco = X[inicio:inicio + LINHAS_POR_BLOCO]
+            resultado[inicio:inicio + len(bloco)] = self._descer(bloco)
+        return resultado
+
+    def _descer(self, X):
+        # Índice de cada amostra em X achatado: linha * n_features + feature
+        base = (np.arange(X.shape[0]) * X.shape[1])[:, None]
+        X = X.ravel()
+        nos = np.broadcast_to(self.raizes.astype(np.intp), (len(base), len(self.raizes)))
+        for _ in range(self.profundidade):
+            direita = X[base + self._feature[nos]] > self.limiar[nos]
+            nos = self._filhos[2 * nos + direita]
+        return nos
+
+
+class FlorestaClassificadorNumpy:
+    """Equivalente ao RandomForestClassifier.predict_proba / predict"""
+
+    def __init__(self, arvores, classes, n_features):
+        self.arvores = arvores
+        self.classes_ = classes
+        self.n_features_in_ = n_features
+
+    @classmethod
+    def de_sklearn(cls, modelo):
+        # Uma DecisionTreeClassifier (ex.: a variante destilada) é uma floresta de uma árvore
+        return cls(ArvoresNumpy.de_sklearn(getattr(modelo, 'estimators_', [modelo]), normalizar=True),
+                   np.asarray(modelo.classes_), int(modelo.n_features_in_))
+
+    def predict_proba(self, X):
+        X = validar_X(X, self.n_features_in_)
+        # valor já está normalizado por nó: a floresta é a média das árvores
+        return self.arvores.valor[self.arvores.folhas(X)].mean(axis=1)
+
+    def predict(self, X):
+        return self.classes_[self.predict_proba(X).argmax(axis=1)]
+
+
+class GradientBoostingRegressorNumpy:
+    """Equivalente ao GradientBoostingRegressor.predict (perda quadrática)"""
+
+    def __init__(self, arvores, valor_inicial, taxa_aprendizado, n_features):
+        self.arvores = arvores
+        self.valor_inicial = float(valor_inicial)
+        self.taxa_aprendizado = float(taxa_aprendizado)
+        self.n_features_in_ = n_features
+
+    @classmethod
+    def de_sklearn(cls, modelo):
+        return cls(ArvoresNumpy.de_sklearn(modelo.estimators_[:, 0]), valor_inicial_gbm(modelo),
+                   modelo.learning_rate, int(modelo.n_features_in_))
+
+    def predict(self, X):
+        X = validar_X(X, self.n_features_in_)
+        soma = self.arvores.valor[self.arvores.folhas(X)].sum(axis=1)
+        return self.valor_inicial + self.taxa_aprendizado * soma
+
+
+class KMeansNumpy:
+    """Equivalente ao KMeans.predict: centróide mais próximo (distância euclidiana)"""
+
+    def __init__(self, centros):
+        self.cluster_centers_ = centros
+        self.n_features_in_ = centros.shape[1]
+
+    @classmethod
+    def de_sklearn(cls, modelo):
+        return cls(np.asarray(modelo.cluster_centers_, dtype=np.float64))
+
+    def predict(self, X):
+        X = validar_X(X, self.n_features_in_)
+        distancias = ((X[:, None, :] - self.cluster_centers_[None, :, :]) ** 2).sum(axis=2)
+        return distancias.argmin(axis=1)
+
+
+class ScalerNumpy:
+    """Equivalente ao StandardScaler.transform"""
+
+    def __init__(self, media, escala):
+        self.mean_ = media
+        self.scale_ = escala
+        self.n_features_in_ = media.shape[0]
+
+    @classmethod
+    def de_sklearn(cls, modelo):
+        return cls(np.asarray(modelo.mean_, dtype=np.float64),
+                   np.asarray(modelo.scale_, dtype=np.float64))
+
+    def transform(self, X):
+        X = validar_X(X, self.n_features_in_)
+        return (X - self.mean_) / self.scale_
+
+
+class SegmentadorNumpy:
+    """
+    StandardScaler.transform seguido de KMeans.predict em uma única operação.
+
+    Como argmin_k ||z - c_k||² = argmin_k (||c_k||² - 2 z·c_k) e
+    z = (x - media) / escala, a normalização é absorvida nos pesos:
+    o cluster é argmin(x @ pesos + vies), um produto de matrizes por lote.
+    Aceita os modelos do scikit-learn ou as versões NumPy (mean_, scale_,
+    cluster_centers_).
+    """
+
+    def __init__(self, scaler, clustering):
+        media = np.asarray(scaler.mean_, dtype=np.float64)
+        escala = np.asarray(scaler.scale_, dtype=np.float64)
+        centros = np.asarray(clustering.cluster_centers_, dtype=np.float64)
+
+        self.n_features_in_ = centros.shape[1]
+        self.pesos = (-2.0 * centros / escala).T
+        self.vies = (centros ** 2).sum(axis=1) + 2.0 * centros @ (media / escala)
+
+    def predict(self, X):
+        X = validar_X(X, self.n_features_in_)
+        return (X @ self.pesos + self.vies).argmin(axis=1)
+
+
+def amostra_verificacao(n_features, arvores=None, media=None, escala=None, n=256, semente=0):
+    """
+    Amostra sintética para comparar o motor NumPy com o scikit-learn.
+    Com arvores, cada coluna cobre a faixa dos limiares daquela feature;
+    com media/escala, a faixa media ± 3 * escala.
+    """
+    gerador = np.random.default_rng(semente)
+    minimo = np.zeros(n_features)
+    maximo = np.ones(n_features)
+
+    if arvores is not None:
+        internos = arvores.esquerda != FOLHA
+        for j in range(n_features):
+            limiares = arvores.limiar[internos & (arvores.feature == j)]
+            if len(limiares):
+                minimo[j], maximo[j] = limiares.min() - 1, limiares.max() + 1
+    else:
+        minimo, maximo = media - 3 * escala, media + 3 * escala
+
+    return gerador.uniform(minimo, maximo, size=(n, n_features))
+
+
+def diferenca_maxima(esperado, obtido):
+    """Maior diferença absoluta entre duas saídas (inteiros contam divergências)"""
+    esperado = np.asarray(esperado, dtype=np.float64)
+    obtido = np.asarray(obtido, dtype=np.float64)
+    if esperado.shape != obtido.shape:
+        return np.inf
+    return float(np.abs(esperado - obtido).max()) if esperado.size else 0.0
+
+
+class CodificadorNumpy:
+    """Equivalente ao LabelEncoder (transform, inverse_transform, classes_)"""
+
+    def __init__(self, classes):
+        self.classes_ = np.array(classes, dtype=object)
+        self._indices = {classe: i for i, classe in enumerate(classes)}
+
+    def transform(self, y):
+        try:
+            return np.array([self._indices[valor] for valor in y], dtype=np.int64)
+        except (KeyError, TypeError):
+            desconhecido = next(v for v in y if not self._conhecido(v))
+            raise ValueError(f'y contains previously unseen labels: {desconhecido!r}')
+
+    def inverse_transform(self, y):
+        return self.classes_[np.asarray(y, dtype=np.int64)]
+
+    def _conhecido(self, valor):
+        try:
+            return valor in self._indices
+        except TypeError:
+            return False
@@ -0,0 +1,130 @@
+"""
+Perfilador de requisições do ReSkill+
+Perfila, sob demanda, requisições escolhidas por cabeçalho ou por sorteio e
+grava o resultado em um diretório local:
+
+- cprofile: estatísticas do cProfile (.pstats), para abrir com pstats ou
+  snakeviz;
+- amostragem: pilhas amostradas da thread da requisição a cada intervalo,
+  no formato "collapsed stacks" (.txt) do flamegraph.pl / speedscope.
+
+Requisições não sorteadas não pagam nada além do sorteio.
+"""
+
+import cProfile
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+
+# Cabeçalho que pede o perfil de uma requisição (com o cabeçalho habilitado)
+CABECALHO_PERFILAR = 'X-Perfilar'
+
+# Cabeçalho da resposta com o nome do arquivo gravado
+CABECALHO_PERFIL = 'X-Perfil'
+
+MODOS = ('cprofile', 'amostragem')
+
+
+class SessaoCProfile:
+    """cProfile ligado na thread atual até parar()"""
+
+    extensao = 'pstats'
+
+    def __init__(self):
+        self._perfil = cProfile.Profile()
+        self._perfil.enable()
+
+    def parar(self):
+        self._perfil.disable()
+
+    def gravar(self, caminho):
+        self._perfil.dump_stats(caminho)
+
+
+class SessaoAmostragem:
+    """
+    Amostra a pilha da thread atual a cada intervalo segundos, em uma thread
+    separada, até parar(). Como a thread de amostragem disputa o GIL, o
+    intervalo efetivo pode ser maior em código que não o libera
+    """
+
+    extensao = 'txt'
+
+    def __init__(self, intervalo):
+        self.alvo = threading.get_ident()
+        self.intervalo = intervalo
+        self.pilhas = Counter()
+        self._parar = threading.Event()
+        self._thread = threading.Thread(target=self._amostrar, name='perfilador', daemon=True)
+        self._thread.start()
+
+    def _amostrar(self):
+        while not self._parar.wait(self.intervalo):
+            quadro = sys._current_frames().get(self.alvo)
+            pilha = []
+            while quadro is not None:
+                codigo = quadro.f_code
+                pilha.append(f'{codigo.co_name} ({os.path.basename(codigo.co_filename)}:{codigo.co_firstlineno})')
+                quadro = quadro.f_back
+            if pilha:
+                self.pilhas[';'.join(reversed(pilha))] += 1
+
+    def parar(self):
+        self._parar.set()
+        self._thread.join()
+
+    def gravar(self, caminho):
+        with open(caminho, 'w', encoding='utf-8') as arquivo:
+            for pilha, amostras in self.pilhas.most_common():
+                arquivo.write(f'{pilha} {amostras}\n')
+
+
+class Perfilador:
+    """
+    Decide quais requisições perfilar e grava os perfis em diretorio.
+
+    Uma requisição é perfilada quando traz CABECALHO_PERFILAR: 1 (se
+    cabecalho=True) ou quando cai no sorteio com probabilidade taxa.
+    """
+
+    def __init__(self, diretorio, taxa=0.0, cabecalho=False, modo='cprofile', intervalo_ms=1.0):
+        if modo not in MODOS:
+            raise ValueError(f'Modo de perfil inválido: {modo} (use {" ou ".join(MODOS)})')
+        self.diretorio = diretorio
+        self.taxa = taxa
+        self.cabecalho = cabecalho
+        self.modo = modo
+        self.intervalo = intervalo_ms / 1000
+        os.makedirs(diretorio, exist_ok=True)
+
+    def sortear(self, valor_cabecalho=None):
+        """Se a requisição deve ser perfilada"""
+        if self.cabecalho and valor_cabecalho == '1':
+            return True
+        return self.taxa > 0 and random.random() < self.taxa
+
+    def iniciar(self):
+        """
+        Começa a perfilar a thread atual. Retorna (sessão, início) ou None
+        se outro perfilador já estiver ativo (cProfile no Python 3.12+)
+        """
+        try:
+            sessao = SessaoCProfile() if self.modo == 'cprofile' else SessaoAmostragem(self.intervalo)
+        except ValueError:
+            return None
+        return sessao, time.perf_counter()
+
+    def encerrar(self, perfil, rota):
+        """Para a sessão de iniciar() e grava o perfil. Retorna o nome do arquivo"""
+        sessao, inicio = perfil
+        duracao_ms = (time.perf_counter() - inicio) * 1000
+        sessao.parar()
+        nome_rota = rota.strip('/').replace('/', '_') or 'raiz'
+        nome = (f'{datetime.now():%Y%m%d-%H%M%S-%f}_{os.getpid()}_{nome_rota}_'
+                f'{duracao_ms:.1f}ms.{sessao.extensao}')
+        sessao.gravar(os.path.join(self.diretorio, nome))
+        return nome
@@ -0,0 +1,331 @@
+"""
+Pontuação em lote (offline) do ReSkill+
+Lê um arquivo CSV ou Parquet em blocos e calcula, para cada linha, as
+predições de perfil, risco de automação e cluster com os mesmos modelos e
+encoders da API (carregar_modelos), sem passar pelo HTTP. Os blocos são
+processados em paralelo por um pool de processos e gravados na ordem de
+leitura, à medida que ficam prontos: a memória depende do tamanho do bloco,
+não do arquivo.
+
+Cada modelo é aplicado quando o arquivo tem as colunas que ele usa (as mesmas
+dos endpoints individuais). O cluster usa a coluna risco_automacao ou, se ela
+não existir, o risco previsto na mesma linha. Linhas com campos ausentes,
+valores não numéricos ou categorias desconhecidas recebem a mensagem de erro
+da API na coluna erro, e as predições afetadas ficam vazias.
+
+Uso:
+    cd api
+    python pontuacao_lote.py ../data/perfil_trabalhador.csv perfis_pontuados.csv
+    python pontuacao_lote.py entrada.parquet saida.parquet --processos 4 --tamanho-bloco 100000
+
+Parquet requer o pacote pyarrow (pip install pyarrow).
+"""
+
+import argparse
+import multiprocessing
+import os
+import sys
+import time
+import warnings
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+# Em blocos de dezenas de milhares de linhas o scikit-learn é mais rápido que
+# o motor NumPy, feito para as requisições pequenas da API (ver README);
+# RESKILL_MOTOR_INFERENCIA continua valendo se definida
+os.environ.setdefault('RESKILL_MOTOR_INFERENCIA', 'sklearn')
+
+import app  # noqa: E402
+
+warnings.filterwarnings('ignore')
+
+MODELOS = ('perfil', 'risco', 'cluster')
+
+# Blocos lidos à frente da escrita, por processo
+BLOCOS_POR_PROCESSO = 2
+
+# Tipos das colunas geradas (anuláveis: linhas com erro ficam vazias)
+COLUNAS_SAIDA = {
+    'perfil_previsto': 'string',
+    'confianca_perfil': 'Float64',
+    'risco_previsto': 'Float64',
+    'nivel_risco': 'string',
+    'cluster': 'Int64',
+    'erro': 'string',
+}
+
+# ============================================
+# LEITURA E ESCRITA EM BLOCOS
+# ============================================
+
+def formato(caminho):
+    extensao = os.path.splitext(caminho)[1].lower()
+    if extensao not in ('.csv', '.parquet'):
+        raise ValueError(f'Formato não suportado: {caminho} (use .csv ou .parquet)')
+    return extensao[1:]
+
+
+def importar_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError:
+        raise ImportError('Arquivos Parquet requerem o pacote pyarrow: pip install pyarrow')
+    return pyarrow
+
+
+def ler_blocos(caminho, tamanho_bloco):
+    """Gera DataFrames de até tamanho_bloco linhas"""
+    if formato(caminho) == 'csv':
+        # Categóricas sempre como texto e inteiros anuláveis: os tipos não
+        # mudam de um bloco para outro quando aparecem valores vazios
+        tipos = {campo: 'string' for campo in app.CATEGORICAS_PERFIL}
+        yield from pd.read_csv(caminho, chunksize=tamanho_bloco, dtype=tipos,
+                               dtype_backend='numpy_nullable')
+        return
+
+    pa = importar_pyarrow()
+    arquivo = pa.parquet.ParquetFile(caminho)
+    for lote in arquivo.iter_batches(batch_size=tamanho_bloco):
+        yield lote.to_pandas()
+
+
+class EscritorBlocos:
+    """Acrescenta blocos a um arquivo CSV ou Parquet"""
+
+    def __init__(self, caminho):
+        self.caminho = caminho
+        self.formato = formato(caminho)
+        self._parquet = None
+        self._primeiro = True
+        self._pa = importar_pyarrow() if self.formato == 'parquet' else None
+
+    def escrever(self, df):
+        if self.formato == 'csv':
+            df.to_csv(self.caminho, mode='w' if self._primeiro else 'a',
+                      header=self._primeiro, index=False)
+        else:
+            tabela = self._pa.Table.from_pandas(df, preserve_index=False)
+            if self._parquet is None:
+                self._parquet = self._pa.parquet.ParquetWriter(self.caminho, tabela.schema)
+            self._parquet.write_table(tabela.cast(self._parquet.schema))
+        self._primeiro = False
+
+    def fechar(self):
+        if self._parquet is not None:
+            self._parquet.close()
+
+# ============================================
+# PONTUAÇÃO DE UM BLOCO
+# ============================================
+
+def montar_matriz(df, codificador):
+    """
+    Versão vetorizada de CodificadorFeatures.matriz para um DataFrame:
+    mesmas validações, tabelas de categorias e mensagens, aplicadas coluna a
+    coluna.
+
+    Retorna (X, validos, erros), onde X tem uma linha por linha válida,
+    validos é a máscara booleana das linhas e erros é um array com a
+    mensagem de cada linha inválida (None nas válidas).
+    """
+    campos = codificador.campos
+    n = len(df)
+    erros = np.full(n, None, dtype=object)
+
+    # Primeiro campo ausente de cada linha, na ordem dos campos
+    for campo in campos:
+        ausentes = df[campo].isna().to_numpy() & (erros == None)  # noqa: E711
+        erros[ausentes] = f'Campo obrigatório ausente: {campo}'
+
+    colunas = []
+    for campo in campos:
+        coluna = df[campo]
+        tabela = codificador.tabela(campo)
+        if tabela is not None:
+            # Cada valor distinto do bloco é procurado uma única vez
+            codigos = coluna.map({
+                valor: tabela.get(codificador.chave(valor)) for valor in coluna.dropna().unique()
+            })
+            valores = pd.to_numeric(codigos, errors='coerce').to_numpy(dtype=float, na_value=np.nan)
+            invalidos = ~np.isfinite(valores) & (erros == None)  # noqa: E711
+            erros[invalidos] = [
+                f'Valor inválido para variável categórica: {campo}={valor!r}'
+                for valor in coluna[invalidos]
+            ]
+        else:
+            valores = pd.to_numeric(coluna, errors='coerce').to_numpy(dtype=float, na_value=np.nan)
+            invalidos = ~np.isfinite(valores) & (erros == None)  # noqa: E711
+            erros[invalidos] = f'Valor numérico inválido para o campo: {campo}'
+        colunas.append(valores)
+
+    validos = erros == None  # noqa: E711
+    X = np.column_stack(colunas)[validos] if colunas else np.empty((0, 0))
+    return X, validos, erros
+
+
+def juntar_erros(atual, novos, modelo):
+    """Acrescenta os erros de um modelo à coluna de erros"""
+    for i in np.flatnonzero(novos != None):  # noqa: E711
+        mensagem = f'{modelo}: {novos[i]}'
+        atual[i] = mensagem if atual[i] is None else f'{atual[i]}; {mensagem}'
+
+
+def pontuar_bloco(df, modelos):
+    """Calcula as predições de um bloco e retorna o bloco com as colunas novas"""
+    n = len(df)
+    codificadores = app.modelo('codificadores')
+    saida = {coluna: pd.array([None] * n, dtype=tipo) for coluna, tipo in COLUNAS_SAIDA.items()}
+    erros = np.full(n, None, dtype=object)
+
+    if 'perfil' in modelos:
+        X, validos, erros_perfil = montar_matriz(df, codificadores['perfil'])
+        juntar_erros(erros, erros_perfil, 'perfil')
+        if validos.any():
+            perfis, probas = app.prever_perfis(X)
+            saida['perfil_previsto'][validos] = perfis
+            saida['confianca_perfil'][validos] = probas.max(axis=1)
+
+    risco = None
+    if 'risco' in modelos:
+        X, validos, erros_risco = montar_matriz(df, codificadores['risco'])
+        juntar_erros(erros, erros_risco, 'risco')
+        if validos.any():
+            riscos = app.prever_riscos(X)
+            saida['risco_previsto'][validos] = riscos
+            saida['nivel_risco'][validos] = [app.classificar_risco(r)[0] for r in riscos]
+        risco = saida['risco_previsto']
+
+    if 'cluster' in modelos:
+        entrada = df
+        if 'risco_automacao' not in df.columns:
+            entrada = df.assign(risco_automacao=risco)
+        X, validos, erros_cluster = montar_matriz(entrada, codificadores['cluster'])
+        juntar_erros(erros, erros_cluster, 'cluster')
+        if validos.any():
+            saida['cluster'][validos] = app.prever('segmentador', X)
+
+    saida['erro'][:] = erros
+    return df.assign(**saida)
+
+
+def modelos_aplicaveis(colunas, pedidos):
+    """Modelos pedidos cujas colunas existem no arquivo, com o motivo dos demais"""
+    colunas = set(colunas)
+    aplicaveis, ignorados = [], {}
+    campos = {'perfil': app.CAMPOS_PERFIL, 'risco': app.CAMPOS_RISCO, 'cluster': app.CAMPOS_CLUSTER}
+    for nome in pedidos:
+        disponiveis = colunas | ({'risco_automacao'} if nome == 'cluster' and 'risco' in aplicaveis else set())
+        ausentes = [campo for campo in campos[nome] if campo not in disponiveis]
+        if ausentes:
+            ignorados[nome] = f"colunas ausentes: {', '.join(ausentes)}"
+        else:
+            aplicaveis.append(nome)
+    return aplicaveis, ignorados
+
+# ============================================
+# EXECUÇÃO
+# ============================================
+
+def iniciar_trabalhador():
+    """
+    Processos criados por fork herdam os modelos já carregados pelo processo
+    principal; nos demais (spawn), cada processo os carrega
+    """
+    if app.registro.pacote is None and not app.carregar_modelos():
+        raise RuntimeError('Erro ao carregar modelos')
+
+
+def pontuar_arquivo(entrada, saida, modelos=MODELOS, processos=None, tamanho_bloco=50000):
+    """Pontua entrada e grava em saida. Retorna (linhas, linhas com erro, segundos)"""
+    processos = processos or os.cpu_count() or 1
+    blocos = ler_blocos(entrada, tamanho_bloco)
+    primeiro = next(blocos, None)
+    if primeiro is None:
+        raise ValueError(f'Arquivo vazio: {entrada}')
+
+    aplicaveis, ignorados = modelos_aplicaveis(primeiro.columns, modelos)
+    for nome, motivo in ignorados.items():
+        print(f"⚠️  {nome} ignorado ({motivo})")
+    if not aplicaveis:
+        raise ValueError('Nenhum modelo pode ser aplicado às colunas do arquivo')
+    print(f"Modelos: {', '.join(aplicaveis)} | {processos} processo(s) | blocos de {tamanho_bloco} linhas")
+
+    escritor = EscritorBlocos(saida)
+    linhas = com_erro = 0
+    inicio = time.perf_counter()
+
+    def gravar(resultado):
+        nonlocal linhas, com_erro
+        escritor.escrever(resultado)
+        linhas += len(resultado)
+        com_erro += int(resultado['erro'].notna().sum())
+        decorrido = time.perf_counter() - inicio
+        print(f"\r  {linhas:,} linhas ({linhas / decorrido:,.0f} linhas/s)", end='', file=sys.stderr)
+
+    todos = _encadear(primeiro, blocos)
+    try:
+        if processos == 1:
+            for bloco in todos:
+                gravar(pontuar_bloco(bloco, aplicaveis))
+        else:
+            # fork compartilha os modelos do processo principal (copy-on-write)
+            metodos = multiprocessing.get_all_start_methods()
+            contexto = multiprocessing.get_context('fork' if 'fork' in metodos else None)
+            with ProcessPoolExecutor(processos, mp_context=contexto,
+                                     initializer=iniciar_trabalhador) as pool:
+                pendentes = deque()
+                for bloco in todos:
+                    pendentes.append(pool.submit(pontuar_bloco, bloco, aplicaveis))
+                    # Limita os blocos em memória; a escrita segue a ordem de leitura
+                    if len(pendentes) >= processos * BLOCOS_POR_PROCESSO:
+                        gravar(pendentes.popleft().result())
+                while pendentes:
+                    gravar(pendentes.popleft().result())
+    finally:
+        escritor.fechar()
+        print(file=sys.stderr)
+
+    return linhas, com_erro, time.perf_counter() - inicio
+
+
+def _encadear(primeiro, demais):
+    yield primeiro
+    yield from demais
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Pontuação em lote (offline) do ReSkill+')
+    parser.add_argument('entrada', help='arquivo .csv ou .parquet')
+    parser.add_argument('saida', help='arquivo .csv ou .parquet (sobrescrito)')
+    parser.add_argument('--modelos', default=','.join(MODELOS),
+                        help='modelos a aplicar, separados por vírgula (padrão: todos)')
+    parser.add_argument('--processos', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--tamanho-bloco', type=int, default=50000, help='linhas por bloco')
+    args = parser.parse_args()
+
+    modelos = [nome.strip() for nome in args.modelos.split(',') if nome.strip()]
+    desconhecidos = [nome for nome in modelos if nome not in MODELOS]
+    if desconhecidos:
+        parser.error(f"modelos desconhecidos: {', '.join(desconhecidos)} (use {', '.join(MODELOS)})")
+
+    if not app.carregar_modelos():
+        sys.exit(1)
+
+    try:
+        linhas, com_erro, segundos = pontuar_arquivo(
+            args.entrada, args.saida, modelos, args.processos, args.tamanho_bloco
+        )
+    except (ValueError, ImportError, FileNotFoundError) as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+
+    print(f"✅ {linhas:,} linhas pontuadas em {segundos:.1f} s "
+          f"({linhas / segundos:,.0f} linhas/s), {com_erro:,} com erro -> {args.saida}")
+
+
+if __name__ == '__main__':
+    main()
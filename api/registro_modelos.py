@@ -0,0 +1,181 @@
+"""
+Registro de versões dos modelos do ReSkill+
+Mantém o pacote de modelos ativo (ver modelos.py) e o substitui sem
+reiniciar o processo: a nova versão é carregada por inteiro em segundo plano,
+aquecida com algumas predições e só então ativada, com uma única atribuição.
+
+Cada requisição fixa o pacote ativo no seu início (fixar / usar_pacote, em
+uma ContextVar) e o usa até o fim, mesmo que uma nova versão seja ativada no
+meio dela: um classificador novo nunca é combinado com encoders antigos, e o
+pacote antigo é liberado quando a última requisição que o usa termina.
+
+A recarga é pedida por recarregar() (endpoint de administração) ou pelo
+vigia, que compara periodicamente a assinatura dos arquivos de origem.
+"""
+
+import contextlib
+import contextvars
+import threading
+import time
+from datetime import datetime
+
+from modelos import ModeloIndisponivel
+
+_pacote_requisicao = contextvars.ContextVar('pacote_requisicao', default=None)
+
+
+def fixar(pacote):
+    """Fixa o pacote da requisição atual. Retorna o token para liberar()"""
+    return _pacote_requisicao.set(pacote)
+
+
+def liberar(token):
+    _pacote_requisicao.reset(token)
+
+
+@contextlib.contextmanager
+def usar_pacote(pacote):
+    """Usa pacote no bloco with, na thread ou tarefa atual"""
+    token = fixar(pacote)
+    try:
+        yield pacote
+    finally:
+        liberar(token)
+
+
+class RegistroModelos:
+    """
+    Versão ativa do pacote de modelos e recargas em segundo plano.
+
+    criar_pacote() devolve um PacoteModelos ainda não iniciado; assinatura()
+    identifica os arquivos de origem (muda quando algum deles muda);
+    aquecer(pacote) faz algumas predições com o pacote novo antes da troca e
+    levanta uma exceção se ele não servir; ao_trocar() é chamada logo após a
+    troca (ex.: para limpar caches).
+    """
+
+    def __init__(self, criar_pacote, assinatura=None, aquecer=None, ao_trocar=None):
+        self.criar_pacote = criar_pacote
+        self.assinatura = assinatura or (lambda: None)
+        self.aquecer = aquecer
+        self.ao_trocar = ao_trocar
+        self.pacote = None
+        self.versao = None
+        self._lock = threading.Lock()
+        self._recarga = None
+        self._ultima_recarga = None
+        self._assinatura_com_erro = None
+        self._vigia = None
+        self.recargas = {'ok': 0, 'erro': 0}
+
+    def atual(self):
+        """Pacote fixado pela requisição atual ou, fora de uma requisição, o ativo"""
+        return _pacote_requisicao.get() or self.pacote
+
+    def carregar(self):
+        """
+        Inicia a carga da primeira versão e a ativa de imediato, sem
+        aquecimento: cada endpoint aguarda só os artefatos que usa
+        """
+        assinatura = self.assinatura()
+        pacote = self.criar_pacote().iniciar()
+        self._ativar(pacote, assinatura, 'inicial')
+        return pacote
+
+    def recarregar(self, origem='manual', aguardar=False):
+        """
+        Carrega uma nova versão em segundo plano e a ativa se tudo carregar e
+        o aquecimento passar; senão, a versão atual continua ativa. Retorna
+        False se já houver uma recarga em andamento
+        """
+        with self._lock:
+            if self._recarga is not None:
+                return False
+            self._recarga = threading.Thread(target=self._recarregar, args=(origem,),
+                                             name='recarga-modelos', daemon=True)
+            self._recarga.start()
+            recarga = self._recarga
+        if aguardar:
+            recarga.join()
+        return True
+
+    def _recarregar(self, origem):
+        inicio = time.perf_counter()
+        assinatura = self.assinatura()
+        try:
+            pacote = self.criar_pacote().iniciar()
+            if not pacote.aguardar():
+                erros = [nome for nome, estado in pacote.estado().items() if estado['estado'] == 'erro']
+                raise ModeloIndisponivel(f'Artefatos com erro: {", ".join(erros)}')
+            if self.aquecer is not None:
+                self.aquecer(pacote)
+        except Exception as e:
+            resultado = {'resultado': 'erro', 'erro': str(e)}
+            self._assinatura_com_erro = assinatura
+            print(f"❌ Recarga dos modelos falhou, versão {self.versao['numero']} mantida: {str(e)}")
+        else:
+            self._ativar(pacote, assinatura, origem)
+            resultado = {'resultado': 'ok', 'versao': self.versao['numero']}
+            print(f"✅ Modelos recarregados: versão {self.versao['numero']} ativa")
+
+        with self._lock:
+            self.recargas[resultado['resultado']] += 1
+            self._ultima_recarga = {
+                **resultado,
+                'origem': origem,
+                'concluida_em': datetime.now().isoformat(),
+                'duracao_ms': round((time.perf_counter() - inicio) * 1000, 2),
+            }
+            self._recarga = None
+
+    def _ativar(self, pacote, assinatura, origem):
+        with self._lock:
+            numero = self.versao['numero'] + 1 if self.versao else 1
+            pacote.versao = numero
+            self.versao = {
+                'numero': numero,
+                'assinatura': assinatura,
+                'origem': origem,
+                'ativada_em': datetime.now().isoformat(),
+            }
+            # Troca atômica: requisições novas passam a ver o pacote novo e as
+            # em andamento seguem com o que fixaram
+            self.pacote = pacote
+        if self.ao_trocar is not None:
+            self.ao_trocar()
+
+    def vigiar(self, intervalo):
+        """
+        Confere a assinatura dos arquivos a cada intervalo segundos e recarrega
+        quando ela muda e fica igual em duas leituras seguidas (arquivos já
+        gravados por inteiro). Uma assinatura cuja recarga falhou só é tentada
+        de novo se mudar
+        """
+        if self._vigia is not None:
+            return
+
+        def executar():
+            anterior = None
+            while True:
+                time.sleep(intervalo)
+                try:
+                    assinatura = self.assinatura()
+                except OSError:
+                    continue
+                if (assinatura == anterior and assinatura != self.versao['assinatura']
+                        and assinatura != self._assinatura_com_erro):
+                    self.recarregar('arquivos')
+                anterior = assinatura
+
+        self._vigia = threading.Thread(target=executar, name='vigia-modelos', daemon=True)
+        self._vigia.start()
+
+    def estado(self):
+        """Versão ativa e situação da última recarga"""
+        with self._lock:
+            return {
+                **(self.versao or {}),
+                'recarregando': self._recarga is not None,
+                'ultima_recarga': self._ultima_recarga,
+                'vigia': self._vigia is not None,
+            }
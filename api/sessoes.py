@@ -0,0 +1,332 @@
+"""
+Sessões de conversa do ReSkill+
+Guarda, por ID de sessão, o estado compacto de cada usuário (último perfil,
+risco e cluster previstos, contexto informado e cursos já sugeridos), para
+que o chatbot reaproveite as predições sem que o cliente reenvie o contexto.
+
+Dois backends com a mesma interface:
+
+- memoria: LRU no próprio processo;
+- sqlite: arquivo local compartilhado entre os workers do Gunicorn.
+
+Os dois expiram as sessões após ttl segundos sem acesso e descartam as
+usadas há mais tempo quando o número de sessões ou o total de bytes passa do
+limite. Os estados são gravados como JSON compacto, e o limite de bytes conta
+esse JSON mais uma estimativa fixa do custo de cada entrada (ver
+SOBRECARGA_ENTRADA).
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+BACKENDS = ('memoria', 'sqlite')
+
+# Tamanho máximo do ID de sessão
+TAMANHO_MAXIMO_ID = 128
+
+# Bytes por sessão além do ID e do JSON do estado: cabeçalhos das strings e
+# bytes, tupla e nó do OrderedDict (cerca de 150 bytes medidos com tracemalloc
+# no CPython 3.11, arredondados para cima)
+SOBRECARGA_ENTRADA = 160
+
+
+class SessaoInvalida(ValueError):
+    """ID de sessão que não é uma string não vazia de até TAMANHO_MAXIMO_ID caracteres"""
+
+
+def validar_id(sessao_id):
+    if not isinstance(sessao_id, str) or not 0 < len(sessao_id) <= TAMANHO_MAXIMO_ID:
+        raise SessaoInvalida(
+            f'ID de sessão inválido: use uma string de 1 a {TAMANHO_MAXIMO_ID} caracteres')
+    return sessao_id
+
+
+def serializar(estado):
+    return json.dumps(estado, ensure_ascii=False, separators=(',', ':')).encode()
+
+
+class _Contadores:
+    """Contadores de uso comuns aos backends (por processo)"""
+
+    def __init__(self):
+        self.acertos = 0
+        self.falhas = 0
+        self.expiradas = 0
+        self.descartadas = 0
+
+    def metricas(self, sessoes, bytes_usados, max_sessoes, max_bytes, ttl):
+        consultas = self.acertos + self.falhas
+        return {
+            'sessoes': sessoes,
+            'bytes': bytes_usados,
+            'max_sessoes': max_sessoes,
+            'max_bytes': max_bytes,
+            'ttl_s': ttl,
+            'acertos': self.acertos,
+            'falhas': self.falhas,
+            'taxa_acerto': round(self.acertos / consultas, 4) if consultas else None,
+            'expiradas': self.expiradas,
+            'descartadas': self.descartadas,
+        }
+
+
+class SessoesMemoria:
+    """
+    Sessões em um OrderedDict do processo, da menos para a mais recentemente
+    usada. Com ttl > 0, a sessão expira ttl segundos após o último acesso.
+    """
+
+    backend = 'memoria'
+
+    def __init__(self, max_sessoes=100000, max_bytes=64 * 1024 * 1024, ttl=1800):
+        self.max_sessoes = max_sessoes
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._sessoes = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._contadores = _Contadores()
+
+    def _validade(self):
+        return time.monotonic() + self.ttl if self.ttl > 0 else None
+
+    def _retirar(self, sessao_id):
+        corpo, _ = self._sessoes.pop(sessao_id)
+        self._bytes -= len(sessao_id) + len(corpo) + SOBRECARGA_ENTRADA
+
+    def _vigente(self, sessao_id):
+        """Corpo da sessão (renovando a validade), ou None se ausente ou expirada"""
+        entrada = self._sessoes.get(sessao_id)
+        if entrada is None:
+            return None
+        corpo, validade = entrada
+        if validade is not None and time.monotonic() >= validade:
+            self._retirar(sessao_id)
+            self._contadores.expiradas += 1
+            return None
+        self._sessoes[sessao_id] = (corpo, self._validade())
+        self._sessoes.move_to_end(sessao_id)
+        return corpo
+
+    def obter(self, sessao_id):
+        """Estado da sessão, ou None"""
+        with self._lock:
+            corpo = self._vigente(sessao_id)
+            if corpo is None:
+                self._contadores.falhas += 1
+                return None
+            self._contadores.acertos += 1
+        return json.loads(corpo)
+
+    def atualizar(self, sessao_id, campos):
+        """Grava os campos no estado da sessão, criando-a se preciso"""
+        with self._lock:
+            corpo = self._vigente(sessao_id)
+            estado = json.loads(corpo) if corpo is not None else {}
+            estado.update(campos)
+            novo = serializar(estado)
+            if corpo is not None:
+                self._retirar(sessao_id)
+            self._sessoes[sessao_id] = (novo, self._validade())
+            self._bytes += len(sessao_id) + len(novo) + SOBRECARGA_ENTRADA
+            self._limitar()
+
+    def _limitar(self):
+        agora = time.monotonic()
+        while self._sessoes:
+            sessao_id, (_, validade) = next(iter(self._sessoes.items()))
+            if validade is not None and agora >= validade:
+                self._contadores.expiradas += 1
+            elif len(self._sessoes) > self.max_sessoes or self._bytes > self.max_bytes:
+                self._contadores.descartadas += 1
+            else:
+                break
+            self._retirar(sessao_id)
+
+    def remover(self, sessao_id):
+        with self._lock:
+            if sessao_id in self._sessoes:
+                self._retirar(sessao_id)
+
+    def limpar(self):
+        with self._lock:
+            self._sessoes.clear()
+            self._bytes = 0
+
+    def metricas(self):
+        with self._lock:
+            return self._contadores.metricas(len(self._sessoes), self._bytes, self.max_sessoes,
+                                             self.max_bytes, self.ttl)
+
+    def __len__(self):
+        return len(self._sessoes)
+
+
+class SessoesSQLite:
+    """
+    Sessões em um arquivo SQLite (modo WAL), compartilhado pelos processos
+    que usam o mesmo caminho. O último acesso fica em tempo de parede
+    (time.time), comum aos processos; as contagens de sessões e bytes ficam
+    em uma tabela de totais atualizada na mesma transação de cada gravação.
+
+    Cada thread de cada processo abre a sua conexão na primeira operação,
+    então o objeto pode ser criado antes do fork dos workers.
+    """
+
+    backend = 'sqlite'
+
+    def __init__(self, caminho, max_sessoes=100000, max_bytes=64 * 1024 * 1024, ttl=1800):
+        self.caminho = caminho
+        self.max_sessoes = max_sessoes
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._contadores = _Contadores()
+        self._criar_tabelas()
+
+    def _conexao(self):
+        local = self._local
+        if getattr(local, 'pid', None) != os.getpid():
+            conexao = sqlite3.connect(self.caminho, timeout=5, isolation_level=None,
+                                      check_same_thread=False)
+            conexao.execute('PRAGMA journal_mode=WAL')
+            conexao.execute('PRAGMA synchronous=NORMAL')
+            local.conexao, local.pid = conexao, os.getpid()
+        return local.conexao
+
+    def _criar_tabelas(self):
+        conexao = self._conexao()
+        with _transacao(conexao):
+            conexao.execute('CREATE TABLE IF NOT EXISTS sessoes ('
+                            'id TEXT PRIMARY KEY, estado BLOB NOT NULL, '
+                            'tamanho INTEGER NOT NULL, acesso REAL NOT NULL)')
+            conexao.execute('CREATE INDEX IF NOT EXISTS sessoes_acesso ON sessoes (acesso)')
+            conexao.execute('CREATE TABLE IF NOT EXISTS totais ('
+                            'chave INTEGER PRIMARY KEY CHECK (chave = 0), '
+                            'sessoes INTEGER NOT NULL, bytes INTEGER NOT NULL)')
+            conexao.execute('INSERT OR IGNORE INTO totais VALUES (0, 0, 0)')
+
+    def _contar(self, campo, quantidade=1):
+        with self._lock:
+            setattr(self._contadores, campo, getattr(self._contadores, campo) + quantidade)
+
+    def _expirou(self, acesso, agora):
+        return self.ttl > 0 and agora - acesso >= self.ttl
+
+    def obter(self, sessao_id):
+        """Estado da sessão, ou None"""
+        conexao = self._conexao()
+        agora = time.time()
+        with _transacao(conexao):
+            linha = conexao.execute('SELECT estado, tamanho, acesso FROM sessoes WHERE id = ?',
+                                    (sessao_id,)).fetchone()
+            if linha is not None and self._expirou(linha[2], agora):
+                _apagar(conexao, [(sessao_id, linha[1])])
+                self._contar('expiradas')
+                linha = None
+            if linha is not None:
+                conexao.execute('UPDATE sessoes SET acesso = ? WHERE id = ?', (agora, sessao_id))
+        if linha is None:
+            self._contar('falhas')
+            return None
+        self._contar('acertos')
+        return json.loads(linha[0])
+
+    def atualizar(self, sessao_id, campos):
+        """Grava os campos no estado da sessão, criando-a se preciso"""
+        conexao = self._conexao()
+        agora = time.time()
+        with _transacao(conexao):
+            linha = conexao.execute('SELECT estado, tamanho, acesso FROM sessoes WHERE id = ?',
+                                    (sessao_id,)).fetchone()
+            estado = {}
+            if linha is not None and not self._expirou(linha[2], agora):
+                estado = json.loads(linha[0])
+            estado.update(campos)
+            corpo = serializar(estado)
+            tamanho = len(sessao_id) + len(corpo) + SOBRECARGA_ENTRADA
+
+            conexao.execute('INSERT OR REPLACE INTO sessoes VALUES (?, ?, ?, ?)',
+                            (sessao_id, corpo, tamanho, agora))
+            if linha is None:
+                conexao.execute('UPDATE totais SET sessoes = sessoes + 1, bytes = bytes + ?', (tamanho,))
+            else:
+                conexao.execute('UPDATE totais SET bytes = bytes + ?', (tamanho - linha[1],))
+            self._limitar(conexao, agora)
+
+    def _limitar(self, conexao, agora):
+        if self.ttl > 0:
+            expiradas = conexao.execute('SELECT id, tamanho FROM sessoes WHERE acesso <= ?',
+                                        (agora - self.ttl,)).fetchall()
+            if expiradas:
+                _apagar(conexao, expiradas)
+                self._contar('expiradas', len(expiradas))
+
+        sessoes, bytes_usados = conexao.execute('SELECT sessoes, bytes FROM totais').fetchone()
+        while sessoes > self.max_sessoes or bytes_usados > self.max_bytes:
+            # Descarta em grupos, das menos recentemente usadas, até caber
+            excesso = max(sessoes - self.max_sessoes, 1)
+            antigas = conexao.execute('SELECT id, tamanho FROM sessoes ORDER BY acesso LIMIT ?',
+                                      (excesso,)).fetchall()
+            if not antigas:
+                break
+            _apagar(conexao, antigas)
+            self._contar('descartadas', len(antigas))
+            sessoes -= len(antigas)
+            bytes_usados -= sum(tamanho for _, tamanho in antigas)
+
+    def remover(self, sessao_id):
+        conexao = self._conexao()
+        with _transacao(conexao):
+            linha = conexao.execute('SELECT tamanho FROM sessoes WHERE id = ?', (sessao_id,)).fetchone()
+            if linha is not None:
+                _apagar(conexao, [(sessao_id, linha[0])])
+
+    def limpar(self):
+        conexao = self._conexao()
+        with _transacao(conexao):
+            conexao.execute('DELETE FROM sessoes')
+            conexao.execute('UPDATE totais SET sessoes = 0, bytes = 0')
+
+    def metricas(self):
+        sessoes, bytes_usados = self._conexao().execute('SELECT sessoes, bytes FROM totais').fetchone()
+        with self._lock:
+            return self._contadores.metricas(sessoes, bytes_usados, self.max_sessoes,
+                                             self.max_bytes, self.ttl)
+
+    def __len__(self):
+        return self._conexao().execute('SELECT sessoes FROM totais').fetchone()[0]
+
+
+class _transacao:
+    """BEGIN IMMEDIATE ... COMMIT (ou ROLLBACK em caso de erro)"""
+
+    def __init__(self, conexao):
+        self.conexao = conexao
+
+    def __enter__(self):
+        self.conexao.execute('BEGIN IMMEDIATE')
+
+    def __exit__(self, tipo, valor, rastro):
+        self.conexao.execute('COMMIT' if tipo is None else 'ROLLBACK')
+
+
+def _apagar(conexao, linhas):
+    """Apaga as sessões [(id, tamanho), ...] e desconta dos totais"""
+    conexao.executemany('DELETE FROM sessoes WHERE id = ?', [(sessao_id,) for sessao_id, _ in linhas])
+    conexao.execute('UPDATE totais SET sessoes = sessoes - ?, bytes = bytes - ?',
+                    (len(linhas), sum(tamanho for _, tamanho in linhas)))
+
+
+def criar_sessoes(backend, caminho=None, max_sessoes=100000, max_bytes=64 * 1024 * 1024, ttl=1800):
+    """Armazenamento de sessões do backend escolhido ('memoria' ou 'sqlite')"""
+    if backend == 'memoria':
+        return SessoesMemoria(max_sessoes, max_bytes, ttl)
+    if backend == 'sqlite':
+        return SessoesSQLite(caminho, max_sessoes, max_bytes, ttl)
+    raise ValueError(f'Backend de sessões inválido: {backend} (use {" ou ".join(BACKENDS)})')
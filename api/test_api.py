@@ -114,6 +114,98 @@ def test_api():
         requests.get(f"{BASE_URL}/api/estatisticas")
     )
     
+    # 10. Teste de predição de perfil em lote
+    perfil_lote = {
+        "registros": [
+            perfil_data,
+            {**perfil_data, "escolaridade": "medio", "habilidades_digitais": 3},
+            {**perfil_data, "escolaridade": "inexistente"},
+            {**perfil_data, "idade": "nan"}
+        ]
+    }
+    print_response(
+        "POST /api/perfil/prever/lote - Predição de Perfil em Lote",
+        requests.post(f"{BASE_URL}/api/perfil/prever/lote", json=perfil_lote)
+    )
+    
+    # 11. Teste de predição de risco em lote
+    risco_lote = {
+        "registros": [
+            risco_data,
+            {**risco_data, "repetitividade": 2, "criatividade_requerida": 9},
+            {**risco_data, "repetitividade": True}
+        ]
+    }
+    print_response(
+        "POST /api/risco/prever/lote - Predição de Risco em Lote",
+        requests.post(f"{BASE_URL}/api/risco/prever/lote", json=risco_lote)
+    )
+    
+    # 12. Teste de segmentação em lote
+    cluster_lote = {
+        "registros": [
+            cluster_data,
+            {**cluster_data, "idade": 52, "anos_experiencia": 25, "risco_automacao": 80},
+            {**cluster_data, "renda_mensal": "inf"}
+        ]
+    }
+    print_response(
+        "POST /api/cluster/segmentar/lote - Segmentação em Lote",
+        requests.post(f"{BASE_URL}/api/cluster/segmentar/lote", json=cluster_lote)
+    )
+    
+    # 13. Teste de chatbot com pergunta livre (busca textual)
+    chat_livre = {
+        "mensagem": "Quero trabalhar com logística e controle de estoque",
+        "contexto": {
+            "perfil": "tradicional"
+        }
+    }
+    print_response(
+        "POST /api/chatbot/interagir - Chatbot (busca textual)",
+        requests.post(f"{BASE_URL}/api/chatbot/interagir", json=chat_livre)
+    )
+    
+    # 14. Teste do diagnóstico completo (perfil, risco, cluster e cursos)
+    diagnostico_data = {**perfil_data, **risco_data, "top_n": 3}
+    print_response(
+        "POST /api/diagnostico - Diagnóstico Completo",
+        requests.post(f"{BASE_URL}/api/diagnostico", json=diagnostico_data)
+    )
+    
+    # 15. Teste do diagnóstico completo em lote
+    diagnostico_lote = {
+        "registros": [
+            diagnostico_data,
+            {**diagnostico_data, "idade": 52, "escolaridade": "medio", "repetitividade": 9},
+            {**diagnostico_data, "idade": "inf"},
+            {**diagnostico_data, "top_n": "3"}
+        ]
+    }
+    print_response(
+        "POST /api/diagnostico/lote - Diagnóstico em Lote",
+        requests.post(f"{BASE_URL}/api/diagnostico/lote", json=diagnostico_lote)
+    )
+    
+    # 16. Teste da busca de trabalhadores parecidos
+    similares_data = {**cluster_data, "k": 3}
+    print_response(
+        "POST /api/trabalhadores/similares - Trabalhadores Parecidos",
+        requests.post(f"{BASE_URL}/api/trabalhadores/similares", json=similares_data)
+    )
+    
+    # 17. Teste das métricas (formato texto do Prometheus)
+    resposta = requests.get(f"{BASE_URL}/metrics")
+    print(f"\n{'='*60}")
+    print("🔹 GET /metrics - Métricas de desempenho")
+    print(f"{'='*60}")
+    print(f"Status Code: {resposta.status_code}")
+    print("Response (trecho):")
+    print('\n'.join(
+        linha for linha in resposta.text.splitlines()
+        if linha.startswith('reskill_requisicoes_total')
+    ))
+    
     print("\n" + "="*60)
     print("✅ Testes concluídos!")
     print("="*60)
@@ -0,0 +1,88 @@
+"""
+Worker gthread do Gunicorn com encerramento gracioso sem perda de conexões
+
+No gthread padrão, o SIGTERM enviado pelo mestre na recarga (HUP) apenas
+marca o worker para sair: o select em andamento continua aceitando conexões
+por até 1 s e elas são fechadas sem resposta quando o laço termina. Aqui o
+worker primeiro para de escutar, atende as conexões já aceitas, fecha as
+conexões keep-alive ociosas e só então sai.
+
+O worker usa o estado interno do ThreadWorker (poller, _keep, _lock,
+futures, nr_conns), que não faz parte da API do Gunicorn. Por isso só é
+usado nas versões testadas (classe_do_worker); em outras, o gunicorn.conf.py
+usa o gthread padrão. Se mesmo assim faltar algum atributo no encerramento,
+o worker sai como o gthread padrão. Nos dois casos, o mestre ainda espera
+graceful_timeout segundos pelas requisições em andamento.
+"""
+
+import errno
+
+import gunicorn
+from gunicorn.workers.gthread import ThreadWorker
+
+# Versões do Gunicorn (maior, menor) em que o worker foi testado: [mínima, limite)
+VERSAO_MINIMA = (23, 0)
+VERSAO_LIMITE = (24, 0)
+
+# Estado interno do ThreadWorker usado no encerramento
+ATRIBUTOS_GTHREAD = ('sockets', 'poller', '_keep', '_lock', 'futures', 'nr_conns')
+
+
+def classe_do_worker(versao=None):
+    """
+    worker_class para o gunicorn.conf.py: este worker nas versões testadas
+    do Gunicorn, ou o gthread padrão nas demais
+    """
+    versao = tuple((versao or gunicorn.version_info)[:2])
+    if VERSAO_MINIMA <= versao < VERSAO_LIMITE:
+        return 'trabalhador_gunicorn.ThreadWorkerGracioso'
+    return 'gthread'
+
+
+class ThreadWorkerGracioso(ThreadWorker):
+
+    encerrando = False
+
+    def handle_exit(self, sig, frame):
+        # Chamado dentro do handler de sinal: só marca o encerramento, o
+        # restante acontece no laço principal (notify)
+        if not self._estado_compativel():
+            super().handle_exit(sig, frame)
+            return
+        self.encerrando = True
+
+    def _estado_compativel(self):
+        """True se o ThreadWorker tem o estado interno usado no encerramento"""
+        return (all(hasattr(self, atributo) for atributo in ATRIBUTOS_GTHREAD)
+                and hasattr(self.poller, 'get_map') and self._lock is not None)
+
+    def notify(self):
+        super().notify()
+        if not self.encerrando:
+            return
+
+        with self._lock:
+            for sock in self.sockets:
+                self._remover_do_poller(sock)
+            ociosas = list(self._keep)
+            self._keep.clear()
+            for conn in ociosas:
+                self._remover_do_poller(conn.sock)
+
+        for conn in ociosas:
+            self.nr_conns -= 1
+            conn.close()
+
+        with self._lock:
+            pendentes = len(self.poller.get_map())
+        if not pendentes and all(futuro.done() for futuro in self.futures):
+            self.alive = False
+
+    def _remover_do_poller(self, sock):
+        try:
+            self.poller.unregister(sock)
+        except (KeyError, ValueError):
+            pass
+        except OSError as e:
+            if e.errno != errno.EBADF:
+                raise
@@ -0,0 +1,27 @@
+"""
+Ponto de entrada WSGI da API ReSkill+ para produção
+Carrega todos os modelos antes de devolver a aplicação. Com o Gunicorn em
+modo preload (ver gunicorn.conf.py), a carga acontece uma única vez no
+processo mestre e os workers criados por fork compartilham as páginas de
+memória dos modelos (copy-on-write).
+
+Uso:
+    cd api
+    gunicorn -c gunicorn.conf.py wsgi:app
+"""
+
+import gc
+import sys
+
+from app import app, carregar_modelos, carregar_sob_demanda
+
+if not carregar_modelos(aguardar=True):
+    sys.exit(1)
+
+# Os modelos do scikit-learn dos lotes grandes também são carregados aqui, e
+# não em uma thread: ela não sobreviveria ao fork dos workers
+carregar_sob_demanda(em_segundo_plano=False)
+
+# Move os objetos já carregados para fora do coletor de lixo: as coletas nos
+# workers deixam de tocar nessas páginas e elas continuam compartilhadas
+gc.freeze()
@@ -0,0 +1,250 @@
+"""
+Compressão do classificador de perfil do ReSkill+
+Gera variantes menores da floresta do classificador e mede, para cada uma, a
+concordância com a floresta completa em dados não vistos, a latência por
+registro (no motor NumPy da API e no scikit-learn) e o tamanho dos arquivos.
+
+Variantes:
+- arvores_N: as N primeiras árvores da floresta. As árvores de uma floresta
+  aleatória são independentes, então qualquer subconjunto delas também é uma
+  floresta;
+- profundidade_N: a mesma floresta retreinada com max_depth=N;
+- destilada: uma única árvore treinada com as probabilidades da floresta
+  (predict_proba) nos registros de treino e em uma amostra sintética.
+
+A concordância é medida com uma floresta de referência treinada só com a
+parte de treino (as variantes dela são geradas da mesma forma), no conjunto
+de teste e em uma amostra sintética maior. As variantes gravadas são geradas
+da floresta final, treinada com todos os dados. A API escolhe a variante
+servida com RESKILL_VARIANTE_CLASSIFICADOR.
+
+gerar_modelos.py executa esta etapa depois do treino. Para comprimir os
+modelos já salvos:
+    cd notebooks
+    python compressao.py [diretorio_modelos]
+"""
+
+import copy
+import glob
+import json
+import os
+import pickle
+import sys
+import time
+from datetime import datetime
+
+import numpy as np
+from sklearn.base import clone
+from sklearn.model_selection import train_test_split
+from sklearn.tree import DecisionTreeClassifier
+
+sys.path.insert(0, '../api')
+from motor_numpy import FlorestaClassificadorNumpy, arrays_de_arvores
+
+# ============================================
+# CONFIGURAÇÃO
+# ============================================
+
+# Número de árvores das florestas podadas
+ARVORES_PODADAS = (25, 10)
+# max_depth das florestas retreinadas mais rasas
+PROFUNDIDADES_REDUZIDAS = (3,)
+# max_depth da árvore destilada
+PROFUNDIDADE_DESTILADA = 6
+# Registros sintéticos da destilação e da medição de concordância
+REGISTROS_SINTETICOS = 5000
+
+# ============================================
+# VARIANTES
+# ============================================
+
+def amostra_sintetica(X, n, semente):
+    """
+    n registros com cada feature sorteada dos valores observados em X,
+    independentemente das demais: cobre combinações que não aparecem nos
+    poucos registros reais
+    """
+    rng = np.random.default_rng(semente)
+    return np.column_stack([rng.choice(X[:, j], n) for j in range(X.shape[1])])
+
+
+def podar(floresta, arvores):
+    """As primeiras arvores árvores da floresta (sem retreinar)"""
+    podada = copy.copy(floresta)
+    podada.estimators_ = floresta.estimators_[:arvores]
+    podada.n_estimators = arvores
+    return podada
+
+
+def reduzir_profundidade(floresta, profundidade, X, y):
+    """A floresta retreinada com max_depth=profundidade"""
+    return clone(floresta).set_params(max_depth=profundidade).fit(X, y)
+
+
+def destilar(floresta, profundidade, X, semente):
+    """
+    Árvore única que aprende as probabilidades da floresta: cada registro
+    entra uma vez por classe, com peso igual à probabilidade dela, então a
+    folha guarda a média das probabilidades da floresta nos seus registros
+    """
+    X_destilacao = np.vstack([X, amostra_sintetica(X, REGISTROS_SINTETICOS, semente)])
+    probabilidades = floresta.predict_proba(X_destilacao)
+    classes = len(floresta.classes_)
+    arvore = DecisionTreeClassifier(max_depth=profundidade, random_state=semente)
+    arvore.fit(np.repeat(X_destilacao, classes, axis=0),
+               np.tile(floresta.classes_, len(X_destilacao)),
+               sample_weight=probabilidades.ravel())
+    return arvore
+
+
+def gerar_variantes(floresta, X, y, semente):
+    """Floresta completa e variantes comprimidas, por nome"""
+    variantes = {'completo': floresta}
+    for arvores in ARVORES_PODADAS:
+        if arvores < len(floresta.estimators_):
+            variantes[f'arvores_{arvores}'] = podar(floresta, arvores)
+    for profundidade in PROFUNDIDADES_REDUZIDAS:
+        variantes[f'profundidade_{profundidade}'] = reduzir_profundidade(floresta, profundidade, X, y)
+    variantes['destilada'] = destilar(floresta, PROFUNDIDADE_DESTILADA, X, semente)
+    return variantes
+
+# ============================================
+# AVALIAÇÃO
+# ============================================
+
+def concordancia(variantes, X):
+    """
+    Fração dos registros de X com a mesma classe da floresta completa e
+    diferença média das probabilidades, por variante
+    """
+    referencia = variantes['completo'].predict_proba(X)
+    resultado = {}
+    for nome, modelo in variantes.items():
+        probabilidades = modelo.predict_proba(X)
+        resultado[nome] = (float((probabilidades.argmax(axis=1) == referencia.argmax(axis=1)).mean()),
+                           float(np.abs(probabilidades - referencia).mean()))
+    return resultado
+
+
+def latencia(modelo, X, repeticoes=1000):
+    """Latência (ms) do predict_proba: p50 de um registro e todo X por registro"""
+    unico = X[:1]
+    for _ in range(20):
+        modelo.predict_proba(unico)
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        modelo.predict_proba(unico)
+        tempos.append(time.perf_counter() - inicio)
+    inicio = time.perf_counter()
+    modelo.predict_proba(X)
+    lote = time.perf_counter() - inicio
+    return round(float(np.median(tempos)) * 1000, 4), round(lote * 1000 / len(X), 5)
+
+
+def comprimir(floresta, X, y, semente, fracao_teste):
+    """
+    Variantes comprimidas da floresta final (treinada com X, y) e o
+    relatório de concordância, latência e tamanho de cada uma
+    """
+    X_treino, X_teste, y_treino, y_teste = train_test_split(
+        X, y, test_size=fracao_teste, stratify=y, random_state=semente)
+    X_sintetico = amostra_sintetica(X_treino, REGISTROS_SINTETICOS, semente + 1)
+
+    referencia = gerar_variantes(clone(floresta).fit(X_treino, y_treino), X_treino, y_treino, semente)
+    no_teste = concordancia(referencia, X_teste)
+    na_amostra = concordancia(referencia, X_sintetico)
+
+    variantes = gerar_variantes(floresta, X, y, semente)
+    relatorio = {}
+    for nome, modelo in variantes.items():
+        arvores = getattr(modelo, 'estimators_', [modelo])
+        arrays, profundidade = arrays_de_arvores(arvores, normalizar=True)
+        registro_ms, lote_ms = latencia(FlorestaClassificadorNumpy.de_sklearn(modelo), X_sintetico)
+        sklearn_registro_ms, sklearn_lote_ms = latencia(modelo, X_sintetico, repeticoes=200)
+        relatorio[nome] = {
+            'arvores': len(arvores),
+            'profundidade': int(profundidade),
+            'nos': int(len(arrays['feature'])),
+            'concordancia_teste': round(no_teste[nome][0], 4),
+            'concordancia_amostra': round(na_amostra[nome][0], 4),
+            'diferenca_probabilidade': round(na_amostra[nome][1], 4),
+            'acuracia_teste': round(float((referencia[nome].predict(X_teste) == y_teste).mean()), 4),
+            # Motor NumPy (padrão da API) e scikit-learn (RESKILL_MOTOR_INFERENCIA=sklearn)
+            'registro_p50_ms': registro_ms,
+            'lote_por_registro_ms': lote_ms,
+            'sklearn_registro_p50_ms': sklearn_registro_ms,
+            'sklearn_lote_por_registro_ms': sklearn_lote_ms,
+            'tamanho_compacto_kb': round(sum(a.nbytes for a in arrays.values()) / 1024, 1),
+            'tamanho_pickle_kb': round(len(pickle.dumps(modelo)) / 1024, 1),
+        }
+    return variantes, {
+        'gerado_em': datetime.now().isoformat(),
+        'semente': semente,
+        'registros_teste': len(X_teste),
+        'registros_amostra': REGISTROS_SINTETICOS,
+        'variantes': relatorio,
+    }
+
+# ============================================
+# SALVAR
+# ============================================
+
+def salvar_variantes(variantes, relatorio, diretorio):
+    """
+    Grava cada variante (exceto a completa) como
+    classificador_perfil_<nome>.pickle e o relatório em
+    relatorio_compressao.json. Remove as variantes de execuções anteriores
+    que não foram geradas agora (ex.: arvores_25 de uma floresta com 25
+    árvores)
+    """
+    for caminho in glob.glob(os.path.join(diretorio, 'classificador_perfil_*.pickle')):
+        if os.path.basename(caminho)[len('classificador_perfil_'):-len('.pickle')] not in variantes:
+            os.remove(caminho)
+    for nome, modelo in variantes.items():
+        if nome == 'completo':
+            continue
+        with open(os.path.join(diretorio, f'classificador_perfil_{nome}.pickle'), 'wb') as f:
+            pickle.dump(modelo, f)
+    with open(os.path.join(diretorio, 'relatorio_compressao.json'), 'w', encoding='utf-8') as f:
+        json.dump(relatorio, f, ensure_ascii=False, indent=2)
+
+
+def imprimir_relatorio(relatorio):
+    print("\n" + "="*100)
+    print(f"{'Variante':<16}{'árvores':>8}{'prof.':>6}{'conc. teste':>12}{'conc. amostra':>14}"
+          f"{'1 reg ms':>10}{'lote µs':>9}{'sklearn ms':>11}{'compacto KB':>12}")
+    print("="*100)
+    for nome, dados in relatorio['variantes'].items():
+        print(f"{nome:<16}{dados['arvores']:>8}{dados['profundidade']:>6}"
+              f"{dados['concordancia_teste']:>12.3f}{dados['concordancia_amostra']:>14.3f}"
+              f"{dados['registro_p50_ms']:>10.4f}{dados['lote_por_registro_ms'] * 1000:>9.2f}"
+              f"{dados['sklearn_registro_p50_ms']:>11.3f}{dados['tamanho_compacto_kb']:>12.1f}")
+    print(f"\nConcordância com a floresta completa em {relatorio['registros_teste']} registros de teste "
+          f"e {relatorio['registros_amostra']} sintéticos")
+
+
+if __name__ == '__main__':
+    from artefatos import exportar_artefatos
+    from gerar_modelos import FRACAO_TESTE, SEMENTE, preparar_features
+
+    diretorio = sys.argv[1] if len(sys.argv) > 1 else '../models'
+
+    modelos = {}
+    for nome, arquivo in [('classificador', 'classificador_perfil.pickle'),
+                          ('regressor', 'regressor_risco.pickle'),
+                          ('clustering', 'clustering_kmeans.pickle'),
+                          ('scaler', 'scaler_cluster.pickle'),
+                          ('encoders', 'encoders.pickle')]:
+        with open(os.path.join(diretorio, arquivo), 'rb') as f:
+            modelos[nome] = pickle.load(f)
+
+    X_perfil, y_perfil = preparar_features()['perfil']
+    print("Comprimindo o classificador...")
+    variantes, relatorio = comprimir(modelos['classificador'], X_perfil, y_perfil, SEMENTE, FRACAO_TESTE)
+    salvar_variantes(variantes, relatorio, diretorio)
+    exportar_artefatos(diretorio=os.path.join(diretorio, 'compacto'),
+                       variantes={nome: modelo for nome, modelo in variantes.items() if nome != 'completo'},
+                       **modelos)
+    imprimir_relatorio(relatorio)
+    print("\n✅ Variantes salvas em", diretorio)
@@ -1,124 +1,413 @@
 """
 Script para gerar modelos pré-treinados para o ReSkill+
 Execute este script para criar os arquivos .pickle necessários para a API
+
+Pipeline de treino:
+1. monta as matrizes de features uma única vez (em cache entre execuções,
+   invalidado quando os CSVs mudam);
+2. separa um conjunto de teste (FRACAO_TESTE) que não participa da escolha;
+3. treina os três modelos ao mesmo tempo, cada um com busca de
+   hiperparâmetros por validação cruzada distribuída entre os núcleos;
+4. entre as combinações com score de validação a até TOLERANCIA da melhor,
+   escolhe a de menor custo de predição (árvores x profundidade);
+5. mede no conjunto de teste e retreina a combinação escolhida com todos os
+   dados, que é o modelo salvo;
+6. gera as variantes comprimidas do classificador (ver compressao.py), com o
+   relatório de concordância, latência e tamanho em relatorio_compressao.json.
+
+As métricas, os hiperparâmetros e os tempos de treino e de inferência vão
+para relatorio_treino.json, junto dos modelos. Com a mesma SEMENTE e os
+mesmos dados, o resultado é o mesmo.
+
+Uso:
+    cd notebooks
+    python gerar_modelos.py [diretorio_saida]
 """
 
-import pandas as pd
-import numpy as np
+import json
+import os
 import pickle
-from sklearn.ensemble import RandomForestClassifier, GradientBoostingRegressor
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import sklearn
+from joblib import Memory
+from scipy.optimize import linear_sum_assignment
+from sklearn.base import clone
 from sklearn.cluster import KMeans
+from sklearn.ensemble import RandomForestClassifier, GradientBoostingRegressor
+from sklearn.metrics import (accuracy_score, f1_score, mean_absolute_error, r2_score,
+                             silhouette_score)
+from sklearn.model_selection import GridSearchCV, KFold, StratifiedKFold, train_test_split
 from sklearn.preprocessing import LabelEncoder, StandardScaler
 
-# Carregar dados
-print("Carregando dados...")
-df_perfil = pd.read_csv('../data/perfil_trabalhador.csv')
-df_risco = pd.read_csv('../data/risco_automacao.csv')
+sys.path.insert(0, '../api')
+from artefatos import checksum, exportar_artefatos
+from compressao import comprimir, salvar_variantes, imprimir_relatorio as imprimir_compressao
+
+# ============================================
+# CONFIGURAÇÃO
+# ============================================
+
+SEMENTE = 42
+FRACAO_TESTE = 0.2
+FOLDS = 5
+# Processos da validação cruzada de cada busca (-1 = todos os núcleos)
+N_JOBS = int(os.environ.get('RESKILL_TREINO_JOBS', '-1'))
+# Perda de score de validação aceita em troca de um modelo mais rápido
+TOLERANCIA = float(os.environ.get('RESKILL_TREINO_TOLERANCIA', '0.01'))
+
+# Profundidade atribuída a max_depth=None no custo de predição
+PROFUNDIDADE_SEM_LIMITE = 32
+
+DADOS_PERFIL = '../data/perfil_trabalhador.csv'
+DADOS_RISCO = '../data/risco_automacao.csv'
+DIRETORIO_CACHE = '.cache_treino'
+
+CAMPOS_PERFIL = ['idade', 'escolaridade_enc', 'anos_experiencia', 'area_atuacao_enc',
+                 'habilidades_digitais', 'renda_mensal', 'setor_industria_enc']
+CAMPOS_RISCO = ['repetitividade', 'criatividade_requerida', 'interacao_humana',
+                'complexidade_tecnica', 'nivel_educacao']
+CAMPOS_CLUSTER = ['idade', 'anos_experiencia', 'habilidades_digitais',
+                  'renda_mensal', 'risco_automacao']
+
+GRADE_CLASSIFICADOR = {
+    'n_estimators': [25, 50, 100, 200],
+    'max_depth': [4, 6, 10, None],
+    'min_samples_split': [2, 5],
+}
+
+GRADE_REGRESSOR = {
+    'n_estimators': [50, 100, 200],
+    'learning_rate': [0.05, 0.1, 0.2],
+    'max_depth': [2, 3, 5],
+}
+
+# A API descreve 4 segmentos (CLUSTER_DESCRICOES), então só a inicialização varia
+GRADE_CLUSTERING = {
+    'n_clusters': [4],
+    'n_init': [10, 20],
+    'init': ['k-means++', 'random'],
+}
+
+# ============================================
+# FEATURES
+# ============================================
+
+memoria = Memory(DIRETORIO_CACHE, verbose=0)
+
+
+@memoria.cache
+def _preparar_features(caminho_perfil, caminho_risco, assinatura):
+    """
+    Matrizes de features dos três modelos e os encoders. Fica em cache em
+    DIRETORIO_CACHE; assinatura (checksums dos CSVs) invalida o cache quando
+    os dados mudam
+    """
+    df_perfil = pd.read_csv(caminho_perfil)
+    df_risco = pd.read_csv(caminho_risco)
+
+    encoders = {
+        'le_escolaridade': LabelEncoder(),
+        'le_area': LabelEncoder(),
+        'le_setor': LabelEncoder(),
+        'le_perfil': LabelEncoder(),
+    }
+    df_perfil['escolaridade_enc'] = encoders['le_escolaridade'].fit_transform(df_perfil['escolaridade'])
+    df_perfil['area_atuacao_enc'] = encoders['le_area'].fit_transform(df_perfil['area_atuacao'])
+    df_perfil['setor_industria_enc'] = encoders['le_setor'].fit_transform(df_perfil['setor_industria'])
+    y_perfil = encoders['le_perfil'].fit_transform(df_perfil['perfil'])
+
+    df_cluster = df_perfil.merge(df_risco[['id', 'risco_automacao']], on='id', how='left')
+
+    return {
+        'perfil': (df_perfil[CAMPOS_PERFIL].to_numpy(dtype=float), y_perfil),
+        'risco': (df_risco[CAMPOS_RISCO].to_numpy(dtype=float),
+                  df_risco['risco_automacao'].to_numpy(dtype=float)),
+        'cluster': (df_cluster[CAMPOS_CLUSTER].fillna(50).to_numpy(dtype=float), None),
+        'encoders': encoders,
+    }
+
+
+def preparar_features():
+    assinatura = (checksum(DADOS_PERFIL), checksum(DADOS_RISCO))
+    return _preparar_features(DADOS_PERFIL, DADOS_RISCO, assinatura)
+
+# ============================================
+# BUSCA DE HIPERPARÂMETROS
+# ============================================
+
+def custo_predicao(parametros):
+    """
+    Custo relativo de uma predição: nós percorridos, árvores x profundidade
+    (1 para modelos sem árvores). Usado no lugar do tempo medido na validação
+    cruzada, que varia entre execuções e tornaria a escolha não reprodutível
+    """
+    if 'n_estimators' not in parametros:
+        return 1
+    return parametros['n_estimators'] * (parametros.get('max_depth') or PROFUNDIDADE_SEM_LIMITE)
+
+
+def escolher_mais_rapido(tolerancia):
+    """
+    refit do GridSearchCV: entre as combinações com score médio a até
+    tolerancia do melhor, a de menor custo de predição (empate: maior score)
+    """
+    def escolher(resultados):
+        scores = np.asarray(resultados['mean_test_score'])
+        candidatos = np.flatnonzero(scores >= np.nanmax(scores) - tolerancia)
+        return int(min(candidatos, key=lambda i: (custo_predicao(resultados['params'][i]), -scores[i], i)))
+    return escolher
+
+
+def score_silhueta(modelo, X, y=None):
+    """Scorer do KMeans para a validação cruzada"""
+    return silhouette_score(X, modelo.predict(X))
+
+
+def buscar(estimador, grade, X, y, cv, scoring):
+    """GridSearchCV paralelo; retorna a busca ajustada e o tempo em segundos"""
+    busca = GridSearchCV(estimador, grade, cv=cv, scoring=scoring, n_jobs=N_JOBS,
+                         refit=escolher_mais_rapido(TOLERANCIA))
+    inicio = time.perf_counter()
+    busca.fit(X, y)
+    return busca, time.perf_counter() - inicio
+
+
+def medir_inferencia(prever, X, repeticoes=200):
+    """Latência (ms) de um registro (p50) e de todo X por registro"""
+    unico = X[:1]
+    for _ in range(10):
+        prever(unico)
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        prever(unico)
+        tempos.append(time.perf_counter() - inicio)
+    inicio = time.perf_counter()
+    prever(X)
+    lote = time.perf_counter() - inicio
+    return {
+        'registro_p50_ms': round(float(np.median(tempos)) * 1000, 4),
+        'lote_por_registro_ms': round(lote * 1000 / len(X), 4),
+    }
+
+
+def resumo(busca, tempo_busca):
+    melhor = busca.best_index_
+    return {
+        'hiperparametros': busca.best_params_,
+        'score_validacao': round(float(busca.cv_results_['mean_test_score'][melhor]), 4),
+        'melhor_score_validacao': round(float(np.nanmax(busca.cv_results_['mean_test_score'])), 4),
+        'combinacoes': len(busca.cv_results_['params']),
+        'custo_predicao': custo_predicao(busca.best_params_),
+        'busca_s': round(tempo_busca, 3),
+    }
+
+
+def retreinar(busca, X, y=None):
+    """Combinação escolhida treinada com todos os dados; retorna (modelo, segundos)"""
+    modelo = clone(busca.best_estimator_)
+    inicio = time.perf_counter()
+    modelo.fit(X, y)
+    return modelo, time.perf_counter() - inicio
 
 # ============================================
 # MODELO DE CLASSIFICAÇÃO
 # ============================================
-print("\nTreinando modelo de classificação...")
-
-# Preparar dados
-le_escolaridade = LabelEncoder()
-le_area = LabelEncoder()
-le_setor = LabelEncoder()
-le_perfil = LabelEncoder()
-
-df_perfil['escolaridade_enc'] = le_escolaridade.fit_transform(df_perfil['escolaridade'])
-df_perfil['area_atuacao_enc'] = le_area.fit_transform(df_perfil['area_atuacao'])
-df_perfil['setor_industria_enc'] = le_setor.fit_transform(df_perfil['setor_industria'])
-df_perfil['perfil_enc'] = le_perfil.fit_transform(df_perfil['perfil'])
-
-X_class = df_perfil[['idade', 'escolaridade_enc', 'anos_experiencia', 'area_atuacao_enc', 
-                      'habilidades_digitais', 'renda_mensal', 'setor_industria_enc']]
-y_class = df_perfil['perfil_enc']
-
-# Treinar modelo
-rf_classifier = RandomForestClassifier(
-    n_estimators=100,
-    max_depth=10,
-    min_samples_split=5,
-    random_state=42,
-    n_jobs=-1
-)
-rf_classifier.fit(X_class, y_class)
+
+def treinar_classificador(X, y):
+    X_treino, X_teste, y_treino, y_teste = train_test_split(
+        X, y, test_size=FRACAO_TESTE, stratify=y, random_state=SEMENTE)
+
+    busca, tempo_busca = buscar(
+        RandomForestClassifier(random_state=SEMENTE), GRADE_CLASSIFICADOR,
+        X_treino, y_treino, StratifiedKFold(FOLDS, shuffle=True, random_state=SEMENTE), 'accuracy')
+
+    previsto = busca.predict(X_teste)
+    relatorio = resumo(busca, tempo_busca)
+    relatorio['teste'] = {
+        'acuracia': round(accuracy_score(y_teste, previsto), 4),
+        'f1_macro': round(f1_score(y_teste, previsto, average='macro'), 4),
+    }
+    relatorio['acuracia_treino'] = round(busca.best_estimator_.score(X_treino, y_treino), 4)
+
+    modelo, tempo_treino = retreinar(busca, X, y)
+    relatorio['treino_s'] = round(tempo_treino, 3)
+    relatorio['inferencia'] = medir_inferencia(modelo.predict_proba, X)
+    return modelo, relatorio
 
 # ============================================
 # MODELO DE REGRESSÃO
 # ============================================
-print("Treinando modelo de regressão...")
 
-X_reg = df_risco[['repetitividade', 'criatividade_requerida', 'interacao_humana', 
-                   'complexidade_tecnica', 'nivel_educacao']]
-y_reg = df_risco['risco_automacao']
+def treinar_regressor(X, y):
+    X_treino, X_teste, y_treino, y_teste = train_test_split(
+        X, y, test_size=FRACAO_TESTE, random_state=SEMENTE)
+
+    busca, tempo_busca = buscar(
+        GradientBoostingRegressor(random_state=SEMENTE), GRADE_REGRESSOR,
+        X_treino, y_treino, KFold(FOLDS, shuffle=True, random_state=SEMENTE), 'r2')
 
-# Treinar modelo
-gb_regressor = GradientBoostingRegressor(
-    n_estimators=100,
-    learning_rate=0.1,
-    max_depth=5,
-    random_state=42
-)
-gb_regressor.fit(X_reg, y_reg)
+    previsto = busca.predict(X_teste)
+    relatorio = resumo(busca, tempo_busca)
+    relatorio['teste'] = {
+        'r2': round(r2_score(y_teste, previsto), 4),
+        'mae': round(mean_absolute_error(y_teste, previsto), 4),
+    }
+    relatorio['r2_treino'] = round(busca.best_estimator_.score(X_treino, y_treino), 4)
+
+    modelo, tempo_treino = retreinar(busca, X, y)
+    relatorio['treino_s'] = round(tempo_treino, 3)
+    relatorio['inferencia'] = medir_inferencia(modelo.predict, X)
+    return modelo, relatorio
 
 # ============================================
 # MODELO DE CLUSTERING
 # ============================================
-print("Treinando modelo de clustering...")
 
-df_cluster = df_perfil.merge(df_risco[['id', 'risco_automacao']], on='id', how='left')
-X_cluster = df_cluster[['idade', 'anos_experiencia', 'habilidades_digitais', 
-                        'renda_mensal', 'risco_automacao']].fillna(50)
+def alinhar_clusters(modelo, scaler, diretorio):
+    """
+    Renumera os clusters de modelo para seguir os do modelo salvo em
+    diretorio (pares de centróides mais próximos), para que as descrições
+    da API (CLUSTER_DESCRICOES) continuem valendo depois de um novo treino
+    """
+    try:
+        with open(os.path.join(diretorio, 'clustering_kmeans.pickle'), 'rb') as f:
+            anterior = pickle.load(f)
+        with open(os.path.join(diretorio, 'scaler_cluster.pickle'), 'rb') as f:
+            scaler_anterior = pickle.load(f)
+    except FileNotFoundError:
+        return modelo
+    if anterior.n_clusters != modelo.n_clusters:
+        return modelo
+
+    centros = scaler.inverse_transform(modelo.cluster_centers_)
+    centros_anteriores = scaler_anterior.inverse_transform(anterior.cluster_centers_)
+    # Distância na escala do novo scaler, para nenhuma feature dominar
+    distancias = (((centros_anteriores[:, None, :] - centros[None, :, :]) / scaler.scale_) ** 2).sum(axis=2)
+    _, ordem = linear_sum_assignment(distancias)
 
-scaler_cluster = StandardScaler()
-X_cluster_scaled = scaler_cluster.fit_transform(X_cluster)
+    modelo.cluster_centers_ = modelo.cluster_centers_[ordem]
+    modelo.labels_ = np.argsort(ordem)[modelo.labels_]
+    return modelo
 
-# Treinar modelo
-kmeans = KMeans(n_clusters=4, random_state=42, n_init=10)
-kmeans.fit(X_cluster_scaled)
+
+def treinar_clustering(X):
+    X_treino, X_teste = train_test_split(X, test_size=FRACAO_TESTE, random_state=SEMENTE)
+
+    # Scaler ajustado só no treino para a avaliação; o final usa todos os dados
+    scaler_treino = StandardScaler().fit(X_treino)
+    busca, tempo_busca = buscar(
+        KMeans(random_state=SEMENTE), GRADE_CLUSTERING, scaler_treino.transform(X_treino), None,
+        KFold(FOLDS, shuffle=True, random_state=SEMENTE), score_silhueta)
+
+    X_teste_scaled = scaler_treino.transform(X_teste)
+    relatorio = resumo(busca, tempo_busca)
+    relatorio['teste'] = {
+        'silhueta': round(float(silhouette_score(X_teste_scaled, busca.predict(X_teste_scaled))), 4),
+    }
+
+    scaler = StandardScaler()
+    X_scaled = scaler.fit_transform(X)
+    modelo, tempo_treino = retreinar(busca, X_scaled)
+    relatorio['treino_s'] = round(tempo_treino, 3)
+    relatorio['inferencia'] = medir_inferencia(lambda X: modelo.predict(scaler.transform(X)), X)
+    return (modelo, scaler), relatorio
 
 # ============================================
 # SALVAR MODELOS
 # ============================================
-print("\nSalvando modelos...")
 
-# Criar diretório
-import os
-os.makedirs('../models', exist_ok=True)
-
-# Salvar classificador
-with open('../models/classificador_perfil.pickle', 'wb') as f:
-    pickle.dump(rf_classifier, f)
-print("✓ classificador_perfil.pickle")
-
-# Salvar regressor
-with open('../models/regressor_risco.pickle', 'wb') as f:
-    pickle.dump(gb_regressor, f)
-print("✓ regressor_risco.pickle")
-
-# Salvar clustering
-with open('../models/clustering_kmeans.pickle', 'wb') as f:
-    pickle.dump(kmeans, f)
-print("✓ clustering_kmeans.pickle")
-
-# Salvar encoders
-encoders = {
-    'le_escolaridade': le_escolaridade,
-    'le_area': le_area,
-    'le_setor': le_setor,
-    'le_perfil': le_perfil
-}
-with open('../models/encoders.pickle', 'wb') as f:
-    pickle.dump(encoders, f)
-print("✓ encoders.pickle")
-
-# Salvar scaler
-with open('../models/scaler_cluster.pickle', 'wb') as f:
-    pickle.dump(scaler_cluster, f)
-print("✓ scaler_cluster.pickle")
-
-print("\n✅ Todos os modelos foram salvos com sucesso!")
-print(f"Acurácia do classificador: {rf_classifier.score(X_class, y_class):.4f}")
-print(f"R² do regressor: {gb_regressor.score(X_reg, y_reg):.4f}")
+def salvar_pickle(objeto, diretorio, nome):
+    with open(os.path.join(diretorio, nome), 'wb') as f:
+        pickle.dump(objeto, f)
+    print(f"✓ {nome}")
+
+
+def imprimir_relatorio(relatorio):
+    print("\n" + "="*70)
+    print(f"{'Modelo':<16}{'validação':>10}  {'teste':<26}{'busca s':>8}{'1 reg ms':>10}")
+    print("="*70)
+    for nome, dados in relatorio['modelos'].items():
+        teste = ' '.join(f'{metrica}={valor}' for metrica, valor in dados['teste'].items())
+        print(f"{nome:<16}{dados['score_validacao']:>10.4f}  {teste:<26}{dados['busca_s']:>8.2f}"
+              f"{dados['inferencia']['registro_p50_ms']:>10.3f}")
+        print(f"{'':<16}{dados['hiperparametros']}")
+    print(f"\nTempo total: {relatorio['tempo_total_s']:.2f} s")
+
+
+def main():
+    diretorio = sys.argv[1] if len(sys.argv) > 1 else '../models'
+    inicio = time.perf_counter()
+
+    print("Carregando dados...")
+    features = preparar_features()
+    X_perfil, y_perfil = features['perfil']
+    X_risco, y_risco = features['risco']
+    X_cluster, _ = features['cluster']
+
+    print(f"\nTreinando os modelos em paralelo (validação cruzada com {FOLDS} folds, "
+          f"n_jobs={N_JOBS})...")
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        futuros = {
+            'classificador': executor.submit(treinar_classificador, X_perfil, y_perfil),
+            'regressor': executor.submit(treinar_regressor, X_risco, y_risco),
+            'clustering': executor.submit(treinar_clustering, X_cluster),
+        }
+        resultados = {nome: futuro.result() for nome, futuro in futuros.items()}
+
+    rf_classifier, rel_classificador = resultados['classificador']
+    gb_regressor, rel_regressor = resultados['regressor']
+    (kmeans, scaler_cluster), rel_clustering = resultados['clustering']
+    kmeans = alinhar_clusters(kmeans, scaler_cluster, diretorio)
+    encoders = features['encoders']
+
+    print("\nComprimindo o classificador...")
+    variantes, rel_compressao = comprimir(rf_classifier, X_perfil, y_perfil, SEMENTE, FRACAO_TESTE)
+
+    print("\nSalvando modelos...")
+    os.makedirs(diretorio, exist_ok=True)
+    salvar_pickle(rf_classifier, diretorio, 'classificador_perfil.pickle')
+    salvar_pickle(gb_regressor, diretorio, 'regressor_risco.pickle')
+    salvar_pickle(kmeans, diretorio, 'clustering_kmeans.pickle')
+    salvar_pickle(encoders, diretorio, 'encoders.pickle')
+    salvar_pickle(scaler_cluster, diretorio, 'scaler_cluster.pickle')
+    salvar_variantes(variantes, rel_compressao, diretorio)
+    print(f"✓ variantes do classificador: {', '.join(nome for nome in variantes if nome != 'completo')}")
+
+    # Formato compacto (arrays .npy + manifesto JSON), lido pela API
+    exportar_artefatos(rf_classifier, gb_regressor, kmeans, scaler_cluster, encoders,
+                       os.path.join(diretorio, 'compacto'),
+                       variantes={nome: modelo for nome, modelo in variantes.items() if nome != 'completo'})
+    print("✓ compacto/ (formato compacto versionado)")
+
+    relatorio = {
+        'gerado_em': datetime.now().isoformat(),
+        'sklearn_versao': sklearn.__version__,
+        'semente': SEMENTE,
+        'fracao_teste': FRACAO_TESTE,
+        'folds': FOLDS,
+        'tolerancia': TOLERANCIA,
+        'dados': {'perfil': checksum(DADOS_PERFIL), 'risco': checksum(DADOS_RISCO)},
+        'modelos': {
+            'classificador': rel_classificador,
+            'regressor': rel_regressor,
+            'clustering': rel_clustering,
+        },
+        'tempo_total_s': round(time.perf_counter() - inicio, 3),
+    }
+    with open(os.path.join(diretorio, 'relatorio_treino.json'), 'w', encoding='utf-8') as f:
+        json.dump(relatorio, f, ensure_ascii=False, indent=2, default=str)
+    print("✓ relatorio_treino.json")
+
+    imprimir_relatorio(relatorio)
+    imprimir_compressao(rel_compressao)
+    print("\n✅ Todos os modelos foram salvos com sucesso!")
+
+if __name__ == '__main__':
+    main()